@@ -19,9 +19,11 @@
 """
 AudioLazy package
 
-This is the main package file, that already imports all modules into the
-system. As the full name might not be small enough for typing it everywhere,
-you can import with a helpful alias:
+This is the main package file, that gives access to the contents of all
+modules, each one imported only when some of its contents is needed (on
+Python 3.5+, older versions import everything). As the full name might not
+be small enough for typing it everywhere, you can import with a helpful
+alias:
 
   >>> import audiolazy as lz
   >>> lz.Stream(1, 3, 2).take(8)
@@ -64,13 +66,9 @@ This package was created by Danilo J. S. Bellini and is a free software,
 under the terms of the GPLv3.
 """
 
-# Some dunders and summary docstrings initialization
-__modules__, __all__, __doc__ = \
-  __import__(__name__ + "._internals", fromlist=[__name__]
-            ).init_package(__path__, __name__, __doc__)
-
-# Import all modules contents to the main namespace
-exec(("from .{} import *\n" * len(__modules__)).format(*__modules__))
+# Some dunders, lazy module loading and summary docstrings initialization
+__modules__ = __import__(__name__ + "._internals", fromlist=[__name__]
+                        ).init_package(__path__, __name__)
 
 # Metadata (used by setup.py); Should use only local assignments!
 __version__ = "0.1dev"
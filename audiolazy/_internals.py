@@ -28,7 +28,10 @@ from functools import wraps, reduce
 from warnings import warn
 from glob import glob
 from operator import concat
+import types
+import sys
 import os
+import io
 
 
 def deprecate(func):
@@ -97,31 +100,186 @@ def append_summary_to_module_docstring(module):
   module.__doc__ = docstring_with_summary(module.__doc__, pairs, **kws)
 
 
+#
+# Lazy package loading with deferred summaries on docstrings
+#
+
+def profile_path():
+  """
+  JSON profile file name for the autotuned StrategyDict defaults (see
+  ``lazy_bench``), which is the ``AUDIOLAZY_PROFILE`` environment variable
+  value (an empty value disables the profile) or
+  ``~/.audiolazy_profile.json``.
+  """
+  return os.environ.get("AUDIOLAZY_PROFILE",
+                        os.path.join(os.path.expanduser("~"),
+                                     ".audiolazy_profile.json"))
+
+def profile_on_import():
+  """
+  Flag whether the autotuning profile should be loaded when importing
+  AudioLazy, which happens whenever the ``profile_path`` file exists, unless
+  the ``AUDIOLAZY_NO_PROFILE`` environment variable is set (e.g. for tests
+  that shouldn't depend on the machine).
+  """
+  if os.environ.get("AUDIOLAZY_NO_PROFILE"):
+    return False
+  path = profile_path()
+  return bool(path) and os.path.exists(path)
+
+def source_dunder_all(package_path, module_name):
+  """
+  The ``__all__`` list from the module source code without importing it,
+  or None when that list isn't a single literal assignment (or when there's
+  no source code).
+  """
+  fname = os.path.join(package_path[0], module_name + ".py")
+  try:
+    with io.open(fname, encoding="utf-8") as f:
+      source = f.read()
+  except (IOError, OSError):
+    return None
+  if source.count("__all__") != 1: # Changed after the assignment
+    return None
+  import ast, re
+  match = re.search(r"^__all__ = (\[.*?\])", source, re.MULTILINE | re.DOTALL)
+  return ast.literal_eval(match.group(1)) if match else None
+
+def get_name_owners(package_path, module_names):
+  """
+  Pair ``(owners, dynamic)`` where ``owners`` is a dict whose keys are the
+  names found in literal ``__all__`` lists and whose values are the names of
+  the modules where they're from, and ``dynamic`` is the list of remaining
+  module names, whose ``__all__`` can only be known by importing them.
+  """
+  owners, dynamic = {}, []
+  for module_name in module_names:
+    dunder_all = source_dunder_all(package_path, module_name)
+    if dunder_all is None:
+      dynamic.append(module_name)
+    else:
+      owners.update((name, module_name) for name in dunder_all)
+  return owners, dynamic
+
+
+class LazyPackage(types.ModuleType):
+  """
+  Package class whose modules are only imported when some name from them is
+  needed, i.e., the names in the package namespace are found on demand
+  (like a PEP 562 ``__getattr__`` package function, but this is also
+  available on Python 3.5 and 3.6 by changing the package ``__class__``).
+  Modules imported in that package get their docstring summary deferred.
+  """
+  def __getattr__(self, name):
+    package_name, module_names = self.__name__, self.__modules__
+    if name == "__all__":
+      value = dunder_all_concat(get_modules(package_name, module_names))
+    elif name in module_names:
+      value = get_modules(package_name, [name])[0]
+    elif name.startswith("__"):
+      raise AttributeError(name)
+    else:
+      if package_name not in _name_owners:
+        _name_owners[package_name] = get_name_owners(self.__path__,
+                                                     module_names)
+      owners, dynamic = _name_owners[package_name]
+      if name in owners:
+        module = get_modules(package_name, [owners[name]])[0]
+      else:
+        for module in get_modules(package_name, dynamic):
+          if name in getattr(module, "__all__", []):
+            break
+        else:
+          raise AttributeError("Module '{0}' has no attribute '{1}'"
+                               .format(package_name, name))
+      value = getattr(module, name)
+    setattr(self, name, value)
+    return value
+
+  def __dir__(self):
+    return sorted(set(vars(self)).union(self.__modules__, self.__all__))
+
+  def __setattr__(self, name, value):
+    if type(value) is types.ModuleType and name in self.__modules__:
+      value.__class__ = SummaryModule
+    super(LazyPackage, self).__setattr__(name, value)
+
+_name_owners = {} # Cache for get_name_owners results, by package name
+
+
+class SummaryModule(types.ModuleType):
+  """
+  Module class that appends the summary table to its docstring only when
+  that docstring is needed. Afterwards the module class is restored.
+  """
+  def _get_doc(self):
+    self.__class__ = types.ModuleType
+    append_summary_to_module_docstring(self)
+    return self.__doc__
+
+  def _set_doc(self, value):
+    vars(self)["__doc__"] = value
+
+  __doc__ = property(_get_doc, _set_doc)
+
+
+class SummaryPackage(LazyPackage):
+  """
+  LazyPackage whose docstring gets its summary table with all the package
+  modules (importing all of them) only when that docstring is needed.
+  Afterwards the package class becomes LazyPackage.
+  """
+  def _get_doc(self):
+    self.__class__ = LazyPackage
+    modules = get_modules(self.__name__, self.__modules__)
+    pairs = list(zip(self.__modules__, modules))
+    kws = dict(key_header="Module", summary_type="package modules")
+    self.__doc__ = docstring_with_summary(self.__doc__, pairs, **kws)
+    return self.__doc__
+
+  __doc__ = property(_get_doc, SummaryModule._set_doc)
+
+
 #
 # Package initialization, first function to be called internally
 #
 
-def init_package(package_path, package_name, docstring):
+def init_package(package_path, package_name):
   """
   Package initialization, to be called only by ``__init__.py``.
 
   - Find all module names;
-  - Import all modules (so they're already cached on sys.modules), in
-    the sorting order (this might make difference on cyclic imports);
-  - Update all module docstrings (with the summary of its contents);
-  - Build a module summary for the package docstring.
+  - Make the package a SummaryPackage instance, so that modules are imported
+    only when needed and every docstring summary table (the package one and
+    the module ones with their contents) is created only when needed;
+  - Import the ``lazy_bench`` module when there's an autotuning profile or
+    autotuning is enabled, as it should happen before any use;
+  - On Python versions that can't change the package class (before 3.5),
+    import all modules in the sorting order (this might make difference on
+    cyclic imports), update all the docstrings and import every module
+    contents into the main package namespace.
 
   Returns
   -------
-  A 4-length tuple ``(modules, __all__, __doc__)``. The first one can be
-  used by the package to import every module into the main package namespace.
+  The list of module names.
   """
   module_names = get_module_names(package_path)
-  modules = get_modules(package_name, module_names)
-  dunder_all = dunder_all_concat(modules)
-  for module in modules:
-    append_summary_to_module_docstring(module)
-  pairs = list(zip(module_names, modules))
-  kws = dict(key_header="Module", summary_type="package modules")
-  new_docstring = docstring_with_summary(docstring, pairs, **kws)
-  return module_names, dunder_all, new_docstring
+  package = sys.modules[package_name]
+  package.__modules__ = module_names
+  try:
+    package.__class__ = SummaryPackage
+  except TypeError:
+    modules = get_modules(package_name, module_names)
+    for module in modules:
+      append_summary_to_module_docstring(module)
+      vars(package).update((name, getattr(module, name))
+                           for name in getattr(module, "__all__", []))
+    pairs = list(zip(module_names, modules))
+    kws = dict(key_header="Module", summary_type="package modules")
+    package.__doc__ = docstring_with_summary(package.__doc__, pairs, **kws)
+    package.__all__ = dunder_all_concat(modules)
+  else:
+    if "lazy_bench" in module_names and (os.environ.get("AUDIOLAZY_AUTOTUNE")
+                                         or profile_on_import()):
+      get_modules(package_name, ["lazy_bench"])
+  return module_names
@@ -23,7 +23,7 @@ Audio analysis and block processing module
 from __future__ import division
 
 from math import cos, pi
-from collections import deque, Sequence, Iterable
+from collections import deque, Sequence, Iterable, OrderedDict
 import operator
 
 # Audiolazy internal imports
@@ -31,10 +31,14 @@ from .lazy_core import StrategyDict
 from .lazy_stream import tostream, thub, Stream
 from .lazy_math import cexp, ceil, absolute
 from .lazy_filters import lowpass, z
-from .lazy_compat import xrange, xmap, xzip
+from .lazy_misc import blocks, lag2freq
+from .lazy_compat import xrange, xmap, xzip, iteritems
 
-__all__ = ["window", "acorr", "lag_matrix", "dft", "zcross", "envelope",
-           "maverage", "clip", "unwrap", "amdf", "overlap_add"]
+__all__ = ["window", "WINDOW_CACHE_SIZE", "cached_window", "acorr",
+           "lag_matrix", "dft", "zcross", "zcross_blocks", "envelope",
+           "envelope_blocks", "maverage", "clip", "clip_blocks", "unwrap",
+           "unwrap_blocks", "amdf", "yin", "overlap_add",
+           "overlap_add_blocks", "wola"]
 
 
 window = StrategyDict("window")
@@ -152,6 +156,82 @@ def window(size, alpha=.16):
           for n in xrange(size)]
 
 
+WINDOW_CACHE_SIZE = 64 # Number of arrays kept by cached_window
+_window_cache = OrderedDict() # The least recently used window comes first
+
+# Vectorized window strategies, for n = np.arange(size) and m = size - 1
+_window_numpy = {
+  window.hamming: lambda np, n, m: .54 - .46 * np.cos(2 * pi * n / m),
+  window.rectangular: lambda np, n, m: np.ones(len(n)),
+  window.bartlett: lambda np, n, m: 1 - 2.0 / m * np.abs(n - m / 2.0),
+  window.triangular: lambda np, n, m: 1 - 2.0 / (m + 2) *
+                                          np.abs(n - m / 2.0),
+  window.hann: lambda np, n, m: .5 * (1 - np.cos(2 * pi * n / m)),
+  window.blackman: lambda np, n, m, alpha=.16:
+    alpha / 2 * np.cos(4 * pi * n / m) - .5 * np.cos(2 * pi * n / m)
+    + (1 - alpha) / 2,
+}
+
+
+def cached_window(wnd, size, *args, **kwargs):
+  """
+  Window samples as a read-only Numpy array, kept in a LRU (least recently
+  used) cache with up to ``WINDOW_CACHE_SIZE`` arrays, so that block
+  processing code can ask for the same window again and again without
+  computing it again.
+
+  Parameters
+  ----------
+  wnd :
+    Window function, usually a ``window`` strategy (whose samples are
+    computed by a vectorized Numpy version of it), or a ``window`` strategy
+    name, or ``None`` for a rectangular window. Any other callable should
+    be a pure function whose first parameter is the window size.
+  size :
+    Window size in samples.
+  *args, **kwargs :
+    Extra window parameters, e.g. ``alpha`` for ``window.blackman``. They're
+    part of the cache key, so they should be hashable.
+
+  Returns
+  -------
+  Numpy array with the window samples, which can't be changed in place as
+  it's shared by every call with the same inputs.
+
+  """
+  if wnd is None:
+    wnd = window.rectangular
+  elif isinstance(wnd, StrategyDict):
+    wnd = wnd.default
+  elif not callable(wnd):
+    wnd = window[wnd]
+  key = wnd, size, args, tuple(sorted(iteritems(kwargs)))
+
+  try:
+    result = _window_cache.pop(key)
+  except KeyError:
+    import numpy as np
+    if wnd in _window_numpy and size != 1:
+      result = _window_numpy[wnd](np, np.arange(size), size - 1,
+                                  *args, **kwargs)
+    else:
+      result = np.array(wnd(size, *args, **kwargs), dtype=float)
+    result.flags.writeable = False
+
+  _window_cache[key] = result # As the most recently used
+  while len(_window_cache) > WINDOW_CACHE_SIZE:
+    _window_cache.popitem(last=False)
+  return result
+
+
+def _is_window_strategy(wnd):
+  """
+  Whether ``wnd`` is the ``window`` StrategyDict or one of its strategies,
+  i.e., a window function whose results can be cached.
+  """
+  return wnd is window or any(wnd is func for func in _window_numpy)
+
+
 def acorr(blk, max_lag=None):
   """
   Calculate the autocorrelation of a given 1-D block sequence.
@@ -312,6 +392,45 @@ def zcross(seq, hysteresis=0, first_sign=0):
       yield 0
 
 
+@tostream
+def zcross_blocks(blk_sig, hysteresis=0, first_sign=0):
+  """
+  Zero-crossing for block processing.
+
+  Same to ``zcross``, but both the input and the output are blocks, and
+  each input block is processed at once with Numpy. The sign memory is kept
+  between blocks, so the joined output blocks are the ``zcross`` output for
+  the joined input blocks (with a non-negative ``hysteresis``).
+
+  Parameters
+  ----------
+  blk_sig :
+    An iterable of blocks (sequences), e.g. from ``blocks.numpy``, with any
+    block sizes.
+  hysteresis, first_sign :
+    See ``zcross``.
+
+  Returns
+  -------
+  A Stream instance of Numpy integer arrays with the same sizes from the
+  input blocks, with 1 for each crossing detected, 0 otherwise.
+
+  """
+  import numpy as np
+  last_sign = 0 if first_sign == 0 else (-1 if first_sign < 0 else 1)
+  for blk in blk_sig:
+    blk = np.asarray(blk)
+    signs = (blk > hysteresis).astype(int) - (blk < -hysteresis)
+    nonzero = signs != 0
+    last_idx = np.maximum.accumulate(np.where(nonzero,
+                                              np.arange(len(blk)), -1))
+    filled = np.where(last_idx >= 0, signs[last_idx], last_sign)
+    prev_signs = np.hstack([[last_sign], filled[:-1]])
+    yield (nonzero & (prev_signs != 0) & (signs != prev_signs)).astype(int)
+    if len(blk):
+      last_sign = filled[-1]
+
+
 envelope = StrategyDict("envelope")
 
 
@@ -398,6 +517,103 @@ def envelope(sig, cutoff=pi/512):
   return lowpass(cutoff)(thub(sig, 1) ** 2)
 
 
+def _envelope_lowpass_blocks(blk_sig, cutoff, before, after=None):
+  """
+  Envelope block processing helper, that applies the ``before`` Numpy
+  function to each block, then the ``lowpass(cutoff)`` one-pole filter, and
+  finally the ``after`` function, if any. The filter is vectorized with
+  ``scipy.signal.lfilter`` (its ``zi`` state is the filter memory between
+  blocks) when SciPy is available, otherwise it's a Python loop for the
+  block samples, which is slower. Both use the same arithmetic from the
+  LinearFilter instance.
+  """
+  import numpy as np
+  try:
+    from scipy.signal import lfilter
+  except ImportError:
+    lfilter = None
+  filt = lowpass(cutoff)
+  if set(filt.numdict) != {0} or set(filt.dendict) != {0, 1} or \
+     filt.dendict[0] != 1 or \
+     any(isinstance(coeff, Iterable) for coeff in filt.numdict.values()) or \
+     any(isinstance(coeff, Iterable) for coeff in filt.dendict.values()):
+    raise ValueError("Envelope lowpass should be a one-pole LTI filter")
+  gain = filt.numdict[0]
+  pole = -filt.dendict[1]
+  last = 0.
+  for blk in blk_sig:
+    data = before(np.asarray(blk))
+    if lfilter is not None and len(data):
+      result, unused = lfilter([gain], [1., -pole], data.astype(float),
+                               zi=[pole * last])
+      last = result[-1]
+    else: # Slow path without SciPy
+      result = []
+      append = result.append
+      for el in data.tolist():
+        last = gain * el + pole * last
+        append(last)
+      result = np.array(result, dtype=float)
+    yield result if after is None else after(result)
+
+
+envelope_blocks = StrategyDict("envelope_blocks")
+
+
+@envelope_blocks.strategy("rms")
+@tostream
+def envelope_blocks(blk_sig, cutoff=pi/512):
+  """
+  Envelope non-linear filter for block processing.
+
+  Same to ``envelope.rms``, but both the input and the output are blocks,
+  and the squaring, filtering and square root are vectorized for each block,
+  with the filter memory kept between blocks. The joined output blocks are
+  the ``envelope.rms`` output for the joined input blocks. The filtering
+  needs SciPy to be vectorized, otherwise it's a Python loop per sample.
+
+  Parameters
+  ----------
+  blk_sig :
+    An iterable of blocks (sequences), e.g. from ``blocks.numpy``, with any
+    block sizes.
+  cutoff :
+    Lowpass filter cutoff frequency, in rad/sample. Defaults to ``pi/512``.
+    It should be a number, since the ``lowpass`` filter should be LTI.
+
+  Returns
+  -------
+  A Stream instance of Numpy float arrays with the same sizes from the input
+  blocks.
+
+  """
+  import numpy as np
+  return _envelope_lowpass_blocks(blk_sig, cutoff, before=np.square,
+                                  after=lambda blk: np.power(blk, .5))
+
+
+@envelope_blocks.strategy("abs")
+@tostream
+def envelope_blocks(blk_sig, cutoff=pi/512):
+  """
+  Envelope non-linear filter for block processing, the ``envelope.abs``
+  version of ``envelope_blocks.rms``.
+  """
+  import numpy as np
+  return _envelope_lowpass_blocks(blk_sig, cutoff, before=np.abs)
+
+
+@envelope_blocks.strategy("squared")
+@tostream
+def envelope_blocks(blk_sig, cutoff=pi/512):
+  """
+  Squared envelope non-linear filter for block processing, the
+  ``envelope.squared`` version of ``envelope_blocks.rms``.
+  """
+  import numpy as np
+  return _envelope_lowpass_blocks(blk_sig, cutoff, before=np.square)
+
+
 maverage = StrategyDict("maverage")
 
 
@@ -525,6 +741,40 @@ def clip(sig, low=-1., high=1.):
                 (low if el < low else el) for el in sig)
 
 
+def clip_blocks(blk_sig, low=-1., high=1.):
+  """
+  Clips the signal blocks up to both a lower and a higher limit.
+
+  Same to ``clip``, but both the input and the output are blocks, each one
+  clipped at once with Numpy.
+
+  Parameters
+  ----------
+  blk_sig :
+    An iterable of blocks (sequences), e.g. from ``blocks.numpy``, with any
+    block sizes.
+  low, high :
+    See ``clip``.
+
+  Returns
+  -------
+  A Stream instance of Numpy arrays with the same sizes from the input
+  blocks.
+
+  """
+  import numpy as np
+  if low is not None and high is not None and high < low:
+    raise ValueError("Higher clipping limit is smaller than lower one")
+  def clipper(blk):
+    blk = np.asarray(blk)
+    if high is not None:
+      blk = np.where(blk > high, high, blk)
+    if low is not None:
+      blk = np.where(blk < low, low, blk)
+    return blk
+  return Stream(clipper(blk) for blk in blk_sig)
+
+
 @tostream
 def unwrap(sig, max_delta=pi, step=2*pi):
   """
@@ -561,6 +811,50 @@ def unwrap(sig, max_delta=pi, step=2*pi):
     d0 = d1
 
 
+@tostream
+def unwrap_blocks(blk_sig, max_delta=pi, step=2*pi):
+  """
+  Parametrized signal unwrapping for block processing.
+
+  Same to ``unwrap``, but both the input and the output are blocks, each one
+  unwrapped at once with Numpy (the offsets are a cumulative sum). The last
+  sample and offset are kept between blocks, so the joined output blocks are
+  the ``unwrap`` output for the joined input blocks.
+
+  Parameters
+  ----------
+  blk_sig :
+    An iterable of blocks (sequences), e.g. from ``blocks.numpy``, with any
+    block sizes.
+  max_delta, step :
+    See ``unwrap``.
+
+  Returns
+  -------
+  A Stream instance of Numpy arrays with the same sizes from the input
+  blocks.
+
+  """
+  import numpy as np
+  last = None # Last input sample
+  delta = 0
+  for blk in blk_sig:
+    blk = np.asarray(blk)
+    if len(blk) == 0:
+      yield blk
+      continue
+    if last is None:
+      last = blk[0]
+    diff = np.diff(np.hstack([[last], blk]))
+    up, down = np.mod(diff, step), np.mod(diff, -step)
+    steps = np.where(np.abs(up) <= np.abs(down), up, down) - diff
+    offsets = np.cumsum(np.hstack([[delta], np.where(np.abs(diff) > max_delta,
+                                                     steps, 0)]))[1:]
+    yield blk + offsets
+    last = blk[-1]
+    delta = offsets[-1]
+
+
 def amdf(lag, size):
   """
   Average Magnitude Difference Function non-linear filter for a given
@@ -596,6 +890,98 @@ def amdf(lag, size):
   return amdf_filter
 
 
+@tostream
+def yin(sig, size=2048, hop=None, min_lag=2, max_lag=None, threshold=.1,
+        unvoiced=0.):
+  """
+  YIN pitch detector, a frame by frame fundamental frequency estimator.
+
+  The difference function (the squared version of the AMDF) is found for
+  all lags at once in each frame, from an autocorrelation computed with a
+  FFT (Numpy), instead of one ``amdf`` filter for each lag. The pitch lag
+  is the first local minimum below the ``threshold`` in its cumulative mean
+  normalized version, refined by a parabolic interpolation.
+
+  Parameters
+  ----------
+  sig :
+    Input signal (any iterable).
+  size :
+    Frame size, in samples. Should be greater than ``max_lag``.
+  hop :
+    Number of samples between two adjacent frames (defaults to the size).
+  min_lag, max_lag :
+    Range of the lags to be searched, in samples, i.e., the inverse of the
+    pitch frequency range. See ``freq2lag`` if needs conversion from
+    frequency values. The ``max_lag`` defaults to half the frame size, and
+    the remaining ``size - max_lag`` samples are the integration window.
+  threshold :
+    Maximum value of the cumulative mean normalized difference function at
+    the pitch lag. If no lag has a value below it, the global minimum is
+    taken, unless that minimum is above ``2 * threshold`` (unvoiced frame).
+  unvoiced :
+    Value given for unvoiced frames. Defaults to zero.
+
+  Returns
+  -------
+  A Stream instance with one pitch frequency (in rad/sample) for each frame.
+
+  See Also
+  --------
+  amdf :
+    Average Magnitude Difference Function for a single lag.
+  lag2freq :
+    Lag (in samples) to frequency (in rad/sample) converter.
+
+  """
+  import numpy as np
+  if max_lag is None:
+    max_lag = size // 2
+  width = size - max_lag # Integration window
+  if width < 1 or min_lag < 1 or min_lag >= max_lag:
+    raise ValueError("Invalid lag range for the given frame size")
+  fft_size = 1 << int(size + width - 1).bit_length()
+  lags = np.arange(1, max_lag + 1)
+
+  for frame in blocks.numpy(sig, size, hop):
+    # Difference function from energies and the autocorrelation, i.e.,
+    # d(lag) = sum((frame[j] - frame[j + lag]) ** 2 for j < width)
+    spectrum = np.fft.rfft(frame, fft_size)
+    head = np.fft.rfft(frame[:width], fft_size)
+    acorr = np.fft.irfft(head.conj() * spectrum, fft_size)[1:max_lag + 1]
+    energy = np.cumsum(np.hstack([0., frame * frame]))
+    diff = (energy[width] + energy[lags + width] - energy[lags]
+            - 2 * acorr).clip(0.)
+
+    # Cumulative mean normalized difference function
+    total = np.cumsum(diff)
+    cmndf = np.where(total > 0, diff * lags / np.where(total > 0, total, 1.),
+                     1.)
+
+    # Pitch lag search (index for the lag - 1)
+    search = cmndf[min_lag - 1:]
+    below = np.flatnonzero(search < threshold)
+    if len(below):
+      idx = below[0]
+      while idx + 1 < len(search) and search[idx + 1] < search[idx]:
+        idx += 1
+    else:
+      idx = int(np.argmin(search))
+      if search[idx] > 2 * threshold:
+        yield unvoiced
+        continue
+    idx += min_lag - 1
+
+    # Parabolic interpolation
+    lag = idx + 1.
+    if 0 < idx < max_lag - 1:
+      prev, curr, succ = cmndf[idx - 1:idx + 2]
+      den = prev - 2 * curr + succ
+      if den > 0:
+        lag += .5 * (prev - succ) / den
+    yield lag2freq(lag)
+
+
 overlap_add = StrategyDict("overlap_add")
 
 
@@ -654,16 +1040,17 @@ def overlap_add(blk_sig, size=None, hop=None, wnd=window.triangular,
     hop = size
 
   # Find the right windowing function to be applied
-  if wnd is None:
-    wnd = np.ones(size)
-  elif callable(wnd) and not isinstance(wnd, Stream):
-    wnd = wnd(size)
-  if isinstance(wnd, Sequence):
-    wnd = np.array(wnd)
-  elif isinstance(wnd, Iterable):
-    wnd = np.hstack(wnd)
+  if wnd is None or _is_window_strategy(wnd):
+    wnd = cached_window(wnd, size)
   else:
-    raise TypeError("Window should be an iterable or a callable")
+    if callable(wnd) and not isinstance(wnd, Stream):
+      wnd = wnd(size)
+    if isinstance(wnd, Sequence):
+      wnd = np.array(wnd)
+    elif isinstance(wnd, Iterable):
+      wnd = np.hstack(wnd)
+    else:
+      raise TypeError("Window should be an iterable or a callable")
 
   # Normalization to the [-1; 1] range
   if normalize:
@@ -738,3 +1125,159 @@ def overlap_add(blk_sig, size=None, hop=None, wnd=window.triangular,
       yield el
   for el in mem[hop:]: # No more blocks, finish yielding the last one
     yield el
+
+
+def _ola_window(wnd, size):
+  """
+  Window from the ``overlap_add`` ``wnd`` parameter as a Numpy array.
+  """
+  import numpy as np
+  if wnd is None or _is_window_strategy(wnd):
+    return cached_window(wnd, size)
+  if callable(wnd) and not isinstance(wnd, Stream):
+    wnd = wnd(size)
+  if isinstance(wnd, Sequence):
+    return np.array(wnd, dtype=float)
+  if isinstance(wnd, Iterable):
+    return np.hstack(wnd).astype(float)
+  raise TypeError("Window should be an iterable or a callable")
+
+
+@tostream
+def overlap_add_blocks(blk_sig, size=None, hop=None, wnd=window.triangular,
+                       normalize=True):
+  """
+  Overlap-add algorithm with block output.
+
+  Same to ``overlap_add.numpy``, but yields ``hop``-sized Numpy arrays
+  instead of each sample, to be used by block processing sinks (e.g. with
+  ``chunks`` by joining the blocks with ``chain.from_iterable``). The
+  windowed blocks are added into a preallocated circular buffer with
+  ``ceil(size / hop) * hop`` samples, so the only allocation for each
+  input block is the ``hop``-sized output array.
+
+  Parameters
+  ----------
+  blk_sig, size, hop, wnd, normalize :
+    See ``overlap_add.numpy``.
+
+  Returns
+  -------
+  A Stream instance whose elements are Numpy arrays with ``hop`` samples.
+  The last ``size - hop`` samples are yielded after the last input block,
+  also in ``hop``-sized arrays but the last one, which can be shorter.
+  When ``hop > size``, each block is followed by ``hop - size`` zeros.
+
+  See Also
+  --------
+  overlap_add :
+    Sample by sample output.
+  wola :
+    Weighted overlap-add, for STFT resynthesis.
+
+  """
+  import numpy as np
+
+  # Finds the size from data, if needed
+  if size is None:
+    blk_sig = Stream(blk_sig)
+    size = len(blk_sig.peek())
+  if hop is None:
+    hop = size
+
+  # Window with normalization to the [-1; 1] range
+  wnd = _ola_window(wnd, size)
+  if normalize:
+    steps = Stream(wnd).blocks(hop).map(np.array)
+    gain = np.sum(np.abs(np.vstack(steps)), 0).max()
+    if gain: # If gain is zero, normalization couldn't have any effect
+      wnd = wnd / gain
+
+  return _ola_blocks(blk_sig, size, hop, wnd)
+
+
+def _ola_blocks(blk_sig, size, hop, wnd):
+  """
+  Overlap-add generator for the ``overlap_add_blocks`` and ``wola`` block
+  output, with an already prepared ``size``-sized window array.
+  """
+  import numpy as np
+  length = int(ceil(size / hop)) * hop
+  acc = np.zeros(length) # Circular buffer
+  windowed = np.zeros(length) # Has zeros after the first size samples
+  pos = 0 # Circular buffer start, a multiple of hop
+  started = False
+  for blk in blk_sig:
+    if len(blk) != size:
+      raise ValueError("Wrong block size or declared")
+    np.multiply(wnd, blk, out=windowed[:size])
+    acc[pos:] += windowed[:length - pos]
+    acc[:pos] += windowed[length - pos:]
+    result = acc[pos:pos + hop].copy()
+    acc[pos:pos + hop] = 0.
+    pos = (pos + hop) % length
+    started = True
+    yield result
+
+  # No more blocks, finish yielding the last one
+  if started:
+    for remain in xrange(size - hop, 0, -hop):
+      yield acc[pos:pos + min(remain, hop)].copy()
+      pos = (pos + hop) % length
+
+
+@tostream
+def wola(blk_sig, size=None, hop=None, wnd=window.hann, analysis=None):
+  """
+  Weighted overlap-add (WOLA) algorithm with block output, for the
+  resynthesis of short-time Fourier transform (STFT) frames.
+
+  Each block is multiplied by the synthesis window ``wnd`` before being
+  overlapped and added, and the result is divided by the overlapped sum of
+  the ``analysis * wnd`` window products, so that the blocks from
+  ``Stream.blocks`` multiplied by the ``analysis`` window are resynthesized
+  to the original signal, for any window and hop pair whose products sum
+  isn't zero.
+
+  Parameters
+  ----------
+  blk_sig, size, hop :
+    See ``overlap_add.numpy``.
+  wnd :
+    Synthesis window function (defaults to ``window.hann``), or any iterable
+    with exactly ``size`` elements. If ``None``, uses a rectangular window.
+  analysis :
+    The window applied to the blocks before their processing (e.g. before
+    a DFT), with the same possible values from ``wnd``. Defaults to
+    ``None``, a rectangular window, i.e., the blocks weren't windowed.
+
+  Returns
+  -------
+  A Stream instance whose elements are Numpy arrays, with the same sizes
+  described in ``overlap_add_blocks``.
+
+  Note
+  ----
+  As in ``overlap_add``, there's no special treatment for the first and
+  last ``size - hop`` samples, which don't have all the overlapping blocks.
+
+  """
+  import numpy as np
+
+  # Finds the size from data, if needed
+  if size is None:
+    blk_sig = Stream(blk_sig)
+    size = len(blk_sig.peek())
+  if hop is None:
+    hop = size
+
+  # Synthesis window divided by the (periodic) overlapped window products
+  wnd = _ola_window(wnd, size)
+  length = int(ceil(size / hop)) * hop
+  products = np.zeros(length)
+  products[:size] = _ola_window(analysis, size) * wnd
+  gain = np.tile(products.reshape(-1, hop).sum(axis=0), length // hop)[:size]
+  nonzero = np.abs(gain) > 1e-10
+  wnd = np.where(nonzero, wnd / np.where(nonzero, gain, 1.), 0.)
+
+  return _ola_blocks(blk_sig, size, hop, wnd)
@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Sun Oct 18 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+StrategyDict benchmarking and autotuning module
+"""
+
+from __future__ import division
+
+from collections import namedtuple
+from functools import wraps
+from timeit import default_timer
+from warnings import warn
+import itertools as it
+import platform
+import json
+import sys
+import os
+
+# Audiolazy internal imports
+from ._internals import get_modules, profile_path, profile_on_import
+from .lazy_core import StrategyDict
+from .lazy_misc import almost_eq, blocks
+from .lazy_compat import xrange, xzip, iteritems
+from .lazy_text import rst_table
+from .lazy_analysis import maverage, overlap_add
+from .lazy_io import chunks
+from .lazy_itertools import accumulate
+from .lazy_lpc import lpc
+from .lazy_poly import lagrange
+from .lazy_synth import white_noise, gauss_noise
+
+__all__ = ["BENCH_SIZES", "BenchCase", "BenchResult", "bench_cases",
+           "strategy_dicts", "strategy_bench", "bench_report", "PROFILE_PATH",
+           "AUTOTUNE_SIZE", "load_profile", "autotune",
+           "autotune_on_first_use"]
+
+
+BENCH_SIZES = [2 ** 10, 2 ** 13, 2 ** 16] # Samples
+
+
+BenchResult = namedtuple("BenchResult", ["name", "group", "strategy", "size",
+                                         "time", "latency", "throughput",
+                                         "memory", "agree"])
+
+
+class BenchCase(object):
+  """
+  Benchmark case for a group of strategies from a StrategyDict instance,
+  which should be equivalent (i.e., interchangeable) implementations.
+
+  Parameters
+  ----------
+  sdict :
+    The StrategyDict instance.
+  names :
+    Strategy names (one name for each strategy) to be compared.
+  func :
+    Workload function with signature ``func(strategy, data)``, where
+    ``data`` is the ``prepare`` result, returning an iterable with the
+    output. Only the ``func`` call and the output iteration are timed.
+  prepare :
+    Function that receives a list with the input signal (white noise) and
+    returns the ``data`` given to ``func``. Defaults to the identity.
+  flatten :
+    Function that receives the output list and returns a list of numbers,
+    to see whether the strategies outputs agree.
+  agree :
+    If the outputs should agree (by ``almost_eq.diff``), otherwise they
+    aren't compared (e.g. pseudo-random data) and the case is only
+    informative: as there's nothing ensuring its strategies are
+    interchangeable, it never changes the StrategyDict default (neither in
+    ``strategy_bench`` nor in ``autotune``).
+  max_diff :
+    Maximum difference for the outputs to agree.
+  group :
+    Group name, needed when a StrategyDict has more than one case.
+
+  """
+  def __init__(self, sdict, names, func, prepare=None, flatten=None,
+               agree=True, max_diff=1e-7, group=""):
+    self.sdict = sdict
+    self.names = [name for name in names # Some might be unavailable
+                       if any(name in keys for keys in sdict.keys())]
+    self.func = func
+    self.prepare = (lambda data: data) if prepare is None else prepare
+    self.flatten = flatten
+    self.agree = agree
+    self.max_diff = max_diff
+    self.group = group
+
+  def run(self, name, sig, repeat=3, memory=True):
+    """
+    Runs the workload for the strategy ``name`` with the input list ``sig``.
+
+    Returns
+    -------
+    A tuple ``(time, latency, memory, output)``, where ``time`` is the best
+    total time in seconds, ``latency`` is the best time until the first
+    output element, ``memory`` is the peak memory allocated in bytes (needs
+    ``tracemalloc``, otherwise it's ``None``) and ``output`` is the output
+    list from the last run.
+    """
+    strategy = self.sdict[name]
+    data = self.prepare(sig)
+    best_time = best_latency = float("inf")
+    for unused in xrange(repeat):
+      start = default_timer()
+      output = iter(self.func(strategy, data))
+      first = list(it.islice(output, 1))
+      latency = default_timer() - start
+      output = first + list(output)
+      best_time = min(best_time, default_timer() - start)
+      best_latency = min(best_latency, latency)
+
+    peak = None
+    if memory:
+      try:
+        import tracemalloc
+      except ImportError:
+        pass
+      else:
+        tracemalloc.start()
+        try:
+          list(self.func(strategy, data))
+          peak = tracemalloc.get_traced_memory()[1]
+        finally:
+          tracemalloc.stop()
+
+    return best_time, best_latency, peak, output
+
+  def outputs_agree(self, outputs):
+    """
+    Whether all given output lists are almost equal to the first one.
+    """
+    if not self.agree:
+      return None
+    if self.flatten is not None:
+      outputs = [self.flatten(output) for output in outputs]
+    return all(almost_eq.diff(outputs[0], output, max_diff=self.max_diff)
+               for output in outputs[1:])
+
+
+bench_cases = {}
+
+def bench_case(sdict, *names, **kwargs):
+  """
+  Decorator to register a workload function as a BenchCase instance in the
+  ``bench_cases`` dictionary, whose keys are the StrategyDict names and
+  values are lists of cases. The keyword arguments are the ones from
+  BenchCase.
+  """
+  def decorator(func):
+    case = BenchCase(sdict, names, func, **kwargs)
+    bench_cases.setdefault(sdict.__name__, []).append(case)
+    return func
+  return decorator
+
+
+#
+# Bench cases
+#
+
+@bench_case(maverage, "deque", "recursive", "fir")
+def _maverage_bench(strategy, sig):
+  return strategy(32)(sig)
+
+@bench_case(overlap_add, "numpy", "list",
+            prepare=lambda sig: [list(blk) for blk in blocks(sig, 256, 128)])
+def _overlap_add_bench(strategy, blk_sig):
+  return strategy(blk_sig, size=256, hop=128)
+
+@bench_case(chunks, "struct", "array",
+            flatten=lambda data: list(bytearray(b"".join(data))))
+def _chunks_bench(strategy, sig):
+  return strategy(sig, size=256)
+
+@bench_case(accumulate, "accumulate", "func", "z", max_diff=1e-9)
+def _accumulate_bench(strategy, sig):
+  return strategy(sig)
+
+@bench_case(lpc, "autocor", "nautocor", "kautocor", group="autocor",
+            prepare=lambda sig: [list(blk) for blk in blocks(sig, 256)],
+            flatten=lambda filts: [coeff for filt in filts
+                                         for coeff in filt.numerator])
+def _lpc_autocor_bench(strategy, blk_sig):
+  return (strategy(blk, 16) for blk in blk_sig)
+
+@bench_case(lpc, "covar", "kcovar", group="covar",
+            prepare=lambda sig: [list(blk) for blk in blocks(sig, 256)],
+            flatten=lambda filts: [coeff for filt in filts
+                                         for coeff in filt.numerator])
+def _lpc_covar_bench(strategy, blk_sig):
+  return (strategy(blk, 16) for blk in blk_sig)
+
+@bench_case(blocks, "deque", "numpy",
+            flatten=lambda blks: [el for blk in blks for el in blk])
+def _blocks_bench(strategy, sig):
+  return (list(blk) for blk in strategy(sig, size=256, hop=64))
+
+@bench_case(lagrange, "func", "poly", max_diff=1e-6,
+            prepare=lambda sig: (list(xzip(xrange(8), sig)), len(sig)))
+def _lagrange_bench(strategy, data):
+  pairs, size = data
+  interpolator = strategy(pairs)
+  return (interpolator(7 * idx / size) for idx in xrange(size))
+
+# The noise strategies give distinct pseudo-random outputs, so these cases
+# aren't compared and never autotuned
+@bench_case(white_noise, "random", "numpy", agree=False)
+def _white_noise_bench(strategy, sig):
+  return strategy(len(sig), seed=0)
+
+@bench_case(gauss_noise, "random", "numpy", agree=False)
+def _gauss_noise_bench(strategy, sig):
+  return strategy(len(sig), seed=0)
+
+
+def strategy_dicts():
+  """
+  List with all StrategyDict instances in the AudioLazy namespace (the
+  ``__all__`` from all modules).
+  """
+  package_name = __name__.rpartition(".")[0]
+  modules = get_modules(package_name, sys.modules[package_name].__modules__)
+  result = []
+  for module in modules:
+    for name in getattr(module, "__all__", []):
+      obj = getattr(module, name)
+      if isinstance(obj, StrategyDict) and obj not in result:
+        result.append(obj)
+  return result
+
+
+def strategy_bench(sdicts=None, sizes=BENCH_SIZES, repeat=3, memory=True,
+                   set_default=False):
+  """
+  Benchmarks the strategies from StrategyDict instances, running their
+  ``bench_cases`` with white noise input of several sizes.
+
+  Parameters
+  ----------
+  sdicts :
+    A StrategyDict instance or a list of them. Defaults to all of them
+    (see ``strategy_dicts``), and the ones without a bench case are
+    ignored, as their strategies aren't interchangeable (e.g. ``window``).
+  sizes :
+    Input sizes, in samples. Defaults to ``BENCH_SIZES``.
+  repeat :
+    Number of runs for each strategy and size (only the best one counts).
+  memory :
+    Flag whether the peak memory should be measured in an extra run. Needs
+    the ``tracemalloc`` module (Python 3.4+).
+  set_default :
+    If ``True``, assigns the fastest strategy for the largest size to the
+    StrategyDict ``default``, when all outputs agree and the former default
+    belongs to the case strategies.
+
+  Returns
+  -------
+  A list of BenchResult instances (namedtuples), where ``time`` and
+  ``latency`` (time until the first output element) are in seconds,
+  ``throughput`` is in input samples per second, ``memory`` is the peak
+  allocated memory in bytes (or ``None``) and ``agree`` tells whether all
+  the strategy outputs for that size agree (``None`` for cases that aren't
+  compared).
+
+  """
+  if sdicts is None:
+    sdicts = strategy_dicts()
+  elif isinstance(sdicts, StrategyDict):
+    sdicts = [sdicts]
+
+  results = []
+  for sdict in sdicts:
+    for case in bench_cases.get(sdict.__name__, []):
+      all_agree = case.agree
+      for size in sizes:
+        sig = white_noise(size, seed=size).take(size)
+        runs = [(name, case.run(name, sig, repeat=repeat, memory=memory))
+                for name in case.names]
+        agree = case.outputs_agree([run[3] for name, run in runs])
+        all_agree = all_agree and agree
+        for name, (time, latency, peak, unused) in runs:
+          results.append(BenchResult(sdict.__name__, case.group, name, size,
+                                     time, latency, size / time, peak,
+                                     agree))
+
+      # Fastest strategy (for the largest size) as the default
+      if set_default and all_agree and \
+         any(sdict.default is sdict[name] for name in case.names):
+        fastest = min(runs, key=lambda pair: pair[1][0])[0]
+        sdict.default = sdict[fastest]
+
+  return results
+
+
+def bench_report(results):
+  """
+  Creates a reStructuredText table (list of strings) from the
+  ``strategy_bench`` results.
+  """
+  schema = ["Name", "Strategy", "Size", "Time (ms)", "Latency (ms)",
+            "Samples/s", "Memory (KiB)", "Agree"]
+  data = [[".".join(filter(None, [res.name, res.group])), res.strategy,
+           res.size, "{:.3f}".format(res.time * 1e3),
+           "{:.3f}".format(res.latency * 1e3),
+           "{:.3g}".format(res.throughput),
+           "-" if res.memory is None else "{:.1f}".format(res.memory / 1024),
+           "-" if res.agree is None else ("yes" if res.agree else "NO")]
+          for res in results]
+  return rst_table(data, schema)
+
+
+#
+# Autotuning with a local JSON profile
+#
+
+PROFILE_PATH = profile_path()
+AUTOTUNE_SIZE = 2 ** 13 # Samples
+
+
+def _profile_key():
+  """
+  Key for the current machine and interpreter in a profile, as a shared
+  home directory might be seen by distinct CPUs and Python implementations.
+  """
+  return "{0}:{1}-{2}.{3}".format(platform.node(),
+                                  platform.python_implementation(),
+                                  *sys.version_info[:2])
+
+
+def _read_profile(path):
+  """ Whole profile file contents as a dict, empty if there's no file. """
+  if not os.path.exists(path):
+    return {}
+  with open(path, "r") as profile_file:
+    return json.load(profile_file)
+
+
+def _strategy_name(sdict, func):
+  """ First name of the given strategy function in the StrategyDict. """
+  for keys in sdict.keys():
+    if sdict[keys[0]] is func:
+      return keys[0]
+
+
+def load_profile(path=None, size=AUTOTUNE_SIZE):
+  """
+  Applies the autotuned defaults from a profile for the current machine and
+  interpreter, as found by ``autotune``. This is called when AudioLazy is
+  imported, unless the ``AUDIOLAZY_NO_PROFILE`` environment variable is
+  set.
+
+  Parameters
+  ----------
+  path :
+    JSON profile file name. Defaults to ``PROFILE_PATH``, which is the
+    ``AUDIOLAZY_PROFILE`` environment variable value (an empty value disables
+    the profile) or ``~/.audiolazy_profile.json``.
+  size :
+    Input size class (number of samples), the nearest one in the profile is
+    used. Defaults to ``AUTOTUNE_SIZE``.
+
+  Returns
+  -------
+  Dictionary with the StrategyDict names as keys and the assigned default
+  strategy names as values.
+
+  """
+  path = PROFILE_PATH if path is None else path
+  if not path:
+    return {}
+  entries = _read_profile(path).get(_profile_key(), {})
+  if not entries: # Avoids importing every module
+    return {}
+  result = {}
+  for sdict in strategy_dicts():
+    winners = entries.get(sdict.__name__)
+    if not winners:
+      continue
+    nearest = min(winners, key=lambda key: abs(int(key) - size))
+    name = winners[nearest]
+    if any(name in keys for keys in sdict.keys()):
+      sdict.default = sdict[name]
+      result[sdict.__name__] = name
+  return result
+
+
+def autotune(sdicts=None, size=AUTOTUNE_SIZE, repeat=3, path=None):
+  """
+  Calibrates the StrategyDict defaults for the current machine and
+  interpreter, saving the fastest strategies in a JSON profile.
+
+  Parameters
+  ----------
+  sdicts :
+    StrategyDict instance or a list of them. Defaults to all of them (see
+    ``strategy_bench``).
+  size :
+    Input size class (number of samples). Defaults to ``AUTOTUNE_SIZE``.
+  repeat :
+    Number of runs for each strategy (only the best one counts).
+  path :
+    JSON profile file name, whose entries for other machines, interpreters
+    and sizes are kept. Defaults to ``PROFILE_PATH``. An empty value means
+    the results shouldn't be saved.
+
+  Returns
+  -------
+  Dictionary with the StrategyDict names as keys and the new default
+  strategy names as values, only for the ones where the outputs from all
+  their compared strategies agree.
+
+  """
+  path = PROFILE_PATH if path is None else path
+  if sdicts is None:
+    sdicts = strategy_dicts()
+  elif isinstance(sdicts, StrategyDict):
+    sdicts = [sdicts]
+
+  result = {}
+  for sdict in sdicts:
+    old_default = sdict.default
+    results = strategy_bench(sdict, sizes=[size], repeat=repeat,
+                             memory=False, set_default=True)
+    if all(res.agree for res in results) and \
+       any(sdict[res.strategy] is old_default for res in results):
+      result[sdict.__name__] = _strategy_name(sdict, sdict.default)
+
+  if path and result:
+    profile = _read_profile(path)
+    entries = profile.setdefault(_profile_key(), {})
+    for name, strategy_name in iteritems(result):
+      entries.setdefault(name, {})[str(size)] = strategy_name
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as profile_file:
+      json.dump(profile, profile_file, indent=2, sort_keys=True)
+    if os.path.exists(path) and sys.platform.startswith("win"):
+      os.remove(path) # Windows can't rename to an existing file name
+    os.rename(temp_path, path)
+
+  return result
+
+
+def autotune_on_first_use(sdicts=None, size=AUTOTUNE_SIZE, path=None):
+  """
+  Autotuning mode, where the StrategyDict instances without an entry for
+  the current machine, interpreter and size in the profile are calibrated
+  (see ``autotune``) when they're called for the first time.
+
+  Parameters
+  ----------
+  sdicts, size, path :
+    See ``autotune``. Only StrategyDict instances with bench cases are
+    changed.
+
+  Returns
+  -------
+  List of StrategyDict instances that will be calibrated on first use.
+
+  """
+  path = PROFILE_PATH if path is None else path
+  if sdicts is None:
+    sdicts = strategy_dicts()
+  elif isinstance(sdicts, StrategyDict):
+    sdicts = [sdicts]
+  entries = _read_profile(path).get(_profile_key(), {}) if path else {}
+
+  def first_use_default(sdict):
+    default = sdict.default
+
+    @wraps(default)
+    def wrapper(*args, **kwargs):
+      sdict.default = default # Restored before, as calibration calls it
+      autotune(sdict, size=size, path=path)
+      return sdict.default(*args, **kwargs)
+
+    return wrapper
+
+  result = []
+  for sdict in sdicts:
+    if sdict.__name__ in bench_cases and \
+       str(size) not in entries.get(sdict.__name__, {}):
+      sdict.default = first_use_default(sdict)
+      result.append(sdict)
+  return result
+
+
+# Loads the profile when importing (see ``profile_on_import``)
+if profile_on_import():
+  try:
+    load_profile()
+  except (IOError, OSError, ValueError, TypeError) as exc:
+    warn("Invalid AudioLazy profile file {0} ({1})".format(PROFILE_PATH, exc))
+if os.environ.get("AUDIOLAZY_AUTOTUNE"):
+  autotune_on_first_use()
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Mon Oct 19 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Cache for rendered Streams
+"""
+
+from collections import OrderedDict
+from functools import wraps
+from array import array
+import weakref
+import atexit
+import os
+
+# Audiolazy internal imports
+from .lazy_stream import Stream
+from .lazy_compat import PYTHON2, iteritems
+
+__all__ = ["RenderCache"]
+
+
+def _remove_spilled_file(fname, remove=os.remove):
+  """
+  Removes a spilled file, if possible. Replay Streams still in use keep its
+  memory map alive, and on Windows the file itself is only removed when
+  it's not in use. The ``remove`` default is bound when defining this
+  function, so it doesn't depend on module globals at the interpreter exit.
+  """
+  try:
+    remove(fname)
+  except OSError:
+    pass
+
+
+def _remove_spilled(disk):
+  """
+  Removes all the spilled files from the given dict, whose values are pairs
+  ``(file name, mmap object)``, emptying it.
+  """
+  while disk:
+    _remove_spilled_file(disk.popitem()[1][0])
+
+
+class RenderCache(object):
+  """
+  Bounded memory cache for rendered (finite) Streams, e.g. synthesized
+  notes that are played several times.
+
+  Each rendered Stream is stored as a compact ``array`` buffer (32 bits
+  floats by default), and it's given back as a replay Stream that iterates
+  over that buffer. When the total size of the buffers is greater than
+  ``max_bytes``, the least recently used ones are either removed or, when
+  there's a ``spill_dir``, moved to memory-mapped files in that directory,
+  which can still be replayed.
+
+  Examples
+  --------
+  >>> cache = RenderCache(max_bytes=2 ** 20)
+  >>> @cache.memoize
+  ... def note(dur, gain):
+  ...   print("Rendering")
+  ...   return Stream(gain, -gain).limit(dur)
+  >>> list(note(5, .5))
+  Rendering
+  [0.5, -0.5, 0.5, -0.5, 0.5]
+  >>> list(note(5, .5))
+  [0.5, -0.5, 0.5, -0.5, 0.5]
+  >>> len(cache), cache.nbytes
+  (1, 20)
+
+  Storing the results directly:
+
+  >>> list(cache.store("ramp", [0, .25, .5, .75]))
+  [0.0, 0.25, 0.5, 0.75]
+  >>> "ramp" in cache
+  True
+  >>> cache.replay("ramp").take(2)
+  [0.0, 0.25]
+
+  The spilled files are removed by ``clear`` (or ``close``, or when leaving
+  a ``with`` block), otherwise when the cache is garbage collected or at
+  the interpreter exit.
+
+  """
+  def __init__(self, max_bytes=64 * 2 ** 20, spill_dir=None,
+               max_disk_bytes=None, typecode="f"):
+    """
+    Cache constructor.
+
+    Parameters
+    ----------
+    max_bytes :
+      Maximum size of all buffers in memory, in bytes. Defaults to 64 MiB.
+    spill_dir :
+      Directory where the buffers removed from memory should be stored as
+      memory-mapped files, which are removed together with their cache
+      entries. An empty string means the system temporary directory.
+      Defaults to None, meaning the buffers are just removed.
+    max_disk_bytes :
+      Maximum size of all files in the ``spill_dir``, in bytes. The least
+      recently used ones are removed. Defaults to None (no limit).
+    typecode :
+      The ``array`` type code for the samples. Defaults to ``"f"`` (32 bits
+      float), use ``"d"`` to keep the Python float precision.
+    """
+    self.max_bytes = max_bytes
+    self.spill_dir = spill_dir
+    self.max_disk_bytes = max_disk_bytes
+    self.typecode = typecode
+    self.nbytes = 0 # In memory
+    self.disk_nbytes = 0
+    self._memory = OrderedDict() # The least recently used comes first
+    self._disk = OrderedDict() # Pairs (file name, mmap object) as values
+
+    # The finalizer can't refer to the cache, only to its spilled files
+    if hasattr(weakref, "finalize"):
+      weakref.finalize(self, _remove_spilled, self._disk)
+    else: # Python 2, where __del__ isn't called for reference cycles
+      atexit.register(_remove_spilled, self._disk)
+
+  def __len__(self):
+    return len(self._memory) + len(self._disk)
+
+  def __contains__(self, key):
+    return key in self._memory or key in self._disk
+
+  def buffer(self, key):
+    """
+    The buffer stored for the key, an ``array`` or a read-only ``mmap``
+    object for the spilled ones, e.g. to be seen as a Numpy array with
+    ``np.frombuffer(cache.buffer(key), dtype=cache.typecode)``. Raises
+    KeyError when there's no such key in the cache.
+    """
+    if key in self._memory:
+      result = self._memory[key] = self._memory.pop(key)
+      return result
+    entry = self._disk[key] = self._disk.pop(key)
+    return entry[1]
+
+  def replay(self, key):
+    """
+    Stream with the data stored for the key, without copying the buffer.
+    Raises KeyError when there's no such key in the cache.
+    """
+    buf = self.buffer(key)
+    if isinstance(buf, array):
+      return Stream(iter(buf))
+    if PYTHON2:
+      return Stream(iter(array(self.typecode, buf[:])))
+    return Stream(iter(memoryview(buf).cast(self.typecode)))
+
+  def store(self, key, data):
+    """
+    Renders and stores the data, which should be a finite iterable (e.g. a
+    Stream or a Numpy array), replacing any previous data for the key.
+    Returns a replay Stream with the data.
+    """
+    if type(data).__module__ == "numpy":
+      import numpy as np
+      buf = array(self.typecode, np.asarray(data, self.typecode).tobytes())
+    else:
+      buf = array(self.typecode, data)
+    self.discard(key)
+    self._memory[key] = buf
+    self.nbytes += len(buf) * buf.itemsize
+    self._evict()
+    return Stream(iter(buf))
+
+  def discard(self, key):
+    """ Removes the data stored for the key, if any. """
+    if key in self._memory:
+      buf = self._memory.pop(key)
+      self.nbytes -= len(buf) * buf.itemsize
+    elif key in self._disk:
+      self._remove_file(*self._disk.pop(key))
+
+  def clear(self):
+    """ Removes everything, including the spilled files. """
+    self._memory.clear()
+    self.nbytes = 0
+    _remove_spilled(self._disk)
+    self.disk_nbytes = 0
+
+  def close(self):
+    """
+    Removes everything, including the spilled files, like ``clear``. Called
+    when leaving a ``with`` block.
+    """
+    self.clear()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def memoize(self, func):
+    """
+    Decorator to store the results from the given function in this cache,
+    with its arguments (which should be hashable) as the key, returning
+    a replay Stream of the stored data.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+      key = func, args, tuple(sorted(iteritems(kwargs)))
+      try:
+        return self.replay(key)
+      except KeyError:
+        return self.store(key, func(*args, **kwargs))
+    return wrapper
+
+  def _evict(self):
+    """ Moves or removes the least recently used data when needed. """
+    while self.nbytes > self.max_bytes:
+      key, buf = self._memory.popitem(last=False)
+      self.nbytes -= len(buf) * buf.itemsize
+      if self.spill_dir is not None and len(buf):
+        self._spill(key, buf)
+    if self.max_disk_bytes is not None:
+      while self.disk_nbytes > self.max_disk_bytes:
+        self._remove_file(*self._disk.popitem(last=False)[1])
+
+  def _spill(self, key, buf):
+    """ Stores the buffer in a new memory-mapped file. """
+    import mmap, tempfile
+    fd, fname = tempfile.mkstemp(prefix="audiolazy_", suffix=".raw",
+                                 dir=self.spill_dir or None)
+    with os.fdopen(fd, "wb") as f:
+      buf.tofile(f)
+    with open(fname, "rb") as f:
+      mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    self._disk[key] = fname, mapped
+    self.disk_nbytes += len(mapped)
+
+  def _remove_file(self, fname, mapped):
+    """ Removes a spilled file, updating the disk usage. """
+    self.disk_nbytes -= len(mapped)
+    _remove_spilled_file(fname)
@@ -25,6 +25,7 @@ from __future__ import division
 import operator
 from cmath import exp as complex_exp
 from collections import Iterable, OrderedDict
+from numbers import Number
 import itertools as it
 from functools import reduce
 
@@ -33,15 +34,16 @@ from .lazy_stream import Stream, avoid_stream, thub
 from .lazy_misc import elementwise, zero_pad, sHz, almost_eq
 from .lazy_text import (float_str, multiplication_formatter,
                         pair_strings_sum_formatter)
-from .lazy_compat import meta, iteritems, xrange, im_func
+from .lazy_compat import meta, iteritems, xrange, xzip, im_func, INT_TYPES
 from .lazy_poly import Poly
 from .lazy_core import AbstractOperatorOverloaderMeta, StrategyDict
 from .lazy_math import (exp, sin, cos, sqrt, pi, nan, dB20, phase,
-                        absolute, e, inf)
+                        absolute, e, inf, log, ceil)
 
 __all__ = ["LinearFilterProperties", "LinearFilter", "ZFilterMeta", "ZFilter",
            "z", "FilterListMeta", "FilterList", "CascadeFilter",
-           "ParallelFilter", "comb", "resonator", "lowpass", "highpass"]
+           "ParallelFilter", "comb", "frac_delay", "resonator", "lowpass",
+           "highpass"]
 
 
 class LinearFilterProperties(object):
@@ -106,11 +108,93 @@ def _exec_eval(data, expr):
   return eval(expr, ns)
 
 
+def _freq_array(freq):
+  """
+  Gets a 1-D NumPy array from a list, tuple or 1-D array of frequencies to
+  be evaluated all at once, or None when they should be evaluated one at a
+  time (e.g. Stream, generator or NumPy isn't available).
+  """
+  if not (isinstance(freq, (list, tuple)) or
+          type(freq).__name__ == "ndarray"):
+    return None
+  try:
+    import numpy as np
+    freqs = np.array(freq, dtype=float)
+  except (ImportError, TypeError, ValueError):
+    return None
+  return freqs if freqs.ndim == 1 else None
+
+
+def _freq_array_cast(freq, data):
+  """
+  Casts the frequency response data array back to the ``freq`` type.
+  """
+  if isinstance(freq, tuple):
+    return tuple(data.tolist())
+  if isinstance(freq, list):
+    return data.tolist()
+  return data
+
+
+def _poly_freq_array(poly, freqs):
+  """
+  Evaluates the given Poly instance with ``x = e ** (-1j * freqs)`` for a
+  whole 1-D array ``freqs``, with a Horner scheme for dense integer powers
+  or summing each term otherwise. Returns None when the coefficients
+  aren't numbers.
+  """
+  import numpy as np
+  terms = list(poly.terms())
+  if not all(isinstance(value, Number) for power, value in terms):
+    return None
+  if not terms:
+    return np.zeros(len(freqs), dtype=complex)
+  powers = [power for power, value in terms]
+  start, stop = min(powers), max(powers)
+  if all(isinstance(power, INT_TYPES) for power in powers) and \
+     stop - start < 4 * len(terms): # Dense
+    x = np.exp(-1j * freqs)
+    dense = dict(terms)
+    result = np.zeros(len(freqs), dtype=complex) + dense.get(stop, 0)
+    for power in xrange(stop - 1, start - 1, -1):
+      result *= x
+      if power in dense:
+        result += dense[power]
+    return result if start == 0 else result * np.exp(-1j * start * freqs)
+  return sum(value * np.exp(-1j * power * freqs) for power, value in terms)
+
+
+def _control_rate_blocks(data, size, interpolate):
+  """
+  Sample rate generator from the control rate ``data`` iterable, where each
+  control value is either hold or linearly interpolated up to the next one
+  in blocks with ``size`` samples.
+  """
+  if not interpolate:
+    return it.chain.from_iterable(it.repeat(value, size) for value in data)
+  steps = [k / size for k in xrange(size)]
+  def ramps():
+    iterator = iter(data)
+    try:
+      last = next(iterator)
+    except StopIteration:
+      return
+    for value in iterator:
+      delta = value - last
+      yield [last + delta * step for step in steps]
+      last = value
+    yield [last] * size
+  return it.chain.from_iterable(ramps())
+
+
 @avoid_stream
 class LinearFilter(LinearFilterProperties):
   """
   Base class for Linear filters, time invariant or not.
   """
+  max_shift_memory = 24 # Shift assignments per sample always allowed
+  delay_line_tap_cost = 12 # Shift assignments worth one delay line tap
+
   def __init__(self, numerator=None, denominator=None):
     if isinstance(numerator, LinearFilter):
       # Filter type cast
@@ -149,8 +233,9 @@ class LinearFilter(LinearFilterProperties):
     memory :
       Might be an iterable or a callable. Generally, as a iterable, the first
       needed elements from this input will be used directly as the memory
-      (not the last ones!), and as a callable, it will be called with the
-      size as the only positional argument, and should return an iterable.
+      (not the last ones!), and as a callable (e.g. ``white_noise``, but not
+      a Stream), it will be called with the size as the only positional
+      argument, and should return an iterable.
       If ``None`` (default), memory is initialized with zeros.
     zero :
       Value to fill the memory, when needed, and to be seem as previous
@@ -160,21 +245,25 @@ class LinearFilter(LinearFilterProperties):
     -------
     A Stream that have the data from the input sequence filtered.
 
+    Note
+    ----
+    Past samples are usually kept in variables shifted every sample, which
+    costs a lot for long and sparse filters, like ``comb`` and reverbs. When
+    the number of past samples to be kept is greater than
+    ``max_shift_memory + delay_line_tap_cost * taps``, where ``taps`` is the
+    number of non-zero coefficients for past samples, they're stored in
+    circular buffers (delay lines) instead, and only the non-zero taps have
+    a per-sample cost. Both are class attributes that can be changed in the
+    instance (e.g. ``max_shift_memory = inf`` forces the shifting approach).
+
     """
     # Data check
     if any(key < 0 for key, value in it.chain(self.numpoly.terms(),
                                               self.denpoly.terms())
           ):
       raise ValueError("Non-causal filter")
-    if isinstance(self.denpoly[0], Stream): # Variable output gain
-      den = self.denpoly
-      inv_gain = 1 / den[0]
-      den[0] = 0
-      den *= inv_gain.copy()
-      den[0] = 1
-      return ZFilter(self.numpoly * inv_gain, den)(seq, memory=memory,
-                                                   zero=zero)
-    if self.denpoly[0] == 0:
+    gain = self.denpoly[0]
+    if not isinstance(gain, Iterable) and gain == 0:
       raise ZeroDivisionError("Invalid filter gain")
 
     # Lengths
@@ -185,7 +274,8 @@ class LinearFilter(LinearFilterProperties):
     if memory is None:
       memory = [zero for unused in xrange(lm)]
     else: # Get data from iterable
-      if not isinstance(memory, Iterable): # Function with 1 parameter: size
+      # Function with 1 parameter: size (Streams are callable elementwise)
+      if callable(memory) and not isinstance(memory, Stream):
         memory = memory(lm)
       tw = it.takewhile(lambda pair: pair[0] < lm,
                         enumerate(memory))
@@ -194,6 +284,22 @@ class LinearFilter(LinearFilterProperties):
       if actual_len < lm:
         memory = list(zero_pad(memory, lm - actual_len, zero=zero))
 
+    # Past input (d) and output (m) data are either kept in variables
+    # shifted every sample or in circular buffers (delay lines) with a
+    # single index, touching only the non-zero taps (sparse filters)
+    taps = sum(1 for delay, coeff in it.chain(iteritems(self.numdict),
+                                              iteritems(self.dendict))
+                 if delay > 0 and (isinstance(coeff, Iterable) or coeff != 0))
+    size = max(lm, lb - 1)
+    ring = lm + lb - 1 > self.max_shift_memory + \
+                         self.delay_line_tap_cost * taps
+    if ring:
+      dvar = lambda idx: "xbuf[i - {}]".format(idx) if idx else "d0"
+      mvar = "ybuf[i - {}]".format
+    else:
+      dvar = "d{}".format
+      mvar = "m{}".format
+
     # Creates the expression in a string
     data_sum = []
 
@@ -201,70 +307,96 @@ class LinearFilter(LinearFilterProperties):
     for delay, coeff in iteritems(self.numdict):
       if isinstance(coeff, Iterable):
         num_iterables.append(delay)
-        data_sum.append("next(b{idx}) * d{idx}".format(idx=delay))
+        data_sum.append("b{idx} * {d}".format(idx=delay, d=dvar(delay)))
       elif coeff == 1:
-        data_sum.append("d{idx}".format(idx=delay))
+        data_sum.append(dvar(delay))
       elif coeff == -1:
-        data_sum.append("-d{idx}".format(idx=delay))
+        data_sum.append("-" + dvar(delay))
       elif coeff != 0:
-        data_sum.append("{value} * d{idx}".format(idx=delay, value=coeff))
+        data_sum.append("{value} * {d}".format(d=dvar(delay), value=coeff))
 
     den_iterables = []
     for delay, coeff in iteritems(self.dendict):
-      if isinstance(coeff, Iterable):
+      if delay == 0:
+        if isinstance(coeff, Iterable): # Variable output gain
+          den_iterables.append(delay)
+      elif isinstance(coeff, Iterable):
         den_iterables.append(delay)
-        data_sum.append("-next(a{idx}) * m{idx}".format(idx=delay))
-      elif delay == 0:
-        gain = coeff
+        data_sum.append("-a{idx} * {m}".format(idx=delay, m=mvar(delay)))
       elif coeff == -1:
-        data_sum.append("m{idx}".format(idx=delay))
+        data_sum.append(mvar(delay))
       elif coeff == 1:
-        data_sum.append("-m{idx}".format(idx=delay))
+        data_sum.append("-" + mvar(delay))
       elif coeff != 0:
-        data_sum.append("-{value} * m{idx}".format(idx=delay, value=coeff))
+        data_sum.append("-{value} * {m}".format(m=mvar(delay), value=coeff))
 
     # Creates the generator function for this call
     if len(data_sum) == 0:
-      gen_func =  ["def gen(seq, memory, zero):",
+      gen_func =  ["def gen(seq, memory, zero, izip, coeffs):",
                    "  for unused in seq:",
                    "    yield {zero}".format(zero=zero)
                   ]
     else:
       expr = " + ".join(data_sum)
-      if gain == -1:
+      if isinstance(gain, Iterable):
+        expr = "({expr}) / a0".format(expr=expr)
+      elif gain == -1:
         expr = "-({expr})".format(expr=expr)
       elif gain != 1:
         expr = "({expr}) / {gain}".format(expr=expr, gain=gain)
 
-      arg_names = ["seq", "memory", "zero"]
-      arg_names.extend("b{idx}".format(idx=idx) for idx in num_iterables)
-      arg_names.extend("a{idx}".format(idx=idx) for idx in den_iterables)
-      gen_func =  ["def gen({args}):".format(args=", ".join(arg_names))]
-      if la > 1:
-        gen_func += ["  {m_vars} = memory".format(m_vars=" ".join(
-                      ["m{} ,".format(el) for el in xrange(1, la)]
-                    ))]
-      if lb > 1:
-        gen_func += ["  {d_vars} = zero".format(d_vars=" = ".join(
-                      ["d{}".format(el) for el in xrange(1, lb)]
-                    ))]
-      gen_func += ["  for d0 in seq:",
-                   "    m0 = {expr}".format(expr=expr),
-                   "    yield m0"]
-      gen_func += ["    m{idx} = m{idxold}".format(idx=idx, idxold=idx - 1)
-                   for idx in xrange(lm, 0, -1)]
-      gen_func += ["    d{idx} = d{idxold}".format(idx=idx, idxold=idx - 1)
-                   for idx in xrange(lb - 1, 0, -1)]
+      # Time variant coefficients are iterated together with the input
+      coeff_names = ["b{idx}".format(idx=idx) for idx in num_iterables] + \
+                    ["a{idx}".format(idx=idx) for idx in den_iterables]
+      if coeff_names:
+        loop = "  for d0, {names} in izip(seq, *coeffs):".format(
+                 names=", ".join(coeff_names))
+      else:
+        loop = "  for d0 in seq:"
+      gen_func =  ["def gen(seq, memory, zero, izip, coeffs):"]
+      if ring: # Negative indices from "i - delay" wraps around the buffers
+        if la > 1:
+          gen_func += ["  ybuf = [zero] * {pad} + memory[::-1]"
+                       .format(pad=size - lm)]
+        if lb > 1:
+          gen_func += ["  xbuf = [zero] * {size}".format(size=size)]
+        gen_func += ["  i = 0",
+                     loop,
+                     "    m0 = {expr}".format(expr=expr),
+                     "    yield m0"]
+        if la > 1:
+          gen_func += ["    ybuf[i] = m0"]
+        if lb > 1:
+          gen_func += ["    xbuf[i] = d0"]
+        gen_func += ["    i += 1",
+                     "    if i == {size}:".format(size=size),
+                     "      i = 0"]
+      else:
+        if la > 1:
+          gen_func += ["  {m_vars} = memory".format(m_vars=" ".join(
+                        ["m{} ,".format(el) for el in xrange(1, la)]
+                      ))]
+        if lb > 1:
+          gen_func += ["  {d_vars} = zero".format(d_vars=" = ".join(
+                        ["d{}".format(el) for el in xrange(1, lb)]
+                      ))]
+        gen_func += [loop,
+                     "    m0 = {expr}".format(expr=expr),
+                     "    yield m0"]
+        gen_func += ["    m{idx} = m{idxold}".format(idx=idx,
+                                                     idxold=idx - 1)
+                     for idx in xrange(lm, 0, -1)]
+        gen_func += ["    d{idx} = d{idxold}".format(idx=idx,
+                                                     idxold=idx - 1)
+                     for idx in xrange(lb - 1, 0, -1)]
 
     # Uses the generator function to return the desired values
     gen = _exec_eval("\n".join(gen_func), "gen")
-    arguments = [iter(seq), memory, zero]
-    arguments.extend(iter(self.numpoly[idx]) for idx in num_iterables)
-    arguments.extend(iter(self.denpoly[idx]) for idx in den_iterables)
-    return Stream(gen(*arguments))
+    coeffs = [iter(self.numpoly[idx]) for idx in num_iterables] + \
+             [iter(self.denpoly[idx]) for idx in den_iterables]
+    return Stream(gen(iter(seq), memory, zero, xzip, coeffs))
 
 
-  @elementwise("freq", 1)
   def freq_response(self, freq):
     """
     Frequency response for this filter.
@@ -276,7 +408,11 @@ class LinearFilter(LinearFilterProperties):
 
     Returns
     -------
-    Complex number with the frequency response of the filter.
+    Complex number with the frequency response of the filter. For lists,
+    tuples and NumPy arrays of frequencies, a container of the same type
+    with the complex values, evaluated all at once with NumPy when
+    possible. The response is ``nan`` where the denominator is zero, for
+    every input type.
 
     See Also
     --------
@@ -292,6 +428,20 @@ class LinearFilter(LinearFilterProperties):
       Matplotlib figure.
 
     """
+    freqs = _freq_array(freq)
+    if freqs is not None:
+      num = _poly_freq_array(self.numpoly, freqs)
+      den = _poly_freq_array(self.denpoly, freqs)
+      if num is not None and den is not None:
+        import numpy as np
+        with np.errstate(divide="ignore", invalid="ignore"):
+          data = num / den
+        data[den == 0] = nan
+        return _freq_array_cast(freq, data)
+    return self._freq_response(freq)
+
+  @elementwise("freq", 1)
+  def _freq_response(self, freq):
     z_ = complex_exp(-1j * freq)
     num = self.numpoly(z_)
     den = self.denpoly(z_)
@@ -372,6 +522,49 @@ class LinearFilter(LinearFilterProperties):
             new_poly[key] = value
     return self.__class__(*data)
 
+  def control_rate(self, size, interpolate=True):
+    """
+    Time variant filter whose Stream/iterable coefficients are control rate
+    data, i.e., each coefficient value is used for ``size`` samples, which
+    allows computing these coefficients far less often than the filter
+    input, e.g. when sweeping a filter frequency.
+
+    Parameters
+    ----------
+    size :
+      Number of samples per control value (block size).
+    interpolate :
+      Chooses whether the coefficients should be linearly interpolated from
+      one control value to the next (avoiding "zipper" noise) or hold
+      constant for the whole block. Defaults to True.
+
+    Returns
+    -------
+    A new linear filter, with the same constant coefficients, whose
+    coefficients iterables were expanded to the sample rate block-wise.
+
+    Examples
+    --------
+    >>> filt = 1 + Stream(1., 3., 2.) * z ** -1
+    >>> held = filt.control_rate(4, interpolate=False)
+    >>> held
+    1 + b1 * z^-1
+    >>> held(Stream(1.)).take(8)
+    [1.0, 2.0, 2.0, 2.0, 4.0, 4.0, 4.0, 4.0]
+    >>> filt = 1 + Stream(1., 3., 2.) * z ** -1 # Stream was consumed above
+    >>> filt.control_rate(4).numpoly[1].take(12)
+    [1.0, 1.5, 2.0, 2.5, 3.0, 2.75, 2.5, 2.25, 2.0, 1.75, 1.5, 1.25]
+
+    """
+    data = []
+    for poly in [self.numpoly, self.denpoly]:
+      data.append({})
+      for k, v in poly.terms():
+        if isinstance(v, Iterable):
+          v = Stream(_control_rate_blocks(v, size, interpolate))
+        data[-1][k] = v
+    return self.__class__(*data)
+
   def plot(self, fig=None, samples=2048, rate=None, min_freq=0., max_freq=pi,
            blk=None, unwrap=True, freq_scale="linear", mag_scale="dB"):
     """
@@ -654,7 +847,7 @@ class LinearFilter(LinearFilterProperties):
       Denominator polynomials where *x* is ``z``.
 
     """
-    return self.denpolyz.roots
+    return list(self._lti_cached("poles", lambda: self.denpolyz.roots))
 
   @property
   def zeros(self):
@@ -676,7 +869,138 @@ class LinearFilter(LinearFilterProperties):
       Denominator polynomials where *x* is ``z``.
 
     """
-    return self.numpolyz.roots
+    return list(self._lti_cached("zeros", lambda: self.numpolyz.roots))
+
+  def _lti_cached(self, name, func):
+    """
+    Gets the ``func()`` result, stored in a cache that keeps it while the
+    filter coefficients remain the same, since finding roots (e.g. poles and
+    zeros) is expensive. Only LTI filters results are stored.
+    """
+    if not self.is_lti():
+      return func()
+    key = tuple(self.numpoly.terms()), tuple(self.denpoly.terms())
+    if getattr(self, "_cache_key", None) != key: # Coefficients had changed
+      self._cache_key = key
+      self._cache = {}
+    if name not in self._cache:
+      self._cache[name] = func()
+    return self._cache[name]
+
+  def is_stable(self):
+    """
+    Stability test for this LTI filter, i.e., whether all its poles are
+    inside the unit circle. Critical stability (a pole with magnitude equals
+    to one) is seem as an instability. Needs Numpy.
+
+    Returns
+    -------
+    Boolean returning True if this filter is stable, False otherwise.
+
+    See Also
+    --------
+    parcor_stable :
+      Stability test from the partial correlation (reflection) coefficients.
+
+    """
+    if not self.is_lti():
+      raise AttributeError("Filter is not time invariant (LTI)")
+    return self._lti_cached("stable",
+                            lambda: all(abs(pole) < 1 for pole in self.poles))
+
+  def group_delay(self, freq):
+    """
+    Group delay for this LTI filter, i.e., the negative derivative of the
+    phase response with respect to the frequency.
+
+    Parameters
+    ----------
+    freq :
+      Frequency, in rad/sample. Can be an iterable with frequencies, with
+      the same behaviour of ``freq_response``.
+
+    Returns
+    -------
+    The group delay, in samples.
+
+    Examples
+    --------
+    >>> round((z ** -3).group_delay(.4), 7)
+    3.0
+    >>> [round(gd, 7) for gd in (1 + z ** -2).group_delay([0, .5, 1])]
+    [1.0, 1.0, 1.0]
+
+    """
+    if not self.is_lti():
+      raise AttributeError("Filter is not time invariant (LTI)")
+    freqs = _freq_array(freq)
+    if freqs is not None:
+      import numpy as np
+      num_ramp, num, den_ramp, den = [filt.freq_response(freqs)
+                                      for filt in self._ramp_filters]
+      with np.errstate(divide="ignore", invalid="ignore"):
+        data = (num_ramp / num).real - (den_ramp / den).real
+      data[(num == 0) | (den == 0)] = nan
+      return _freq_array_cast(freq, data)
+    return self._group_delay(freq)
+
+  @elementwise("freq", 1)
+  def _group_delay(self, freq):
+    num_ramp, num, den_ramp, den = [filt.freq_response(freq)
+                                    for filt in self._ramp_filters]
+    if num == 0 or den == 0:
+      return nan
+    return (num_ramp / num).real - (den_ramp / den).real
+
+  @property
+  def _ramp_filters(self):
+    """
+    Numerator and denominator as FIR filters, each preceded by a "ramped"
+    version of itself (i.e., with each coefficient multiplied by its delay),
+    whose frequency responses ratio gives the group delay.
+    """
+    return self._lti_cached("ramps", lambda: [
+      ZFilter(Poly({k: k * v for k, v in self.numpoly.terms()})),
+      ZFilter(self.numpoly),
+      ZFilter(Poly({k: k * v for k, v in self.denpoly.terms()})),
+      ZFilter(self.denpoly),
+    ])
+
+  def impulse_length(self, tol=1e-4):
+    """
+    Estimates the impulse response length for this LTI filter, i.e., the
+    number of samples needed for its envelope to decay to ``tol``, from the
+    pole with the largest magnitude. Needs Numpy for IIR filters.
+
+    Parameters
+    ----------
+    tol :
+      Amplitude tolerance, relative to the impulse amplitude. Defaults to
+      ``1e-4``, or -80 dB.
+
+    Returns
+    -------
+    Number of samples as an integer, or ``inf`` for unstable filters.
+
+    Examples
+    --------
+    >>> (1 + z ** -1 - z ** -2).impulse_length() # FIR
+    3
+
+    """
+    if not self.is_lti():
+      raise AttributeError("Filter is not time invariant (LTI)")
+    def estimate():
+      fir_len = len(self.numerator)
+      if len(self.denominator) == 1:
+        return fir_len
+      radius = max(abs(pole) for pole in self.poles)
+      if radius >= 1:
+        return inf
+      if radius == 0:
+        return fir_len + len(self.denominator) - 1
+      return fir_len + int(ceil(log(tol) / log(radius)))
+    return self._lti_cached(("impulse_length", tol), estimate)
 
   def __eq__(self, other):
     if isinstance(other, LinearFilter):
@@ -849,8 +1173,9 @@ class ZFilter(meta(LinearFilter, metaclass=ZFilterMeta)):
     memory :
       Might be an iterable or a callable. Generally, as a iterable, the first
       needed elements from this input will be used directly as the memory
-      (not the last ones!), and as a callable, it will be called with the
-      size as the only positional argument, and should return an iterable.
+      (not the last ones!), and as a callable (e.g. ``white_noise``, but not
+      a Stream), it will be called with the size as the only positional
+      argument, and should return an iterable.
       If ``None`` (default), memory is initialized with zeros. Neglect when
       ``seq`` input is a ZFilter.
     zero :
@@ -1003,8 +1328,16 @@ class CascadeFilter(FilterList):
     except AttributeError:
       raise AttributeError("Non-linear filter")
 
-  @elementwise("freq", 1)
   def freq_response(self, freq):
+    freqs = _freq_array(freq)
+    if freqs is not None and self.is_lti():
+      return _freq_array_cast(freq, reduce(operator.mul,
+                                           (filt.freq_response(freqs)
+                                            for filt in self.callables)))
+    return self._freq_response(freq)
+
+  @elementwise("freq", 1)
+  def _freq_response(self, freq):
     return reduce(operator.mul, (filt.freq_response(freq)
                                  for filt in self.callables))
 
@@ -1066,8 +1399,16 @@ class ParallelFilter(FilterList):
     except AttributeError:
       raise AttributeError("Non-linear filter")
 
-  @elementwise("freq", 1)
   def freq_response(self, freq):
+    freqs = _freq_array(freq)
+    if freqs is not None and self.is_lti():
+      return _freq_array_cast(freq, reduce(operator.add,
+                                           (filt.freq_response(freqs)
+                                            for filt in self.callables)))
+    return self._freq_response(freq)
+
+  @elementwise("freq", 1)
+  def _freq_response(self, freq):
     return reduce(operator.add, (filt.freq_response(freq)
                                  for filt in self.callables))
 
@@ -1173,6 +1514,75 @@ def comb(delay, alpha=1):
   return 1 + alpha * z ** -delay
 
 
+frac_delay = StrategyDict("frac_delay")
+
+
+@frac_delay.strategy("linear", "lagrange1")
+def frac_delay(delay):
+  """
+  Fractional delay line with linear interpolation (1st order Lagrange).
+
+    ``y[n] = (1 - frac) * x[n - N] + frac * x[n - N - 1]``
+
+  Where ``N`` is the integer part of ``delay`` and ``frac`` its fractional
+  part. It has a lowpass effect when ``frac`` isn't zero.
+
+  Parameters
+  ----------
+  delay :
+    Delay (lag), in number of samples. Shouldn't be negative.
+
+  Returns
+  -------
+  A ZFilter instance with the delay line.
+
+  Examples
+  --------
+  >>> frac_delay(2.25)
+  0.75 * z^-2 + 0.25 * z^-3
+  >>> frac_delay(3)
+  z^-3
+
+  """
+  return (z ** -delay).linearize()
+
+
+@frac_delay.strategy("allpass", "thiran1")
+def frac_delay(delay):
+  """
+  Fractional delay line with a first order allpass (Thiran) interpolator.
+
+    ``y[n] = eta * x[n - N] + x[n - N - 1] - eta * y[n - 1]``
+
+  Where ``eta = (1 - d) / (1 + d)`` and ``d = delay - N`` is kept in the
+  ``[.5; 1.5)`` range (when possible) to avoid a pole near ``z = -1``.
+  Its magnitude response is flat, which makes it a better choice for
+  long feedback loops (e.g. waveguides and Karplus-Strong), while its phase
+  delay is approximately ``delay`` only for the lower frequencies.
+
+  Parameters
+  ----------
+  delay :
+    Delay (lag), in number of samples. Shouldn't be negative.
+
+  Returns
+  -------
+  A ZFilter instance with the delay line.
+
+  Examples
+  --------
+  >>> frac_delay.allpass(3)
+  z^-3
+
+  """
+  if delay == int(delay):
+    return z ** -int(delay)
+  size = int(delay - .5) if delay >= .5 else 0
+  d = delay - size
+  eta = (1 - d) / (1 + d)
+  return z ** -size * (eta + z ** -1) / (1 + eta * z ** -1)
+
+
 resonator = StrategyDict("resonator")
 
 
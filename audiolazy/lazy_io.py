@@ -23,15 +23,23 @@ Audio recording input and playing output module
 import threading
 import struct
 import array
+import mmap
+import sys
+import itertools as it
+from math import floor
+from bisect import bisect_left
+from collections import deque
+from timeit import default_timer
 
 # Audiolazy internal imports
 from .lazy_stream import Stream
 from .lazy_misc import DEFAULT_SAMPLE_RATE, blocks
-from .lazy_compat import xrange, xmap
+from .lazy_compat import xrange, xmap, STR_TYPES, PYTHON2
 from .lazy_math import inf
 from .lazy_core import StrategyDict
 
-__all__ = ["chunks", "RecStream", "AudioIO", "AudioThread"]
+__all__ = ["chunks", "RecStream", "DeadlineMonitor", "AudioIO", "AudioThread",
+           "AudioFileStream", "AudioFile", "write_audio"]
 
 
 # Conversion dict from structs.Struct() format symbols to PyAudio constants
@@ -106,6 +114,7 @@ def chunks(seq, size=None, dfmt="f", byte_order=None, padval=0.):
   Try each one to find the faster one for your machine, and chooses
   the default one by assigning ``chunks.default = chunks.strategy_name``.
   It'll be the one used by the AudioIO/AudioThread playing mechanism.
+  The ``strategy_bench(chunks, set_default=True)`` call does that.
 
   Note
   ----
@@ -165,24 +174,144 @@ class RecStream(Stream):
     return self._recording
 
 
+class DeadlineMonitor(object):
+  """
+  Real-time deadline statistics for an AudioThread.
+
+  Each chunk has a deadline: it should be rendered (i.e., computed from the
+  audio iterable) in less time than it takes to be played, its period
+  ``chunk_size / rate``. The ratio between these times is the real-time
+  factor (RTF), and the chunks whose RTF is above 1 are counted as
+  ``deadline_misses``. The ``underruns`` (audible glitches) aren't
+  measured, as the device doesn't report them: they're estimated by a
+  latency heuristic, where a chunk rendered in more time than the output
+  ``latency`` (i.e., the audio assumed to be queued in the device when its
+  rendering started) couldn't be written in time. The first chunk isn't
+  counted, as there's nothing queued before it. That count is therefore
+  approximate, and might both miss and overcount actual glitches.
+
+  Parameters
+  ----------
+  callback :
+    Function called with this monitor after each chunk is written, e.g. for
+    raising an alarm when ``last_rtf`` is near to 1. It's called in the
+    audio thread, so it should be fast.
+  history :
+    Number of chunks in the ``history`` deque of ``(render_time,
+    write_time)`` pairs, in seconds. Defaults to 256.
+
+  Note
+  ----
+  The ``histogram`` has a count for each RTF bin, whose upper limits are in
+  the ``rtf_bins`` class attribute (the last bin has no upper limit).
+
+  """
+  rtf_bins = (.125, .25, .5, .75, 1., 1.5, 2.)
+
+  def __init__(self, callback=None, history=256):
+    self.callback = callback
+    self.history = deque(maxlen=history)
+    self.reset()
+
+  def reset(self, rate=DEFAULT_SAMPLE_RATE, chunk_size=None, latency=None):
+    """
+    Clears the statistics, setting the chunk period and the output latency
+    (in seconds, e.g. from ``pyaudio.Stream.get_output_latency``), whose
+    default is the period.
+    """
+    if chunk_size is None:
+      chunk_size = chunks.size
+    self.period = float(chunk_size) / rate # In seconds
+    self.latency = latency or self.period
+    self._render_time = 0.
+    self.chunks = 0
+    self.render_time = 0.
+    self.write_time = 0.
+    self.max_render_time = 0.
+    self.last_rtf = 0.
+    self.deadline_misses = 0
+    self.underruns = 0
+    self.histogram = [0] * (len(self.rtf_bins) + 1)
+    self.history.clear()
+
+  @property
+  def rtf(self):
+    """ Mean real-time factor. """
+    return self.render_time / (self.period * self.chunks) if self.chunks \
+           else 0.
+
+  @property
+  def max_rtf(self):
+    """ Real-time factor of the slowest chunk. """
+    return self.max_render_time / self.period
+
+  def monitored_chunks(self, data):
+    """ Gets the chunks from the given iterable, timing each ``next``. """
+    data = iter(data)
+    while True:
+      start = default_timer()
+      try:
+        chunk = next(data)
+      except StopIteration:
+        return
+      self._render_time = default_timer() - start
+      yield chunk
+
+  def monitored_write(self, write_stream):
+    """
+    Wraps the ``_portaudio.write_stream`` function to time it, registering
+    the chunk rendered by ``monitored_chunks``.
+    """
+    def write(stream, chunk, chunk_size, should_throw_exception):
+      start = default_timer()
+      write_stream(stream, chunk, chunk_size, should_throw_exception)
+      self.register(self._render_time, default_timer() - start)
+    return write
+
+  def register(self, render_time, write_time):
+    """ Stores the times measured for a chunk, in seconds. """
+    self.chunks += 1
+    self.render_time += render_time
+    self.write_time += write_time
+    self.max_render_time = max(self.max_render_time, render_time)
+    self.last_rtf = rtf = render_time / self.period
+    if rtf > 1.:
+      self.deadline_misses += 1
+    if self.chunks > 1 and render_time > self.latency:
+      self.underruns += 1
+    self.histogram[bisect_left(self.rtf_bins, rtf)] += 1
+    self.history.append((render_time, write_time))
+    if self.callback is not None:
+      self.callback(self)
+
+  def __repr__(self):
+    return ("{0}(chunks={1}, rtf={2:.3f}, max_rtf={3:.3f}, "
+            "deadline_misses={4}, underruns={5})").format(
+      type(self).__name__, self.chunks, self.rtf, self.max_rtf,
+      self.deadline_misses, self.underruns,
+    )
+
+
 class AudioIO(object):
   """
   Multi-thread stream manager wrapper for PyAudio.
 
   """
 
-  def __init__(self, wait=False, api=None):
+  def __init__(self, wait=False, api=None, monitor=False):
     """
     Constructor to PyAudio Multi-thread manager audio IO interface.
     The "wait" input is a boolean about the behaviour on closing the
     instance, if it should or not wait for the streaming audio to finish.
     Defaults to False. Only works if the close method is explicitly
-    called.
+    called. The "monitor" input is the default for the AudioThread
+    keyword argument with the same name, used by the play method.
     """
     import pyaudio
     self._pa = pa = pyaudio.PyAudio()
     self._threads = []
     self.wait = wait # Wait threads to finish at end (constructor parameter)
+    self.monitor = monitor
     self._recordings = []
 
     # Lockers
@@ -265,6 +394,7 @@ class AudioIO(object):
     parameters directly sent to PyAudio's new stream opening method, see
     AudioThread.__init__ for more.
     """
+    kwargs.setdefault("monitor", self.monitor)
     with self.lock:
       if self.finished:
         raise threading.ThreadError("Trying to play an audio stream while "
@@ -349,6 +479,7 @@ class AudioThread(threading.Thread):
                      nchannels = 1,
                      rate = DEFAULT_SAMPLE_RATE,
                      daemon = True, # This shouldn't survive after crashes
+                     monitor = False,
                      **kwargs
               ):
     """
@@ -366,6 +497,11 @@ class AudioThread(threading.Thread):
       Sample rate (same input used in sHz).
     daemon :
       Boolean telling if thread should be daemon. Default is True.
+    monitor :
+      A DeadlineMonitor instance to be reset and filled with the real-time
+      statistics for this thread, or True to create a new one. Available
+      as the ``monitor`` attribute, which is None when not monitoring.
+      Default is False.
 
     """
     super(AudioThread, self).__init__()
@@ -401,6 +537,14 @@ class AudioThread(threading.Thread):
                                           output=True,
                                           **kwargs)
 
+    # Real-time deadline monitoring
+    if monitor is True:
+      monitor = DeadlineMonitor()
+    self.monitor = monitor or None
+    if self.monitor is not None:
+      self.monitor.reset(rate=rate, chunk_size=self.chunk_size,
+                         latency=self.stream.get_output_latency())
+
   def run(self):
     """
     Plays the audio. This method plays the audio, and shouldn't be called
@@ -408,13 +552,18 @@ class AudioThread(threading.Thread):
     """
     # From now on, it's multi-thread. Let the force be with them.
     st = self.stream._stream
-
-    for chunk in chunks(self.audio,
-                        size=self.chunk_size*self.nchannels,
-                        dfmt=self.dfmt):
+    data = chunks(self.audio,
+                  size=self.chunk_size*self.nchannels,
+                  dfmt=self.dfmt)
+    write_stream = self.write_stream
+    if self.monitor is not None:
+      data = self.monitor.monitored_chunks(data)
+      write_stream = self.monitor.monitored_write(write_stream)
+
+    for chunk in data:
       #Below is a faster way to call:
       #  self.stream.write(chunk, self.chunk_size)
-      self.write_stream(st, chunk, self.chunk_size, False)
+      write_stream(st, chunk, self.chunk_size, False)
       if not self.go.is_set():
         self.stream.stop_stream()
         if self.halting:
@@ -443,3 +592,597 @@ class AudioThread(threading.Thread):
     """ Resume playing the audio. """
     with self.lock:
       self.go.set()
+
+
+# Sample formats for audio files: (bytes per sample, array typecode, scale)
+_SAMPLE_FORMATS = {"uint8": (1, "B", 2 ** 7),
+                   "int8": (1, "b", 2 ** 7),
+                   "int16": (2, "h", 2 ** 15),
+                   "int24": (3, "i", 2 ** 23),
+                   "int32": (4, "i", 2 ** 31),
+                   "float32": (4, "f", None),
+                   "float64": (8, "d", None),
+                  }
+_NATIVE_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _int24_to_int32(data, big_endian):
+  """
+  Bytes from 24 bits integers to 32 bits integers shifted 8 bits to the
+  left, without converting each sample in Python.
+  """
+  data = bytearray(data)
+  result = bytearray(len(data) // 3 * 4)
+  start = 0 if big_endian else 1
+  for idx in xrange(3):
+    result[start + idx::4] = data[idx::3]
+  return result
+
+
+def _int32_to_int24(data, big_endian):
+  """ Inverse of ``_int24_to_int32``, discarding the least significant byte """
+  data = bytearray(data)
+  result = bytearray(len(data) // 4 * 3)
+  start = 0 if big_endian else 1
+  for idx in xrange(3):
+    result[idx::3] = data[start + idx::4]
+  return result
+
+
+def _pcm_decode(data, sample_format, big_endian):
+  """
+  List of float samples from a bytes chunk with audio file data, all
+  converted at once, using Numpy when available.
+  """
+  width, typecode, scale = _SAMPLE_FORMATS[sample_format]
+  if width == 3:
+    data = _int24_to_int32(data, big_endian)
+    scale <<= 8
+  try:
+    import numpy as np
+  except ImportError:
+    samples = array.array(typecode, bytes(data))
+    if big_endian != _NATIVE_BIG_ENDIAN and samples.itemsize > 1:
+      samples.byteswap()
+    if sample_format == "uint8":
+      return [(el - scale) * (1. / scale) for el in samples]
+    if scale is None:
+      return samples.tolist()
+    inv_scale = 1. / scale
+    return [el * inv_scale for el in samples]
+  dtype = np.dtype(typecode).newbyteorder(">" if big_endian else "<")
+  samples = np.frombuffer(data, dtype=dtype).astype(float)
+  if sample_format == "uint8":
+    samples -= scale
+  if scale is not None:
+    samples *= 1. / scale
+  return samples.tolist()
+
+
+def _pcm_encode(samples, sample_format, big_endian):
+  """
+  Bytes chunk for an audio file from a list of float samples, all converted
+  at once (with clipping for integer formats), using Numpy when available.
+  """
+  width, typecode, scale = _SAMPLE_FORMATS[sample_format]
+  shift = 256 if width == 3 else 1 # Rounded 24 bits values stored as int32
+  try:
+    import numpy as np
+  except ImportError:
+    if scale is not None:
+      low, high = -scale, scale - 1
+      samples = [(high if el > high else
+                  low if el < low else
+                  int(floor(el + .5))) * shift
+                 for el in [el * scale for el in samples]]
+      if sample_format == "uint8":
+        samples = [el + scale for el in samples]
+    data = array.array(typecode, samples)
+    if big_endian != _NATIVE_BIG_ENDIAN and data.itemsize > 1:
+      data.byteswap()
+    data = data.tostring() if PYTHON2 else data.tobytes()
+  else:
+    dtype = np.dtype(typecode).newbyteorder(">" if big_endian else "<")
+    data = np.array(samples, dtype=float)
+    if scale is not None:
+      data = np.clip(np.rint(data * scale), -scale, scale - 1) * shift
+      if sample_format == "uint8":
+        data += scale
+    data = data.astype(dtype).tobytes()
+  if width == 3:
+    return bytes(_int32_to_int24(data, big_endian))
+  return data
+
+
+def _ieee_extended(data):
+  """ Float from the 80 bits IEEE 754 extended precision bytes (AIFF). """
+  exponent, mantissa = struct.unpack(">HQ", bytes(data))
+  sign = -1 if exponent & 0x8000 else 1
+  exponent &= 0x7fff
+  if exponent == mantissa == 0:
+    return 0.
+  return sign * mantissa * 2. ** (exponent - 16383 - 63)
+
+
+def _to_ieee_extended(value):
+  """ Inverse of ``_ieee_extended``, for positive integer values. """
+  value = int(value)
+  exponent = value.bit_length() - 1 + 16383 if value else 0
+  return struct.pack(">HQ", exponent, value << (64 - value.bit_length()))
+
+
+def _iff_chunks(file_obj, start, end, big_endian):
+  """
+  Generator of ``(name, data_position, size)`` for each chunk in the
+  RIFF/IFF file region, without reading the chunks contents.
+  """
+  header = struct.Struct((">" if big_endian else "<") + "4sI")
+  pos = start
+  while pos + 8 <= end:
+    file_obj.seek(pos)
+    name, size = header.unpack(file_obj.read(8))
+    yield name, pos + 8, size
+    pos += 8 + size + (size & 1) # Chunks have an even number of bytes
+
+
+def _audio_file_info(file_obj):
+  """
+  Finds the audio data format and position in a WAV or AIFF file, returning
+  a ``(rate, nchannels, sample_format, big_endian, position, size)`` tuple.
+  """
+  file_obj.seek(0)
+  riff, unused, kind = struct.unpack("<4sI4s", file_obj.read(12))
+  file_obj.seek(0, 2)
+  end = file_obj.tell()
+  if riff in (b"RIFF", b"RIFX") and kind == b"WAVE":
+    big_endian = riff == b"RIFX"
+    bo = ">" if big_endian else "<"
+    info = data = None
+    for name, pos, size in _iff_chunks(file_obj, 12, end, big_endian):
+      file_obj.seek(pos)
+      if name == b"fmt ":
+        fmt_data = file_obj.read(size)
+        tag, nchannels, rate, unused, unused, bits = \
+          struct.unpack(bo + "HHIIHH", fmt_data[:16])
+        if tag == 0xfffe: # WAVE_FORMAT_EXTENSIBLE
+          tag = struct.unpack(bo + "H", fmt_data[24:26])[0]
+        info = tag, nchannels, rate, bits
+      elif name == b"data":
+        data = pos, min(size, end - pos)
+        break
+    if info is None or data is None:
+      raise ValueError("Invalid WAV file")
+    tag, nchannels, rate, bits = info
+    if tag == 1:
+      sample_format = "uint8" if bits == 8 else "int{}".format(bits)
+    elif tag == 3:
+      sample_format = "float{}".format(bits)
+    else:
+      sample_format = None
+
+  elif riff == b"FORM" and kind in (b"AIFF", b"AIFC"):
+    big_endian = True
+    info = data = None
+    for name, pos, size in _iff_chunks(file_obj, 12, end, True):
+      file_obj.seek(pos)
+      if name == b"COMM":
+        comm_data = file_obj.read(size)
+        nchannels, nframes, bits = struct.unpack(">hIh", comm_data[:8])
+        rate = _ieee_extended(comm_data[8:18])
+        if rate == int(rate):
+          rate = int(rate)
+        compression = comm_data[18:22] if kind == b"AIFC" else b"NONE"
+        info = nchannels, nframes, rate, bits, compression
+      elif name == b"SSND":
+        offset = struct.unpack(">I", file_obj.read(4))[0]
+        data = pos + 8 + offset, min(size - 8 - offset, end - pos - 8 - offset)
+    if info is None or data is None:
+      raise ValueError("Invalid AIFF file")
+    nchannels, nframes, rate, bits, compression = info
+    data = data[0], min(data[1], nframes * nchannels * bits // 8)
+    if compression in (b"NONE", b"twos", b"sowt"):
+      big_endian = compression != b"sowt"
+      sample_format = "int{}".format(bits)
+    elif compression in (b"fl32", b"FL32"):
+      sample_format = "float32"
+    elif compression in (b"fl64", b"FL64"):
+      sample_format = "float64"
+    else:
+      sample_format = None
+
+  else:
+    raise ValueError("Unknown audio file format")
+
+  if sample_format not in _SAMPLE_FORMATS:
+    raise ValueError("Unsupported audio sample format")
+  return rate, nchannels, sample_format, big_endian, data[0], data[1]
+
+
+class AudioFileStream(Stream):
+  """
+  Stream with the samples from a WAV or AIFF audio file.
+
+  The file is read in chunks, converting each whole chunk at once to float
+  samples in the [-1; 1] range (or the float values themselves), with
+  multiple channels interleaved. Supports 8, 16, 24 and 32 bits integer
+  (PCM) and 32 or 64 bits float samples.
+
+  Attributes ``rate``, ``nchannels``, ``sample_format`` (a key like
+  ``"int16"`` or ``"float32"``) and ``nframes`` (the number of samples per
+  channel) are read from the file header.
+
+  Parameters
+  ----------
+  source :
+    File name or a seekable binary file object.
+  chunk_size :
+    Number of frames (samples per channel) per read. Defaults to
+    ``chunks.size``.
+  use_mmap :
+    Memory maps the file instead of reading it, which avoids the buffering
+    copies for large files. Ignored if the file object has no ``fileno``.
+
+  See Also
+  --------
+  write_audio :
+    Saves a Stream to a WAV or AIFF audio file.
+
+  """
+  def __init__(self, source, chunk_size=None, use_mmap=False):
+    if chunk_size is None:
+      chunk_size = chunks.size
+    owner = isinstance(source, STR_TYPES)
+    file_obj = open(source, "rb") if owner else source
+    try:
+      (self.rate, self.nchannels, self.sample_format,
+       big_endian, start, size) = _audio_file_info(file_obj)
+    except Exception:
+      if owner:
+        file_obj.close()
+      raise
+    frame_size = _SAMPLE_FORMATS[self.sample_format][0] * self.nchannels
+    self.nframes = size // frame_size
+    end = start + self.nframes * frame_size
+    step = chunk_size * frame_size
+
+    mem = None
+    if use_mmap:
+      try:
+        mem = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+      except (AttributeError, IOError, ValueError):
+        pass
+
+    def data_chunks():
+      try:
+        for pos in xrange(start, end, step):
+          if mem is None:
+            file_obj.seek(pos)
+            data = file_obj.read(min(step, end - pos))
+          else:
+            data = mem[pos:min(pos + step, end)]
+          yield _pcm_decode(data, self.sample_format, big_endian)
+      finally:
+        if mem is not None:
+          mem.close()
+        if owner:
+          file_obj.close()
+
+    super(AudioFileStream, self).__init__(
+      it.chain.from_iterable(data_chunks())
+    )
+
+
+class AudioFile(object):
+  """
+  Memory mapped WAV or AIFF audio file, for random access.
+
+  Many independent readers (Streams, blocks and slices) can share the same
+  memory map without ``tee``, and nothing is loaded before being used.
+  Attributes ``rate``, ``nchannels``, ``sample_format`` and ``nframes`` are
+  the same found in AudioFileStream instances.
+
+  Parameters
+  ----------
+  fname :
+    Audio file name.
+
+  Examples
+  --------
+  >>> import os, shutil, tempfile
+  >>> tmpdir = tempfile.mkdtemp()
+  >>> fname = os.path.join(tmpdir, "ramp.wav")
+  >>> write_audio(fname, [k / 8. for k in range(8)], sample_format="float32")
+  8
+  >>> with AudioFile(fname) as af:
+  ...   reader = af.stream(6)
+  ...   len(af)
+  ...   af[2:5]
+  8
+  [0.25, 0.375, 0.5]
+  >>> reader.take(5) # After closing
+  Traceback (most recent call last):
+    ...
+  ValueError: I/O operation on a closed AudioFile
+  >>> shutil.rmtree(tmpdir)
+
+  """
+  def __init__(self, fname):
+    self._file = open(fname, "rb")
+    try:
+      (self.rate, self.nchannels, self.sample_format, self._big_endian,
+       self._start, size) = _audio_file_info(self._file)
+      self._mem = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception:
+      self._file.close()
+      raise
+    self._frame_size = _SAMPLE_FORMATS[self.sample_format][0] * self.nchannels
+    self.nframes = size // self._frame_size
+
+  def __len__(self):
+    return self.nframes
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, etype, evalue, etraceback):
+    self.close()
+
+  def close(self):
+    """
+    Closes the file. The memory map is kept while there are Numpy arrays
+    using it, being closed afterwards by the garbage collector. Afterwards,
+    the readers (Streams, slices and blocks) raise ValueError when they need
+    more data from the file.
+    """
+    self._mem = None # Explicitly closing it would invalidate the arrays
+    self._file.close()
+
+  def _get_mem(self):
+    """ The memory map, raising ValueError when the file is closed. """
+    if self._mem is None:
+      raise ValueError("I/O operation on a closed AudioFile")
+    return self._mem
+
+  def _decode(self, start, stop):
+    """ Float samples list for the frames in the given range. """
+    return _pcm_decode(self._get_mem()[self._start + start * self._frame_size:
+                                       self._start + stop * self._frame_size],
+                       self.sample_format, self._big_endian)
+
+  def __getitem__(self, index):
+    """
+    Float samples list (channels interleaved) from a slice of frames, or a
+    single sample for an integer index in a single channel file.
+    """
+    if isinstance(index, slice):
+      start, stop, step = index.indices(self.nframes)
+      if step == 1:
+        return self._decode(start, max(start, stop))
+      return [el for idx in xrange(start, stop, step)
+                 for el in self._decode(idx, idx + 1)]
+    if index < 0:
+      index += self.nframes
+    if not 0 <= index < self.nframes:
+      raise IndexError("Audio file frame index out of range")
+    result = self._decode(index, index + 1)
+    return result[0] if self.nchannels == 1 else result
+
+  def stream(self, start=0, stop=None, chunk_size=None):
+    """
+    Stream with the float samples (channels interleaved) from the frame
+    ``start`` up to (but not including) the frame ``stop``, reading the
+    memory map in chunks of ``chunk_size`` frames. Each call gives a new
+    independent reader.
+    """
+    if chunk_size is None:
+      chunk_size = chunks.size
+    start, stop, unused = slice(start, stop).indices(self.nframes)
+    return Stream(it.chain.from_iterable(
+      self._decode(pos, min(pos + chunk_size, stop))
+      for pos in xrange(start, stop, chunk_size)
+    ))
+
+  def array(self):
+    """
+    Numpy array with the raw file data, shaped ``(nframes, nchannels)``,
+    directly using the memory map (no data is copied). The values are in the
+    file sample format, i.e., not scaled to [-1; 1] for integer data.
+    Returns None for the 24 bits sample format, which has no Numpy dtype.
+    """
+    width, typecode, unused = _SAMPLE_FORMATS[self.sample_format]
+    if width == 3:
+      return None
+    import numpy as np
+    dtype = np.dtype(typecode).newbyteorder(">" if self._big_endian else "<")
+    return np.frombuffer(self._get_mem(), dtype=dtype,
+                         count=self.nframes * self.nchannels,
+                         offset=self._start
+                        ).reshape(self.nframes, self.nchannels)
+
+  def blocks(self, size, hop=None, start=0, stop=None, channel=None,
+             padval=0.):
+    """
+    Block generator with the same behaviour of ``audiolazy.blocks`` over the
+    file frames, but yielding Numpy arrays with the float samples.
+
+    Parameters
+    ----------
+    size, hop, padval :
+      Block size, hop size and padding value for the last block, as in
+      ``audiolazy.blocks``.
+    start, stop :
+      Frame range for the blocks. Defaults to the whole file.
+    channel :
+      Channel index, for 1-D blocks with its samples. Defaults to None, which
+      means every channel: 1-D blocks for a single channel file, or 2-D
+      ``(size, nchannels)`` blocks otherwise.
+
+    Note
+    ----
+    For native byte order float files, blocks (but the padded last one) are
+    views of the memory map, i.e., the data isn't copied and they shouldn't
+    be changed. Integer samples are scaled to floats block by block.
+
+    """
+    import numpy as np
+    if hop is None:
+      hop = size
+    start, stop, unused = slice(start, stop).indices(self.nframes)
+    raw = self.array()
+    if channel is None and self.nchannels == 1:
+      channel = 0
+    width, unused, scale = _SAMPLE_FORMATS[self.sample_format]
+
+    def get(begin, end):
+      if raw is None: # 24 bits
+        data = np.array(self._decode(begin, end)
+                       ).reshape(end - begin, self.nchannels)
+      else:
+        data = raw[begin:end]
+        if scale is not None:
+          data = data.astype(float)
+          if self.sample_format == "uint8":
+            data -= scale
+          data *= 1. / scale
+        elif not data.dtype.isnative:
+          data = data.astype(data.dtype.newbyteorder("="))
+      return data if channel is None else data[:, channel]
+
+    overlap = max(size - hop, 0)
+    for begin in xrange(start, stop, hop):
+      if begin + size <= stop:
+        yield get(begin, begin + size)
+      else:
+        if stop - begin > overlap:
+          data = get(begin, stop)
+          pad = np.empty((size - len(data),) + data.shape[1:])
+          pad.fill(padval)
+          yield np.concatenate([data, pad])
+        break
+
+
+def write_audio(dest, data, rate=DEFAULT_SAMPLE_RATE, nchannels=1,
+                sample_format="int16", file_format=None, chunk_size=None):
+  """
+  Saves the data to a WAV or AIFF audio file.
+
+  The data is written in large chunks, each one converted at once from
+  floats to the ``sample_format`` (integer formats are clipped to [-1; 1]
+  before the conversion).
+
+  Parameters
+  ----------
+  dest :
+    File name or a seekable binary file object.
+  data :
+    Iterable with the samples (e.g. a Stream), with multiple channels
+    interleaved. An incomplete last frame is zero-padded.
+  rate :
+    Sample rate, in samples/second.
+  nchannels :
+    Number of channels.
+  sample_format :
+    One of ``"uint8"`` (WAV only), ``"int8"`` (AIFF only), ``"int16"``
+    (default), ``"int24"``, ``"int32"``, ``"float32"`` and ``"float64"``.
+  file_format :
+    Either ``"wav"`` or ``"aiff"``. Defaults to the one from the file
+    name extension, or to ``"wav"`` when it's unknown.
+  chunk_size :
+    Number of frames (samples per channel) per write. Defaults to
+    ``chunks.size``.
+
+  Returns
+  -------
+  The number of frames written.
+
+  Examples
+  --------
+  >>> from io import BytesIO
+  >>> from audiolazy import line
+  >>> wav = BytesIO()
+  >>> write_audio(wav, line(4, -1, 1, finish=True), rate=8000)
+  4
+  >>> data = AudioFileStream(wav)
+  >>> data.rate, data.nchannels, data.sample_format, data.nframes
+  (8000, 1, 'int16', 4)
+  >>> [round(el, 4) for el in data]
+  [-1.0, -0.3333, 0.3333, 1.0]
+
+  """
+  if chunk_size is None:
+    chunk_size = chunks.size
+  if file_format is None:
+    ext = dest.rsplit(".", 1)[-1].lower() if isinstance(dest, STR_TYPES) \
+          else "wav"
+    file_format = "aiff" if ext in ("aif", "aiff", "aifc") else "wav"
+  if file_format not in ("wav", "aiff"):
+    raise ValueError("Unknown audio file format")
+  if sample_format == ("int8" if file_format == "wav" else "uint8") or \
+     sample_format not in _SAMPLE_FORMATS:
+    raise ValueError("Unsupported audio sample format")
+  width = _SAMPLE_FORMATS[sample_format][0]
+  is_float = sample_format.startswith("float")
+  big_endian = file_format == "aiff"
+
+  owner = isinstance(dest, STR_TYPES)
+  file_obj = open(dest, "wb") if owner else dest
+  try:
+    # Header with the sizes to be filled later
+    base = file_obj.tell()
+    if file_format == "wav":
+      fmt_size = 18 if is_float else 16
+      header = [b"RIFF", b"\0" * 4, b"WAVE",
+                b"fmt ", struct.pack("<IHHIIHH", fmt_size,
+                                     3 if is_float else 1, nchannels, rate,
+                                     rate * nchannels * width,
+                                     nchannels * width, 8 * width)]
+      if is_float:
+        header.extend([b"\0\0", b"fact", struct.pack("<I", 4), b"\0" * 4])
+      header.append(b"data")
+    else:
+      compression = {"float32": b"fl32", "float64": b"fl64"}.get(
+                      sample_format, b"NONE")
+      header = [b"FORM", b"\0" * 4, b"AIFC",
+                b"FVER", struct.pack(">II", 4, 0xa2805140),
+                b"COMM", struct.pack(">IhIh", 24, nchannels, 0, 8 * width),
+                _to_ieee_extended(rate), compression, b"\0\0",
+                b"SSND"]
+    header = b"".join(header)
+    file_obj.write(header + b"\0" * (12 if file_format == "aiff" else 4))
+
+    # Data
+    data = iter(data)
+    size = chunk_size * nchannels
+    nsamples = 0
+    while True:
+      samples = list(it.islice(data, size))
+      if not samples:
+        break
+      if len(samples) % nchannels:
+        samples.extend([0.] * (-len(samples) % nchannels))
+      nsamples += len(samples)
+      file_obj.write(_pcm_encode(samples, sample_format, big_endian))
+    nframes = nsamples // nchannels
+    data_size = nsamples * width
+    if data_size & 1:
+      file_obj.write(b"\0") # Pad byte
+
+    # Fill the sizes
+    end = file_obj.tell()
+    if file_format == "wav":
+      sizes = [(4, "<I", end - base - 8),
+               (len(header), "<I", data_size)]
+      if is_float:
+        sizes.append((len(header) - 8, "<I", nframes))
+    else:
+      sizes = [(4, ">I", end - base - 8),
+               (34, ">I", nframes),
+               (len(header), ">I", data_size + 8)]
+    for pos, fmt, value in sizes:
+      file_obj.seek(base + pos)
+      file_obj.write(struct.pack(fmt, value))
+    file_obj.seek(end)
+  finally:
+    if owner:
+      file_obj.close()
+  return nframes
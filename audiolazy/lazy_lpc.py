@@ -33,8 +33,10 @@ from .lazy_misc import blocks
 from .lazy_compat import xrange, xzip
 from .lazy_analysis import acorr, lag_matrix
 
-__all__ = ["ParCorError", "toeplitz", "levinson_durbin", "lpc", "parcor",
-           "parcor_stable", "lsf", "lsf_stable"]
+__all__ = ["ParCorError", "toeplitz", "levinson_durbin", "lpc", "LPCFrames",
+           "levinson_durbin_frames", "lpc_frames", "parcor", "parcor_stable",
+           "lsf", "lsf_stable", "parcor_frames", "parcor_stable_frames",
+           "lsf_frames", "lsf_stable_frames"]
 
 
 class ParCorError(ZeroDivisionError):
@@ -343,6 +345,146 @@ def lpc(blk, order=None):
     m += 1
 
 
+class LPCFrames(object):
+  """
+  Linear Predictive Coding (LPC) analysis results for a sequence of frames,
+  stored as NumPy arrays. ZFilter objects are only built when requested by
+  indexing or iterating through an instance.
+
+  Attributes
+  ----------
+  coeffs :
+    A 2-D array with one analysis filter per row, as in the ZFilter
+    ``numerator`` (i.e., each row starts with 1).
+  error :
+    A 1-D array with the summed squared prediction error of each frame,
+    the same ``error`` attribute found by ``lpc.autocor``.
+  k :
+    A 2-D array with one row per frame with the PARCOR coefficients, in the
+    same order they're yielded by ``parcor`` (i.e., starting with the last
+    one found by the Levinson-Durbin algorithm).
+
+  """
+  def __init__(self, coeffs, error, k):
+    self.coeffs = coeffs
+    self.error = error
+    self.k = k
+    self._filters = {}
+
+  def __len__(self):
+    return len(self.coeffs)
+
+  def __getitem__(self, idx):
+    idx = xrange(len(self))[idx]
+    if idx not in self._filters:
+      filt = ZFilter(self.coeffs[idx].tolist())
+      filt.error = float(self.error[idx])
+      self._filters[idx] = filt
+    return self._filters[idx]
+
+  def __iter__(self):
+    for idx in xrange(len(self)):
+      yield self[idx]
+
+  def __repr__(self):
+    return "<{} with {} frames of order {}>".format(
+      self.__class__.__name__, len(self), self.coeffs.shape[1] - 1
+    )
+
+
+def levinson_durbin_frames(acdata, order=None):
+  """
+  Solve the Yule-Walker linear system of equations for several frames at
+  once, using the Levinson-Durbin algorithm vectorized with NumPy.
+
+  Parameters
+  ----------
+  acdata :
+    A 2-D array-like with one autocorrelation lag list per row.
+  order :
+    The order of the resulting filters. Defaults to ``len(acdata[0]) - 1``.
+
+  Returns
+  -------
+  A LPCFrames instance.
+
+  Note
+  ----
+  Unlike ``levinson_durbin``, this function doesn't raise ParCorError: when
+  the prediction error of a frame reaches zero (e.g. silence), its filter
+  stays the one found so far, with zeros as the next PARCOR coefficients.
+
+  See Also
+  --------
+  levinson_durbin :
+    Levinson-Durbin algorithm for a single autocorrelation lag list.
+  lpc_frames :
+    LPC coefficients for several frames (blocks), using this function.
+
+  """
+  import numpy as np
+  acdata = np.array(acdata, dtype=float, ndmin=2)
+  if order is None:
+    order = acdata.shape[1] - 1
+  elif order >= acdata.shape[1]:
+    acdata = np.hstack([acdata,
+                        np.zeros((len(acdata), order + 1 - acdata.shape[1]))])
+
+  coeffs = np.zeros((len(acdata), order + 1))
+  coeffs[:, 0] = 1.
+  k = np.zeros((len(acdata), order))
+  error = acdata[:, 0].copy()
+  for m in xrange(1, order + 1):
+    acc = np.sum(coeffs[:, :m] * acdata[:, m:0:-1], axis=1)
+    valid = error != 0
+    k[valid, m - 1] = -acc[valid] / error[valid]
+    coeffs[:, 1:m + 1] += k[:, m - 1:m] * coeffs[:, m - 1::-1]
+    error *= 1 - k[:, m - 1] ** 2
+  return LPCFrames(coeffs, error, k[:, ::-1])
+
+
+def lpc_frames(frames, order=None):
+  """
+  Find the Linear Predictive Coding (LPC) coefficients for several frames
+  (blocks) at once, using the autocorrelation method and the vectorized
+  Levinson-Durbin algorithm.
+
+  Parameters
+  ----------
+  frames :
+    A 2-D array with one frame per row, or any finite iterable of blocks,
+    like the ones from ``Stream.blocks`` (each block is copied as soon as
+    it's received, so the reused deque from ``blocks`` is fine here).
+  order :
+    The order of the resulting filters. Defaults to ``len(frame) - 1``.
+
+  Returns
+  -------
+  A LPCFrames instance, whose items are the same analysis whitening filters
+  ``lpc.kautocor`` would give for each frame (with the "error" attribute).
+
+  See Also
+  --------
+  lpc.kautocor:
+    LPC coefficients obtained with Levinson-Durbin algorithm for a single
+    block.
+  levinson_durbin_frames :
+    Vectorized Levinson-Durbin algorithm.
+
+  """
+  import numpy as np
+  if not isinstance(frames, np.ndarray):
+    frames = [list(blk) for blk in frames]
+  frames = np.array(frames, dtype=float, ndmin=2)
+  size = frames.shape[1]
+  if order is None:
+    order = size - 1
+  acdata = np.zeros((len(frames), order + 1))
+  for lag in xrange(min(order + 1, size)):
+    acdata[:, lag] = np.sum(frames[:, lag:] * frames[:, :size - lag], axis=1)
+  return levinson_durbin_frames(acdata, order)
+
+
 def parcor(fir_filt):
   """
   Find the partial correlation coefficients (PARCOR), or reflection
@@ -488,3 +630,218 @@ def lsf_stable(filt):
   """
   lsf_data = lsf(ZFilter(filt.denpoly))
   return all(a < b for a, b in blocks(lsf_data, size=2, hop=1))
+
+
+def _frames_coeffs(coeffs):
+  """
+  2-D array with the analysis filter coefficients from a LPCFrames instance
+  or any 2-D array-like, normalized to have ones as its first column.
+  """
+  import numpy as np
+  coeffs = np.array(getattr(coeffs, "coeffs", coeffs), dtype=float, ndmin=2)
+  return coeffs / coeffs[:, :1]
+
+
+def parcor_frames(coeffs):
+  """
+  Find the partial correlation coefficients (PARCOR), or reflection
+  coefficients, for several LPC analysis filters at once, reversing the
+  Levinson-Durbin algorithm (step-down recursion) vectorized with NumPy.
+
+  Parameters
+  ----------
+  coeffs :
+    A LPCFrames instance or a 2-D array with the FIR filter coefficients in
+    each row (as in the ZFilter ``numerator``).
+
+  Returns
+  -------
+  A 2-D array with one row of PARCOR coefficients per filter, in the same
+  order they're yielded by ``parcor``. When ``parcor`` would raise a
+  ParCorError, the remaining coefficients in that row are ``nan``.
+
+  See Also
+  --------
+  parcor :
+    Partial correlation coefficients generator for a single filter.
+
+  """
+  import numpy as np
+  coeffs = _frames_coeffs(coeffs)
+  order = coeffs.shape[1] - 1
+  k = np.empty((len(coeffs), order))
+  for m in xrange(order, 0, -1):
+    k_m = coeffs[:, m].copy()
+    k[:, order - m] = k_m
+    den = 1 - k_m ** 2
+    den[den == 0] = np.nan
+    coeffs = (coeffs[:, :m] - k_m[:, None] * coeffs[:, m:0:-1]) / den[:, None]
+    coeffs[:, 0] = 1. # Avoid rounding errors
+    coeffs[np.isnan(den)] = np.nan
+  return k
+
+
+def parcor_stable_frames(coeffs):
+  """
+  Tests whether the filters ``1 / A``, for several LPC analysis filters
+  ``A`` at once, are stable or not, by using their partial correlation
+  coefficients (reflection coefficients).
+
+  Parameters
+  ----------
+  coeffs :
+    A LPCFrames instance or a 2-D array with the FIR filter coefficients in
+    each row (as in the ZFilter ``numerator``).
+
+  Returns
+  -------
+  A 1-D boolean array with the same result ``parcor_stable`` would give for
+  each ``1 / A`` filter.
+
+  See Also
+  --------
+  parcor_stable :
+    Tests a single filter stability with PARCOR coefficients.
+  parcor_frames :
+    PARCOR coefficients for several filters at once.
+
+  """
+  import numpy as np
+  with np.errstate(invalid="ignore"):
+    return np.all(np.abs(parcor_frames(coeffs)) < 1, axis=1)
+
+
+_lsf_grids = {} # Cache for the trigonometric grid matrices of lsf_frames
+
+
+def _lsf_grid(size, grid_size):
+  """
+  Frequencies and matrices with the cosines (for the sum polynomial) and
+  sines (for the difference polynomial) of each term in ``lsf_frames``,
+  which are Chebyshev polynomials evaluated at the grid points.
+  """
+  key = size, grid_size
+  if key not in _lsf_grids:
+    import numpy as np
+    freqs = (np.arange(grid_size) + .5) * (np.pi / grid_size)
+    harmonics = (size - 1) * .5 - np.arange(size) # Removes the linear phase
+    angles = np.outer(harmonics, freqs)
+    _lsf_grids[key] = harmonics, freqs, np.cos(angles), np.sin(angles)
+  return _lsf_grids[key]
+
+
+def _lsf_zeros(poly, harmonics, freqs, values, trig, count, iterations=12):
+  """
+  Zero crossings in ``(0; pi)`` of the real trigonometric polynomials
+  ``sum(poly[:, k] * trig(harmonics[k] * freq))``, given their ``values``
+  in the ``freqs`` grid. Returns a 2-D array with ``count`` zeros per
+  polynomial (row), or ``nan`` for the rows with another number of zeros.
+  """
+  import numpy as np
+  rows, cols = np.nonzero(np.diff(np.signbit(values), axis=1))
+  lo, hi = freqs[cols], freqs[cols + 1]
+  lo_val, hi_val = values[rows, cols], values[rows, cols + 1]
+  poly = poly[rows]
+
+  # Bisection, then a linear interpolation
+  for unused in xrange(iterations):
+    mid = .5 * (lo + hi)
+    mid_val = np.sum(poly * trig(np.outer(mid, harmonics)), axis=1)
+    go_up = np.signbit(mid_val) == np.signbit(lo_val)
+    lo = np.where(go_up, mid, lo)
+    lo_val = np.where(go_up, mid_val, lo_val)
+    hi = np.where(go_up, hi, mid)
+    hi_val = np.where(go_up, hi_val, mid_val)
+  zeros = lo - lo_val * (hi - lo) / (hi_val - lo_val)
+
+  # Stores the zeros, found sorted by row
+  result = np.empty((len(values), count))
+  result.fill(np.nan)
+  found = np.bincount(rows, minlength=len(values))
+  valid = (found == count)[rows]
+  result[rows[valid], (np.arange(len(rows)) - np.cumsum(found)[rows]
+                                            + found[rows])[valid]] = \
+    zeros[valid]
+  return result
+
+
+def lsf_frames(coeffs, grid_size=512):
+  """
+  Find the Line Spectral Frequencies (LSF) for several LPC analysis filters
+  at once, without polynomial root finding: the zeros are found by a sign
+  change search in a grid of frequencies followed by a bisection refinement,
+  with the sum and difference polynomials written as Chebyshev polynomials
+  (i.e., as cosine/sine series), all vectorized with NumPy.
+
+  Parameters
+  ----------
+  coeffs :
+    A LPCFrames instance or a 2-D array with the FIR filter coefficients in
+    each row (as in the ZFilter ``numerator``).
+  grid_size :
+    Number of grid points in the ``(0; pi)`` range for the zero search. Two
+    LSF values closer than ``pi / grid_size`` might not be found. Defaults
+    to 512.
+
+  Returns
+  -------
+  A 2-D array with one row of LSF values per filter, in rad/sample. Each row
+  have the positive LSFs in ascending order, alternating from the forward
+  (sum polynomial, starting with it) and backward (difference polynomial)
+  prediction filters, without the fixed 0 and pi values. That's the
+  non-negative half of the ``lsf`` result (when it's stable). Rows whose LSF
+  values can't all be found in the unit circle (unstable filters) are
+  filled with ``nan``.
+
+  See Also
+  --------
+  lsf :
+    Line Spectral Frequencies for a single filter. Uses ``numpy.roots``.
+
+  """
+  import numpy as np
+  coeffs = _frames_coeffs(coeffs)
+  order = coeffs.shape[1] - 1
+  ext = np.hstack([coeffs, np.zeros((len(coeffs), 1))])
+  p_poly = ext + ext[:, ::-1]
+  q_poly = ext - ext[:, ::-1]
+  harmonics, freqs, cos_grid, sin_grid = _lsf_grid(order + 2, grid_size)
+  result = np.empty((len(coeffs), order))
+  result[:, 0::2] = _lsf_zeros(p_poly, harmonics, freqs, p_poly.dot(cos_grid),
+                               np.cos, (order + 1) // 2)
+  result[:, 1::2] = _lsf_zeros(q_poly, harmonics, freqs, q_poly.dot(sin_grid),
+                               np.sin, order // 2)
+  with np.errstate(invalid="ignore"):
+    result[np.any(np.diff(result, axis=1) <= 0, axis=1)] = np.nan
+  return result
+
+
+def lsf_stable_frames(coeffs, grid_size=512):
+  """
+  Tests whether the filters ``1 / A``, for several LPC analysis filters
+  ``A`` at once, are stable or not, by using their Line Spectral
+  Frequencies (LSF), which should alternate.
+
+  Parameters
+  ----------
+  coeffs :
+    A LPCFrames instance or a 2-D array with the FIR filter coefficients in
+    each row (as in the ZFilter ``numerator``).
+  grid_size :
+    Number of grid points used by ``lsf_frames``.
+
+  Returns
+  -------
+  A 1-D boolean array with the same result ``lsf_stable`` would give for
+  each ``1 / A`` filter.
+
+  See Also
+  --------
+  lsf_stable :
+    Tests a single filter stability with LSF values.
+  lsf_frames :
+    Line Spectral Frequencies for several filters at once.
+
+  """
+  import numpy as np
+  return np.all(np.isfinite(lsf_frames(coeffs, grid_size)), axis=1)
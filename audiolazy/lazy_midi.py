@@ -21,48 +21,174 @@ MIDI representation data & note-frequency relationship
 """
 
 import itertools as it
+import heapq
+from collections import deque
+from functools import wraps, reduce
 
 # Audiolazy internal imports
-from .lazy_misc import elementwise
+from .lazy_misc import elementwise, sHz, rint, DEFAULT_SAMPLE_RATE
 from .lazy_math import log2, nan, isinf, isnan
+from .lazy_compat import xrange, xzip, STR_TYPES
+from .lazy_stream import Stream, Streamix
 
-__all__ = ["MIDI_A4", "FREQ_A4", "SEMITONE_RATIO", "str2freq",
-           "str2midi", "freq2str", "freq2midi", "midi2freq", "midi2str",
-           "octaves"]
+__all__ = ["MIDI_A4", "FREQ_A4", "SEMITONE_RATIO", "MIDI_FREQS",
+           "CENT_RATIOS", "str2freq", "str2midi", "freq2str", "freq2midi",
+           "midi2freq", "midi2str", "octaves", "smf_events", "smf2stream"]
 
 # Useful constants
 MIDI_A4 = 69   # MIDI Pitch number
 FREQ_A4 = 440. # Hz
 SEMITONE_RATIO = 2. ** (1. / 12.) # Ascending
 
+# Note names
+_NAME2DELTA = {"c": -9, "d": -7, "e": -5, "f": -4, "g": -2, "a": 0, "b": 2}
+_ACCIDENT2DELTA = {"b": -1, "#": 1, "x": 2}
+_SHARP_NAMES = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#",
+                "B"]
+_FLAT_NAMES = ["C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B"]
 
+# Lookup tables for the 128 MIDI notes, and for the 100 cents in a semitone,
+# i.e., the frequency of the MIDI note ``n`` plus ``c`` cents (both integers)
+# is ``MIDI_FREQS[n] * CENT_RATIOS[c]``
+MIDI_FREQS = tuple(FREQ_A4 * 2 ** ((note - MIDI_A4) * (1./12.))
+                   for note in xrange(128))
+CENT_RATIOS = tuple(2 ** (cent / 1200.) for cent in xrange(100))
+_CENTS_TOLERANCE = 1e-6 # Distance to the cents grid for using the tables
+_MIDI2FREQ = dict(enumerate(MIDI_FREQS))
+_MIDI2STR = {sharp: {note: names[note % 12] + str(note // 12 - 1)
+                     for note in xrange(128)}
+             for sharp, names in [(True, _SHARP_NAMES), (False, _FLAT_NAMES)]}
+_STR2MIDI = {} # Memoized note string parsing results
+_STR2MIDI_MAX_SIZE = 4096
+
+
+def _numpy_path(np_func):
+  """
+  Decorator to a function that should call ``np_func`` instead when its
+  first argument is a Numpy array (the vectorized path), with the same
+  arguments. The Numpy array is the only array kind that bypasses the
+  decorated function, which should deal with the other iterables itself.
+  """
+  def decorator(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+      if args and type(args[0]).__name__ == "ndarray" and \
+                  type(args[0]).__module__ == "numpy":
+        return np_func(*args, **kwargs)
+      return func(*args, **kwargs)
+    return wrapper
+  return decorator
+
+
+def _midi_cents(midi_number):
+  """
+  Internal ``(note, cent)`` integer pair from a MIDI pitch number, when it's
+  on the cents grid and its note is in the lookup tables, else None.
+  """
+  cents = midi_number * 100.
+  if isinf(cents) or isnan(cents):
+    return None
+  rounded = rint(cents)
+  if abs(cents - rounded) > _CENTS_TOLERANCE:
+    return None
+  note, cent = divmod(rounded, 100)
+  return (note, cent) if 0 <= note < 128 else None
+
+
+def _midi_cents_numpy(np, midi_number):
+  """
+  Internal vectorized ``_midi_cents``, returning the note and cent integer
+  arrays (zero where invalid) and the boolean array telling where they're
+  valid.
+  """
+  cents = midi_number * 100.
+  rounded = np.rint(cents)
+  notes, cent = np.divmod(rounded, 100)
+  with np.errstate(invalid="ignore"):
+    valid = (abs(cents - rounded) <= _CENTS_TOLERANCE) & \
+            (notes >= 0) & (notes < 128)
+  return (np.where(valid, notes, 0).astype(int),
+          np.where(valid, cent, 0).astype(int),
+          valid)
+
+
+def _midi2freq_numpy(midi_number):
+  import numpy as np
+  if midi_number.dtype.kind in "iu" and midi_number.size and \
+     0 <= midi_number.min() and midi_number.max() < 128:
+    return np.array(MIDI_FREQS)[midi_number]
+  result = FREQ_A4 * 2 ** ((midi_number - MIDI_A4) * (1./12.))
+  if midi_number.dtype.kind == "f":
+    notes, cents, valid = _midi_cents_numpy(np, midi_number)
+    table = np.array(MIDI_FREQS)[notes] * np.array(CENT_RATIOS)[cents]
+    result = np.where(valid, table, result)
+  return result
+
+
+@_numpy_path(_midi2freq_numpy)
 @elementwise("midi_number", 0)
 def midi2freq(midi_number):
   """
   Given a MIDI pitch number, returns its frequency in Hz.
-  """
-  return FREQ_A4 * 2 ** ((midi_number - MIDI_A4) * (1./12.))
 
+  MIDI pitch numbers from 0 to 127 with a cents resolution (e.g. ``60.5``)
+  are found in the ``MIDI_FREQS`` and ``CENT_RATIOS`` lookup tables, and
+  Numpy arrays are converted in a single vectorized step.
+
+  Examples
+  --------
+  >>> midi2freq(57)
+  220.0
+  >>> [round(freq, 2) for freq in midi2freq([60, 60.5, 61])]
+  [261.63, 269.29, 277.18]
 
-@elementwise("note_string", 0)
-def str2midi(note_string):
-  """
-  Given a note string name (e.g. "Bb4"), returns its MIDI pitch number.
   """
+  freq = _MIDI2FREQ.get(midi_number)
+  if freq is None:
+    note_cent = _midi_cents(midi_number)
+    if note_cent is None:
+      return FREQ_A4 * 2 ** ((midi_number - MIDI_A4) * (1./12.))
+    return MIDI_FREQS[note_cent[0]] * CENT_RATIOS[note_cent[1]]
+  return freq
+
+
+def _str2midi_numpy(note_string):
+  import numpy as np
+  return np.array([str2midi(name) for name in note_string.flat]
+                 ).reshape(note_string.shape)
+
+
+def _str2midi_parse(note_string):
   if note_string == "?":
     return nan
   data = note_string.strip().lower()
-  name2delta = {"c": -9, "d": -7, "e": -5, "f": -4, "g": -2, "a": 0, "b": 2}
-  accident2delta = {"b": -1, "#": 1, "x": 2}
-  accidents = list(it.takewhile(lambda el: el in accident2delta, data[1:]))
+  accidents = list(it.takewhile(lambda el: el in _ACCIDENT2DELTA, data[1:]))
   octave_delta = int(data[len(accidents) + 1:]) - 4
   return (MIDI_A4 +
-          name2delta[data[0]] + # Name
-          sum(accident2delta[ac] for ac in accidents) + # Accident
+          _NAME2DELTA[data[0]] + # Name
+          sum(_ACCIDENT2DELTA[ac] for ac in accidents) + # Accident
           12 * octave_delta # Octave
          )
 
 
+@_numpy_path(_str2midi_numpy)
+@elementwise("note_string", 0)
+def str2midi(note_string):
+  """
+  Given a note string name (e.g. "Bb4"), returns its MIDI pitch number.
+
+  The parsing results are memoized, so scores with lots of repeated note
+  names are converted without parsing each name again.
+  """
+  try:
+    return _STR2MIDI[note_string]
+  except KeyError:
+    if len(_STR2MIDI) >= _STR2MIDI_MAX_SIZE:
+      _STR2MIDI.clear()
+    result = _STR2MIDI[note_string] = _str2midi_parse(note_string)
+    return result
+
+
 def str2freq(note_string):
   """
   Given a note string name (e.g. "F#2"), returns its frequency in Hz.
@@ -70,20 +196,65 @@ def str2freq(note_string):
   return midi2freq(str2midi(note_string))
 
 
+_LOG2_FREQ_A4 = log2(FREQ_A4)
+
+
+def _freq2midi_numpy(freq):
+  import numpy as np
+  with np.errstate(divide="ignore", invalid="ignore"):
+    result = 12 * (np.log2(freq) - _LOG2_FREQ_A4) + MIDI_A4
+  notes, cents, valid = _midi_cents_numpy(np, result)
+  table = np.array(MIDI_FREQS)[notes] * np.array(CENT_RATIOS)[cents]
+  return np.where(valid & (freq == table), (notes * 100 + cents) / 100.,
+                  result)
+
+
+@_numpy_path(_freq2midi_numpy)
 @elementwise("freq", 0)
 def freq2midi(freq):
   """
   Given a frequency in Hz, returns its MIDI pitch number.
+
+  The frequencies in the ``MIDI_FREQS`` and ``CENT_RATIOS`` lookup tables
+  (i.e., the ones found by ``midi2freq`` for pitch numbers with a cents
+  resolution) give exactly the same pitch number back.
   """
-  result = 12 * (log2(freq) - log2(FREQ_A4)) + MIDI_A4
-  return nan if isinstance(result, complex) else result
+  result = 12 * (log2(freq) - _LOG2_FREQ_A4) + MIDI_A4
+  if isinstance(result, complex):
+    return nan
+  note_cent = _midi_cents(result)
+  if note_cent is not None:
+    note, cent = note_cent
+    if freq == MIDI_FREQS[note] * CENT_RATIOS[cent]:
+      return (note * 100 + cent) / 100.
+  return result
 
 
+def _midi2str_numpy(midi_number, sharp=True):
+  import numpy as np
+  rounded = np.rint(midi_number)
+  with np.errstate(invalid="ignore"):
+    exact = (abs(midi_number - rounded) < 1e-4) & \
+            (rounded >= 0) & (rounded < 128)
+  names = _MIDI2STR[bool(sharp)]
+  return np.array([names[int(rnote)] if is_exact else
+                   midi2str(float(note), sharp=sharp)
+                   for note, rnote, is_exact in xzip(midi_number.flat,
+                                                     rounded.flat,
+                                                     exact.flat)]
+                 ).reshape(midi_number.shape)
+
+
+@_numpy_path(_midi2str_numpy)
 @elementwise("midi_number", 0)
 def midi2str(midi_number, sharp=True):
   """
   Given a MIDI pitch number, returns its note string name (e.g. "C3").
   """
+  try:
+    return _MIDI2STR[bool(sharp)][midi_number]
+  except (KeyError, TypeError):
+    pass
   if isinf(midi_number) or isnan(midi_number):
     return "?"
   num = midi_number - (MIDI_A4 - 4 * 12 - 9)
@@ -91,10 +262,7 @@ def midi2str(midi_number, sharp=True):
   rnote = int(round(note))
   error = note - rnote
   octave = str(int(round((num - note) / 12.)))
-  if sharp:
-    names = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-  else:
-    names = ["C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B"]
+  names = _SHARP_NAMES if sharp else _FLAT_NAMES
   names = names[rnote] + octave
   if abs(error) < 1e-4:
     return names
@@ -164,3 +332,255 @@ def octaves(freq, fmin=20., fmax=2e4):
        + list(it.takewhile(lambda x: x < fmax,
                            (freq * 2 ** harm for harm in it.count(1))
                           ))
+
+
+def _smf_bytes(fobj, start, size, bufsize=8192):
+  """
+  Generator of the bytes (as integers) in the ``size`` bytes long file
+  region starting at ``start``, reading it in chunks of ``bufsize`` bytes.
+  Seeks before each read, so several of these can share the same file.
+  """
+  end = start + size
+  while start < end:
+    fobj.seek(start)
+    chunk = bytearray(fobj.read(min(bufsize, end - start)))
+    if not chunk:
+      break
+    start += len(chunk)
+    for byte in chunk:
+      yield byte
+
+
+def _smf_varlen(data):
+  """ Variable length quantity from a MIDI data bytes iterator. """
+  value = 0
+  byte = 0x80
+  while byte & 0x80:
+    byte = next(data)
+    value = (value << 7) | (byte & 0x7f)
+  return value
+
+
+def _smf_uint(data):
+  """ Big endian unsigned integer from a bytearray. """
+  return reduce(lambda value, byte: (value << 8) | byte, data, 0)
+
+
+def _smf_payload(data, size):
+  """
+  Bytearray with the next ``size`` bytes from a MIDI data bytes iterator.
+  """
+  payload = bytearray()
+  for unused in xrange(size):
+    try:
+      payload.append(next(data))
+    except StopIteration:
+      raise ValueError("Truncated MIDI event payload")
+  return payload
+
+
+def _smf_track(fobj, start, size, index):
+  """
+  Generator of ``(tick, index, order, channel, note, velocity)`` tuples for
+  the note events in a MIDI track chunk, with the track ``index`` and a
+  ``order`` counter for sorting. Tempo changes are also yielded, with
+  ``channel = None`` and the tempo (in microseconds per quarter note) as the
+  ``note``. Note off events have ``velocity = 0``.
+  """
+  data = _smf_bytes(fobj, start, size)
+  tick = 0
+  status = None
+  order = it.count()
+  try:
+    while True:
+      try:
+        tick += _smf_varlen(data)
+      except StopIteration:
+        return # Missing the end of track meta event
+      byte = next(data)
+      if byte & 0x80:
+        status = byte
+        if status < 0xf0:
+          byte = next(data)
+      elif status is None:
+        raise ValueError("Running status without a previous status byte")
+
+      if status == 0xff: # Meta event
+        meta = next(data)
+        payload = _smf_payload(data, _smf_varlen(data))
+        status = None
+        if meta == 0x51 and len(payload) == 3: # Set tempo
+          tempo = (payload[0] << 16) | (payload[1] << 8) | payload[2]
+          yield tick, index, next(order), None, tempo, None
+        elif meta == 0x2f: # End of track
+          return
+
+      elif status in (0xf0, 0xf7): # System exclusive
+        _smf_payload(data, _smf_varlen(data))
+        status = None
+
+      else: # Channel message, "byte" is its first data byte
+        kind = status & 0xf0
+        if kind not in (0xc0, 0xd0): # Program change and channel pressure
+          velocity = next(data)      # have a single data byte
+          if kind == 0x90:
+            yield tick, index, next(order), status & 0x0f, byte, velocity
+          elif kind == 0x80:
+            yield tick, index, next(order), status & 0x0f, byte, 0
+  except StopIteration:
+    raise ValueError("Truncated MIDI track")
+
+
+def _smf_sequence(tracks):
+  """ Chains format 2 tracks, each one starting when the previous ends. """
+  offset = 0
+  for track in tracks:
+    tick = 0
+    for tick, index, order, channel, note, velocity in track:
+      yield tick + offset, index, order, channel, note, velocity
+    offset += tick
+
+
+def smf_events(source):
+  """
+  Standard MIDI File (SMF) note events parser.
+
+  This is a generator that reads the file incrementally, merging its tracks
+  on the fly, so no object is created for a whole track nor for the
+  non-note events.
+
+  Parameters
+  ----------
+  source :
+    File name or a seekable binary file object with the SMF data.
+
+  Returns
+  -------
+  Generator of ``(time, channel, note, velocity)`` tuples sorted by the
+  ``time`` (in seconds), where ``note`` is the MIDI pitch number and note off
+  events have ``velocity = 0``.
+
+  Examples
+  --------
+  >>> from io import BytesIO
+  >>> smf = BytesIO(
+  ...   b"MThd\\x00\\x00\\x00\\x06\\x00\\x00\\x00\\x01\\x00\\x60" # Header
+  ...   b"MTrk\\x00\\x00\\x00\\x0d" # Track with 13 bytes
+  ...   b"\\x00\\x90\\x45\\x64" # Note on (A4), channel 0, velocity 100
+  ...   b"\\x60\\x45\\x00"     # Note on with velocity 0 a beat later
+  ...   b"\\x00\\xff\\x2f\\x00" # End of track
+  ... )
+  >>> list(smf_events(smf)) # The default tempo is 120 BPM
+  [(0.0, 0, 69, 100), (0.5, 0, 69, 0)]
+
+  """
+  if isinstance(source, STR_TYPES):
+    with open(source, "rb") as fobj:
+      for event in smf_events(fobj):
+        yield event
+    return
+
+  # Header and tracks chunk positions
+  header = bytearray(source.read(14))
+  if header[:4] != bytearray(b"MThd"):
+    raise ValueError("Not a Standard MIDI File")
+  hsize = _smf_uint(header[4:8])
+  fmt = _smf_uint(header[8:10])
+  division = _smf_uint(header[12:14])
+  pos = 8 + hsize
+  tracks = []
+  for index in xrange(_smf_uint(header[10:12])):
+    source.seek(pos)
+    chunk_header = bytearray(source.read(8))
+    if len(chunk_header) < 8:
+      break
+    size = _smf_uint(chunk_header[4:])
+    if chunk_header[:4] == bytearray(b"MTrk"):
+      tracks.append(_smf_track(source, pos + 8, size, len(tracks)))
+    pos += 8 + size
+  events = _smf_sequence(tracks) if fmt == 2 else heapq.merge(*tracks)
+
+  # Time conversion
+  if division & 0x8000: # SMPTE
+    fps = 256 - (division >> 8)
+    tick_dur = 1. / (fps * (division & 0xff))
+    qdiv = None
+  else:
+    qdiv = 1e6 * division # Tempo is in microseconds
+    tick_dur = 5e5 / qdiv # 120 BPM
+  time = 0.
+  last_tick = 0
+  for tick, unused, unused, channel, note, velocity in events:
+    if tick != last_tick:
+      time += (tick - last_tick) * tick_dur
+      last_tick = tick
+    if channel is not None:
+      yield time, channel, note, velocity
+    elif qdiv:
+      tick_dur = note / qdiv
+
+
+def _gated(data, gate):
+  """ Iterates through data while the ``gate`` list first item is True. """
+  for el in data:
+    if not gate[0]:
+      break
+    yield el
+
+
+def smf2stream(source, synth, rate=DEFAULT_SAMPLE_RATE, pad_dur=.5):
+  """
+  Renders a Standard MIDI File (SMF) with the given synth.
+
+  Parameters
+  ----------
+  source :
+    File name or a seekable binary file object with the SMF data.
+  synth :
+    A function that receives a frequency as input and should yield an
+    endless Stream instance with the note being played. Each note output is
+    multiplied by its velocity (divided by 127), and it's interrupted at its
+    note off event.
+  rate :
+    The sample rate, given in samples per second.
+  pad_dur :
+    Duration in seconds, but not multiplied by ``s``, to be rendered after
+    the last event before finishing the Stream.
+
+  Returns
+  -------
+  A Stream with the song, rendered lazily: each event is read from the file
+  when the rendering reaches its time and its note is scheduled in a
+  ``Streamix`` instance.
+
+  See Also
+  --------
+  smf_events :
+    Standard MIDI File (SMF) note events parser.
+
+  """
+  s, Hz = sHz(rate)
+
+  def chunks():
+    smix = Streamix(keep=True)
+    data = iter(smix)
+    gates = {} # (channel, note) pair -> deque of gates for the playing notes
+    now = last_start = 0
+    for time, channel, note, velocity in smf_events(source):
+      start = rint(time * s)
+      if start > now:
+        yield it.islice(data, start - now)
+        now = start
+      key = channel, note
+      if velocity:
+        gate = [True]
+        gates.setdefault(key, deque()).append(gate)
+        freq = midi2freq(note) * Hz
+        smix.add(now - last_start, _gated(synth(freq) * (velocity / 127.),
+                                          gate))
+        last_start = now
+      elif gates.get(key):
+        gates[key].popleft()[0] = False
+    yield it.islice(data, rint(pad_dur * s))
+
+  return Stream(it.chain.from_iterable(chunks()))
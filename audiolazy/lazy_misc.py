@@ -70,6 +70,10 @@ def rint(x, step=1):
   return int(result)
 
 
+blocks = StrategyDict("blocks")
+
+
+@blocks.strategy("deque")
 def blocks(seq, size=None, hop=None, padval=0.):
   """
   General iterable blockenizer.
@@ -128,6 +132,83 @@ def blocks(seq, size=None, hop=None, padval=0.):
     yield res
 
 
+@blocks.strategy("numpy")
+def blocks(seq, size=None, hop=None, padval=0.):
+  """
+  Blockenizer that yields read-only Numpy float arrays.
+
+  Same to ``blocks.deque``, but the new data is copied to a buffer ``hop``
+  samples at a time (at C speed), and each block is a view of the buffer, so
+  there's no per-sample Python step nor copies for each block.
+  A list, tuple or Numpy array input is viewed as a 2-D frame matrix with
+  strides (only padding needs a copy), so its blocks are persistent.
+
+  Note
+  ----
+  For other iterables (e.g. Streams), the buffer is reused, and a block
+  contents changes some blocks later. Copy the blocks you need to keep, as
+  with the deque used by ``blocks.deque``.
+
+  """
+  import numpy as np
+  if hop is None:
+    hop = size
+  overlap = max(size - hop, 0)
+
+  # Sequences: 2-D frame matrix
+  if isinstance(seq, (list, tuple)) or type(seq).__name__ == "ndarray":
+    data = np.asarray(seq, dtype=float).ravel()
+    length = len(data)
+    nblocks = (length - size) // hop + 1 if length >= size else 0
+    if length - nblocks * hop > overlap: # Last block needs padding
+      pad_size = nblocks * hop + size - length
+      data = np.hstack([data, np.repeat(float(padval), pad_size)])
+      nblocks += 1
+    if nblocks:
+      frames = np.lib.stride_tricks.as_strided(
+        data, shape=(nblocks, size), strides=(hop * data.strides[0],
+                                              data.strides[0]))
+      frames.flags.writeable = False
+      for blk in frames:
+        yield blk
+    return
+
+  # Other iterables: ring buffer, with a copy of the last ``overlap``
+  # samples to its beginning when it's full
+  seq = iter(seq)
+  step = min(hop, size)
+  skip = hop - step
+  buf = np.empty(2 * size + step)
+  end = 0 # Buffer data stops here
+  first = True
+  while True:
+    if skip and not first:
+      if next(it.islice(seq, skip - 1, skip), None) is None:
+        return # Nothing after the skipped samples
+    new_data = np.fromiter(it.islice(seq, size if first else step), float)
+    if len(new_data) == 0:
+      return
+    if end + step > len(buf):
+      buf[:size - step] = buf[end - size + step:end]
+      end = size - step
+    buf[end:end + len(new_data)] = new_data
+    end += len(new_data)
+    if end < size or len(new_data) < step: # Finished, needs padding
+      if first and end <= overlap:
+        return # Only overlapping data in the first block
+      pad_end = max(size, end - len(new_data) + step)
+      buf[end:pad_end] = padval
+      end = pad_end
+      blk = buf[end - size:end]
+      blk.flags.writeable = False
+      yield blk
+      return
+    blk = buf[end - size:end]
+    blk.flags.writeable = False
+    yield blk
+    first = False
+
+
 def zero_pad(seq, left=0, right=0, zero=0.):
   """
   Zero padding sample generator (not a Stream!).
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Mon Oct 19 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Per-node profiling of Stream graphs
+"""
+
+from collections import namedtuple, OrderedDict
+from functools import wraps
+from timeit import default_timer
+import types
+
+# Audiolazy internal imports
+from .lazy_compat import iteritems
+from .lazy_text import rst_table
+from .lazy_stream import Stream, StreamTeeHub, Streamix
+from .lazy_filters import LinearFilter
+
+__all__ = ["StreamProfiler"]
+
+
+class _ProfiledIterator(object):
+  """
+  Iterator wrapper that measures the samples and time for a StreamProfiler
+  node. The node name is only given on the first ``next`` call, so that a
+  node can be renamed before being used without wasting a name.
+  """
+  def __init__(self, data, profiler, base_name):
+    self._data = data
+    self._profiler = profiler
+    self.base_name = base_name
+    self.name = None
+
+  def __iter__(self):
+    return self
+
+  def __next__(self):
+    profiler = self._profiler
+    if self.name is None:
+      self.name = profiler._new_name(self.base_name)
+    stack = profiler._stack
+    stack.append([self.name, 0.]) # Name and the time spent in the children
+    start = default_timer()
+    samples = 0 # Nothing was yielded on StopIteration or any other error
+    try:
+      result = next(self._data)
+      samples = 1
+      return result
+    finally:
+      profiler._record(stack, default_timer() - start, samples)
+
+  next = __next__ # Python 2
+
+
+class StreamProfiler(object):
+  """
+  Opt-in profiler for the nodes in a Stream graph, telling how many samples
+  each node yielded and the time spent on them, to find out which one is
+  slow (e.g. when there are underruns in an ``AudioThread``).
+
+  While active (with ``start`` or as a context manager), the nodes created
+  are instrumented:
+
+  - Streams created from a named generator (e.g. from a function decorated
+    with ``tostream``, like ``sinusoid`` or ``line``), named after it;
+  - ``LinearFilter`` (and ``ZFilter``) calls, named after the filter;
+  - ``Streamix`` mixers;
+  - ``thub`` copies (``StreamTeeHub`` iteration), sharing the node name.
+
+  Each name has a ``#`` suffix with the node creation counter for that name.
+  The instrumentation is done by replacing these classes methods while the
+  profiler is active, so there's no overhead at all when it's not. Only one
+  profiler can be active at a time, and the measured Streams should be
+  consumed in a single thread, but not necessarily while the profiler is
+  active.
+
+  The time of a node includes the time spent on the nodes it consumes
+  (called its children), whereas the "self" time doesn't.
+
+  Examples
+  --------
+  >>> from audiolazy import sinusoid, z, Streamix
+  >>> with StreamProfiler() as prof:
+  ...   smix = Streamix()
+  ...   smix.add(0, sinusoid(.1).limit(300))
+  ...   smix.add(100, (1 - .5 * z ** -1)(sinusoid(.2)).limit(300))
+  >>> len(smix.take(1000))
+  400
+  >>> for name, node in sorted(iteritems(prof.nodes)):
+  ...   print("{0} {1}".format(name, node.samples))
+  Streamix#1 400
+  ZFilter(1 - 0.5 * z^-1)#1 300
+  sinusoid#1 300
+  sinusoid#2 300
+  >>> for line in prof.folded().splitlines():
+  ...   print(line.rsplit(" ", 1)[0]) # No times here, they vary
+  Streamix#1
+  Streamix#1;ZFilter(1 - 0.5 * z^-1)#1
+  Streamix#1;ZFilter(1 - 0.5 * z^-1)#1;sinusoid#2
+  Streamix#1;sinusoid#1
+
+  """
+  _active = None # The active profiler
+
+  ProfileNode = namedtuple("ProfileNode", ["samples", "time", "self_time"])
+
+  def __init__(self):
+    self.nodes = OrderedDict() # Values are ProfileNode instances
+    self.stacks = {} # Self time for each tuple of node names
+    self._counters = {}
+    self._stack = []
+    self._originals = None
+
+  def start(self):
+    """ Starts instrumenting the nodes created afterwards. """
+    if StreamProfiler._active is not None:
+      raise RuntimeError("There's already an active StreamProfiler")
+    StreamProfiler._active = self
+    profiler = self
+    originals = self._originals = [
+      (Stream, "__init__", Stream.__init__),
+      (LinearFilter, "__call__", LinearFilter.__call__),
+      (Streamix, "__init__", Streamix.__init__),
+      (StreamTeeHub, "__iter__", StreamTeeHub.__iter__),
+    ]
+    stream_init, filter_call, streamix_init, thub_iter = \
+      [func for cls, name, func in originals]
+
+    @wraps(stream_init)
+    def __init__(self, *dargs):
+      stream_init(self, *dargs)
+      if len(dargs) == 1 and isinstance(dargs[0], types.GeneratorType):
+        name = dargs[0].gi_code.co_name
+        if not name.startswith("<"): # Neglects generator expressions
+          self._data = _ProfiledIterator(self._data, profiler, name)
+
+    @wraps(filter_call)
+    def __call__(self, *args, **kwargs):
+      result = filter_call(self, *args, **kwargs)
+      name = "{0}({1})".format(type(self).__name__, self).replace(";", ",")
+      if len(name) > 60:
+        name = name[:56] + "...)"
+      profiler._rename(result, name)
+      return result
+
+    @wraps(streamix_init)
+    def streamix_init_wrapper(self, *args, **kwargs):
+      streamix_init(self, *args, **kwargs)
+      profiler._rename(self, "Streamix")
+
+    @wraps(thub_iter)
+    def __iter__(self):
+      if "_profiled_name" not in vars(self):
+        self._profiled_name = profiler._new_name("thub")
+      result = _ProfiledIterator(thub_iter(self), profiler, "thub")
+      result.name = self._profiled_name
+      return result
+
+    Stream.__init__ = __init__
+    LinearFilter.__call__ = __call__
+    Streamix.__init__ = streamix_init_wrapper
+    StreamTeeHub.__iter__ = __iter__
+
+  def stop(self):
+    """
+    Stops instrumenting new nodes. The ones already instrumented are still
+    measured when used.
+    """
+    if StreamProfiler._active is self:
+      for cls, name, func in self._originals:
+        setattr(cls, name, func)
+      StreamProfiler._active = None
+
+  def __enter__(self):
+    self.start()
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.stop()
+
+  def _new_name(self, base_name):
+    """ Unique node name from the given base name. """
+    count = self._counters[base_name] = self._counters.get(base_name, 0) + 1
+    return "{0}#{1}".format(base_name, count)
+
+  def _rename(self, stream, base_name):
+    """ Changes the base name for a Stream instrumented node. """
+    data = getattr(stream, "_data", None)
+    if isinstance(data, _ProfiledIterator) and data._profiler is self:
+      data.base_name = base_name
+
+  def _record(self, stack, elapsed, samples):
+    """ Stores a measurement, popping the stack item of its node. """
+    path = tuple(name for name, children_time in stack)
+    name, children_time = stack.pop()
+    self_time = elapsed - children_time
+    if stack:
+      stack[-1][1] += elapsed
+    node = self.nodes.get(name)
+    if node is None:
+      node = self.nodes[name] = self.ProfileNode(0, 0., 0.)
+    self.nodes[name] = self.ProfileNode(node.samples + samples,
+                                        node.time + elapsed,
+                                        node.self_time + self_time)
+    self.stacks[path] = self.stacks.get(path, 0.) + self_time
+
+  def report(self):
+    """
+    Table (as a reStructuredText string) with the samples, the total and
+    self times in milliseconds and the self time per sample in microseconds
+    for each node, sorted by the self time.
+    """
+    rows = []
+    for name, node in sorted(iteritems(self.nodes),
+                             key=lambda pair: -pair[1].self_time):
+      per_sample = node.self_time * 1e6 / node.samples if node.samples \
+                   else float("nan")
+      rows.append([name, str(node.samples), "{0:.3f}".format(node.time * 1e3),
+                   "{0:.3f}".format(node.self_time * 1e3),
+                   "{0:.3f}".format(per_sample)])
+    header = ["Node", "Samples", "Time (ms)", "Self (ms)", "Self/sample (us)"]
+    return "\n".join(rst_table(rows, header))
+
+  def folded(self):
+    """
+    Profile in the "folded stacks" format (one ``a;b;c time`` line for each
+    path of nodes, with the self time in microseconds), which can be used
+    to create flame graphs (e.g. with ``flamegraph.pl`` or speedscope).
+    """
+    return "\n".join("{0} {1}".format(";".join(path), int(round(t * 1e6)))
+                     for path, t in sorted(iteritems(self.stacks)))
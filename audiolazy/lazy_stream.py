@@ -429,6 +429,20 @@ def tostream(func, module_name=None):
   return new_func
 
 
+def _changed(value, old):
+  """
+  Whether a control value changed, for numbers and element-wise compared
+  values like NumPy arrays, whose inequality can't be used as a boolean.
+  """
+  if value is old:
+    return False
+  diff = value != old
+  try:
+    return bool(diff)
+  except ValueError: # "The truth value of an array [...] is ambiguous"
+    return bool(diff.any())
+
+
 class ControlStream(Stream):
   """
   A Stream that yields a control value that can be changed at any time.
@@ -447,16 +461,125 @@ class ControlStream(Stream):
   >>> res.take(5)
   [12, 10, 12, 10, 12]
 
+  Each change is also registered as an event with the sample index ``k`` in
+  which it starts to be used, i.e., the number of samples already yielded:
+
+  >>> cs.sample
+  10
+  >>> cs.changes
+  deque([(5, 9)], maxlen=64)
+
+  See Also
+  --------
+  ControlStream.control :
+    Control rate (block synchronous) version of the Stream.
+
   """
+  max_changes = 64 # Size of the change events history
+
   def __init__(self, value):
-    self.value = value
+    self._value = value
+    self._sample = 0
+    self.changes = deque(maxlen=self.max_changes)
 
     def data_generator():
       while True:
-        yield self.value
+        self._sample += 1
+        yield self._value
 
     super(ControlStream, self).__init__(data_generator())
 
+  @property
+  def sample(self):
+    """ Number of samples already yielded, including the control blocks. """
+    return self._sample
+
+  @property
+  def value(self):
+    return self._value
+
+  @value.setter
+  def value(self, value):
+    if _changed(value, self._value):
+      self.changes.append((self.sample, value))
+    self._value = value
+
+  def control(self, size, ramp=0):
+    """
+    Control rate view of this ControlStream, with one block for each ``size``
+    samples, whose value is the one available when the block starts (block
+    synchronous updates). Both this and the sample rate iteration consumes
+    the same ControlStream, and the ``sample`` index counts both.
+
+    Parameters
+    ----------
+    size :
+      Block size, in samples.
+    ramp :
+      Duration of the linear smoothing ramp from the previous to the new
+      value, in samples. Defaults to zero (no smoothing).
+
+    Returns
+    -------
+    A Stream with one element per block. A constant run block is the value
+    itself, so block processing consumers can reuse what they computed for
+    the previous block when its value is the same. While a smoothing ramp is
+    in progress, the block is a list with the ``size`` ramp samples, and a
+    value change during a ramp starts a new ramp from the current point.
+
+    Examples
+    --------
+    >>> cs = ControlStream(2.)
+    >>> ctrl = cs.control(4, ramp=6)
+    >>> ctrl.take(2)
+    [2.0, 2.0]
+    >>> cs.value = 5.
+    >>> ctrl.take(3)
+    [[2.5, 3.0, 3.5, 4.0], [4.5, 5.0, 5.0, 5.0], 5.0]
+    >>> cs.sample, cs.changes
+    (20, deque([(8, 5.0)], maxlen=64))
+
+    Without the ramp, this is a control rate Stream that can be used as a
+    time variant coefficient in filters like the ones from
+    ``LinearFilter.control_rate``:
+
+    >>> from audiolazy import z
+    >>> cs = ControlStream(.5)
+    >>> filt = (1 - cs.control(3) * z ** -1).control_rate(3, False)
+    >>> sig = filt([1] * 8)
+    >>> sig.take(4)
+    [1.0, 0.5, 0.5, 0.5]
+    >>> cs.value = 0.
+    >>> sig.take(4) # Changed when the next block starts
+    [0.5, 0.5, 1.0, 1.0]
+
+    """
+    size = int(size)
+
+    def data_generator():
+      current = target = self._value
+      remain = 0
+      while True:
+        value = self._value
+        self._sample += size
+        if _changed(value, target):
+          target = value
+          remain = ramp
+          step = (target - current) / float(ramp or 1)
+        if remain <= 0:
+          current = target
+          yield target
+        else:
+          blk = []
+          for unused in xrange(size):
+            if remain > 0:
+              remain -= 1
+              current = target - step * remain
+            blk.append(current)
+          yield blk
+
+    return Stream(data_generator())
+
 
 class MemoryLeakWarning(Warning):
   """ A warning to be used when a memory leak is detected. """
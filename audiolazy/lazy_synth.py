@@ -22,6 +22,7 @@ Simple audio/stream synthesis module
 
 from math import sin, pi, ceil, isinf
 import collections
+import itertools as it
 import random
 
 # Audiolazy internal imports
@@ -30,9 +31,13 @@ from .lazy_itertools import cycle
 from .lazy_filters import comb
 from .lazy_compat import meta, iteritems, xrange, xzip
 from .lazy_misc import rint
+from .lazy_core import StrategyDict
 
 __all__ = ["modulo_counter", "line", "fadein", "fadeout", "attack", "ones",
-           "zeros", "zeroes", "adsr", "white_noise", "gauss_noise",
+           "zeros", "zeroes", "adsr", "ENVELOPE_CACHE_SIZE", "adsr_array",
+           "adsr_blocks", "attack_blocks", "line_blocks", "NOISE_BLOCK_SIZE",
+           "white_noise",
+           "gauss_noise", "pink_noise", "brown_noise",
            "TableLookupMeta", "TableLookup", "DEFAULT_TABLE_SIZE",
            "sin_table", "saw_table", "sinusoid", "impulse", "karplus_strong"]
 
@@ -391,8 +396,217 @@ def adsr(dur, a, d, s, r):
     yield s + sample * m_r
 
 
+#
+# Envelopes rendered as Numpy arrays
+#
+
+ENVELOPE_CACHE_SIZE = 256 # Number of arrays kept by the envelope cache
+_envelope_cache = collections.OrderedDict() # Least recently used first
+
+
+def _cached_envelope(key, build):
+  """
+  Read-only Numpy array from ``build(np)``, kept in a LRU (least recently
+  used) cache with up to ``ENVELOPE_CACHE_SIZE`` arrays for the given key.
+  """
+  try:
+    result = _envelope_cache.pop(key)
+  except KeyError:
+    import numpy as np
+    result = build(np)
+    result.flags.writeable = False
+  _envelope_cache[key] = result # As the most recently used
+  while len(_envelope_cache) > ENVELOPE_CACHE_SIZE:
+    _envelope_cache.popitem(last=False)
+  return result
+
+
+def _segment(np, begin, end, dur, length, curve):
+  """
+  Envelope segment with ``length`` samples going from ``begin`` towards
+  ``end`` in ``dur`` samples, linear when ``curve`` is zero (with the same
+  expression found in ``line`` and ``adsr``), or exponential otherwise.
+  """
+  n = np.arange(length, dtype=float)
+  if curve:
+    return begin + (end - begin) * (np.expm1(curve * n / dur) /
+                                    np.expm1(curve))
+  return begin + n * ((end - begin) / dur)
+
+
+def _blocks_from_array(data, size):
+  """ Generator of the ``size``-sized (or smaller, at the end) views. """
+  for idx in xrange(0, len(data), size):
+    yield data[idx:idx + size]
+
+
+def adsr_array(dur, a, d, s, r, curve=0.):
+  """
+  ADSR envelope as a read-only Numpy array, cached for the repeated
+  ``(dur, a, d, s, r, curve)`` inputs (up to ``ENVELOPE_CACHE_SIZE``
+  envelopes, removing the least recently used ones).
+
+  Parameters
+  ----------
+  dur, a, d, s, r :
+    See ``adsr``.
+  curve :
+    Curvature of the attack, decay and release segments. Defaults to zero,
+    which means linear segments, yielding the same values from ``adsr``.
+    For any other value, each segment from ``begin`` to ``end`` with the
+    duration ``dur`` is
+    ``begin + (end - begin) * (1 - exp(curve * n / dur)) / (1 - exp(curve))``
+    for ``n`` in ``range(dur)``. Negative values give exponential segments
+    that change quickly at start and slowly at the end, while positive
+    values give the opposite.
+
+  Returns
+  -------
+  Numpy array with the envelope, which can't be changed in place as it's
+  shared by every call with the same inputs.
+
+  """
+  def build(np):
+    len_a = int(a + .5)
+    len_d = int(d + .5)
+    len_r = int(r + .5)
+    len_s = int(dur + .5) - len_a - len_d - len_r
+    return np.concatenate([_segment(np, 0., 1., a, len_a, curve),
+                           _segment(np, 1., s, d, len_d, curve),
+                           np.repeat(float(s), max(len_s, 0)),
+                           _segment(np, s, 0., r, len_r, curve)])
+  return _cached_envelope(("adsr", dur, a, d, s, r, curve), build)
+
+
+def adsr_blocks(dur, a, d, s, r, curve=0., size=2048):
+  """
+  ADSR envelope as blocks, to be multiplied by the blocks of a synthesized
+  note, so that each block costs a single vectorized multiplication.
+
+  Parameters
+  ----------
+  dur, a, d, s, r, curve :
+    See ``adsr_array``.
+  size :
+    Block size, in number of samples. The last block might be smaller.
+
+  Returns
+  -------
+  Stream instance of read-only Numpy arrays, views of the cached
+  ``adsr_array`` result. Joined, they have the same values from ``adsr``
+  when ``curve`` is zero.
+
+  """
+  return Stream(_blocks_from_array(adsr_array(dur, a, d, s, r, curve), size))
+
+
 @tostream
-def white_noise(dur=None, low=-1., high=1.):
+def attack_blocks(a, d, s, curve=0., size=2048):
+  """
+  Endless ADS attack envelope as blocks, the block version of ``attack``.
+
+  Parameters
+  ----------
+  a, d :
+    See ``attack``.
+  s :
+    "Sustain" amplitude level, a number (not a Stream).
+  curve :
+    Curvature of the attack and decay segments. See ``adsr_array``.
+  size :
+    Block size, in number of samples.
+
+  Returns
+  -------
+  Endless Stream instance of read-only Numpy arrays with ``size`` samples,
+  whose values are the same from ``attack`` when ``curve`` is zero.
+
+  """
+  def build(np):
+    len_a = int(a + .5)
+    len_d = int(d + .5)
+    len_s = -(len_a + len_d) % size # Sustain to fill the last block
+    return np.concatenate([_segment(np, 0., 1., a, len_a, curve),
+                           _segment(np, 1., s, d, len_d, curve),
+                           np.repeat(float(s), len_s + size)])
+  data = _cached_envelope(("attack", a, d, s, curve, size), build)
+  for blk in _blocks_from_array(data[:-size], size):
+    yield blk
+  sustain = data[-size:]
+  while True:
+    yield sustain
+
+
+def line_blocks(dur, begin=0., end=1., finish=False, curve=0., size=2048):
+  """
+  Line (or curve) envelope as blocks, the block version of ``line``, useful
+  for fading in (``line_blocks(dur)``) and fading out
+  (``line_blocks(dur, 1., 0.)``).
+
+  Parameters
+  ----------
+  dur, begin, end, finish :
+    See ``line``, but ``begin`` and ``end`` should be numbers.
+  curve :
+    Curvature, see ``adsr_array``.
+  size :
+    Block size, in number of samples. The last block might be smaller.
+
+  Returns
+  -------
+  Stream instance of read-only Numpy arrays, whose values are the same
+  from ``line`` when ``curve`` is zero.
+
+  """
+  data = _cached_envelope(
+    ("line", dur, begin, end, finish, curve),
+    lambda np: _segment(np, begin, end, dur - (1. if finish else 0.),
+                        int(dur + .5), curve),
+  )
+  return Stream(_blocks_from_array(data, size))
+
+
+NOISE_BLOCK_SIZE = 2048 # Samples per noise block
+
+
+def _noise_blocks(new_block, dur):
+  """
+  Internal generator of noise blocks (lists or arrays), each one from a
+  ``new_block(size)`` call, until the ``dur`` duration (in samples) is
+  reached. Endless when ``dur`` is None or ``inf``.
+  """
+  size = NOISE_BLOCK_SIZE
+  if dur is None or (isinf(dur) and dur > 0):
+    while True:
+      yield new_block(size)
+  remain = rint(dur)
+  while remain > 0:
+    yield new_block(min(remain, size))
+    remain -= size
+
+
+def _noise_stream(new_block, dur):
+  """
+  Internal Stream constructor for the noise generators, joining the blocks
+  (with their samples as Python numbers) in a C-level iterator.
+  """
+  return Stream(it.chain.from_iterable(_noise_blocks(new_block, dur)))
+
+
+def _np_rng(seed):
+  """
+  Internal NumPy pseudo-random number generator for one noise Stream.
+  Needs NumPy.
+  """
+  import numpy as np
+  return getattr(np.random, "default_rng", np.random.RandomState)(seed)
+
+
+white_noise = StrategyDict("white_noise")
+
+
+@white_noise.strategy("random", "std")
+def white_noise(dur=None, low=-1., high=1., seed=None):
   """
   White noise stream generator.
 
@@ -402,21 +616,53 @@ def white_noise(dur=None, low=-1., high=1.):
     Duration, in number of samples; endless if not given (or None).
   low, high :
     Lower and higher limits. Defaults to the [-1; 1] range.
+  seed :
+    Seed for a pseudo-random number generator owned by this Stream, so the
+    same seed always gives the same data. Defaults to None, which means
+    the data comes from the global ``random`` module state.
 
   Returns
   -------
   Stream yielding random numbers between -1 and 1.
 
+  Examples
+  --------
+  >>> white_noise(5, seed=42).take(5) == white_noise(seed=42).take(5)
+  True
+
+  Note
+  ----
+  The data is generated in blocks with ``NOISE_BLOCK_SIZE`` samples, using
+  the ``random`` module (Python standard library).
+
   """
-  if dur is None or (isinf(dur) and dur > 0):
-    while True:
-      yield random.uniform(low, high)
-  for x in xrange(rint(dur)):
-    yield random.uniform(low, high)
+  rand = (random if seed is None else random.Random(seed)).random
+  delta = high - low # Same to random.uniform, without its call overhead
+  return _noise_stream(lambda size: [low + delta * rand()
+                                     for unused in xrange(size)], dur)
 
 
-@tostream
-def gauss_noise(dur=None, mu=0., sigma=1.):
+@white_noise.strategy("numpy", "np")
+def white_noise(dur=None, low=-1., high=1., seed=None):
+  """
+  White noise stream generator based on the NumPy pseudo-random number
+  generators, creating each block with a single vectorized call.
+
+  See ``white_noise.random`` for more help, the only difference is that a
+  ``seed = None`` gives a new generator seeded by NumPy from the operating
+  system entropy sources. Needs NumPy.
+
+  """
+  rng = _np_rng(seed)
+  return _noise_stream(lambda size: rng.uniform(low, high, size).tolist(),
+                       dur)
+
+
+gauss_noise = StrategyDict("gauss_noise")
+
+
+@gauss_noise.strategy("random", "std")
+def gauss_noise(dur=None, mu=0., sigma=1., seed=None):
   """
   Gaussian (normal) noise stream generator.
 
@@ -428,6 +674,10 @@ def gauss_noise(dur=None, mu=0., sigma=1.):
     Distribution mean. Defaults to zero.
   sigma :
     Distribution standard deviation. Defaults to one.
+  seed :
+    Seed for a pseudo-random number generator owned by this Stream, so the
+    same seed always gives the same data. Defaults to None, which means
+    the data comes from the global ``random`` module state.
 
   Returns
   -------
@@ -444,11 +694,107 @@ def gauss_noise(dur=None, mu=0., sigma=1.):
     Clips the signal up to both a lower and a higher limit.
 
   """
-  if dur is None or (isinf(dur) and dur > 0):
-    while True:
-      yield random.gauss(mu, sigma)
-  for x in xrange(rint(dur)):
-    yield random.gauss(mu, sigma)
+  gauss = (random if seed is None else random.Random(seed)).gauss
+  return _noise_stream(lambda size: [gauss(mu, sigma)
+                                     for unused in xrange(size)], dur)
+
+
+@gauss_noise.strategy("numpy", "np")
+def gauss_noise(dur=None, mu=0., sigma=1., seed=None):
+  """
+  Gaussian (normal) noise stream generator based on the NumPy pseudo-random
+  number generators, creating each block with a single vectorized call.
+
+  See ``gauss_noise.random`` for more help, the only difference is that a
+  ``seed = None`` gives a new generator seeded by NumPy from the operating
+  system entropy sources. Needs NumPy.
+
+  """
+  rng = _np_rng(seed)
+  return _noise_stream(lambda size: rng.normal(mu, sigma, size).tolist(),
+                       dur)
+
+
+def pink_noise(dur=None, rows=16, seed=None):
+  """
+  Pink noise (1/f power spectrum) stream generator. Needs NumPy.
+
+  Uses the Voss-McCartney algorithm: the output is the mean of ``rows``
+  uniform random sources and a white one, where the ``k``-th source gets a
+  new value every ``2 ** (k + 1)`` samples, one source at a time. Each block
+  is computed with vectorized NumPy operations.
+
+  Parameters
+  ----------
+  dur :
+    Duration, in number of samples; endless if not given (or None).
+  rows :
+    Number of random sources with a held value, i.e., the number of octaves
+    where the spectrum is approximately 1/f. Defaults to 16.
+  seed :
+    Seed for the NumPy pseudo-random number generator owned by this Stream.
+    Defaults to None (seeded from the operating system entropy sources).
+
+  Returns
+  -------
+  Stream yielding pink noise values between -1 and 1.
+
+  """
+  import numpy as np
+  rng = _np_rng(seed)
+  held = rng.uniform(-1., 1., rows)
+  state = {"start": 0}
+
+  def new_block(size):
+    n = np.arange(state["start"], state["start"] + size)
+    state["start"] += size
+    total = rng.uniform(-1., 1., size)
+    for k in xrange(rows):
+      updates = (n + (1 << k)) >> (k + 1) # Updates done until each sample
+      updates -= (n[0] - 1 + (1 << k)) >> (k + 1) # Done before this block
+      values = np.concatenate([held[k:k + 1],
+                               rng.uniform(-1., 1., updates[-1])])
+      total += values[updates]
+      held[k] = values[-1]
+    return (total / (rows + 1)).tolist()
+
+  return _noise_stream(new_block, dur)
+
+
+def brown_noise(dur=None, step=.04, seed=None):
+  """
+  Brown (Brownian, red or 1/f^2) noise stream generator. Needs NumPy.
+
+  It's a random walk with uniformly distributed steps, reflected at the
+  -1 and 1 limits. Each block is found by a cumulative sum folded back to
+  the [-1; 1] range, so there's no Python loop per sample.
+
+  Parameters
+  ----------
+  dur :
+    Duration, in number of samples; endless if not given (or None).
+  step :
+    Maximum absolute step between two adjacent samples. Defaults to 0.04.
+  seed :
+    Seed for the NumPy pseudo-random number generator owned by this Stream.
+    Defaults to None (seeded from the operating system entropy sources).
+
+  Returns
+  -------
+  Stream yielding brown noise values between -1 and 1, starting near zero.
+
+  """
+  import numpy as np
+  rng = _np_rng(seed)
+  state = {"walk": 0.}
+
+  def new_block(size):
+    walk = state["walk"] + np.cumsum(rng.uniform(-step, step, size))
+    state["walk"] = walk[-1] % 4. # The folding has a period of 4
+    walk = (walk + 1.) % 4.
+    return np.where(walk < 2., walk - 1., 3. - walk).tolist()
+
+  return _noise_stream(new_block, dur)
 
 
 class TableLookupMeta(AbstractOperatorOverloaderMeta):
@@ -508,6 +854,8 @@ class TableLookup(meta(metaclass=TableLookupMeta)):
 
   @property
   def table(self):
+    if self._table is None: # Built on first use, see _lazy_table_lookup
+      self.table = self._builder()
     return self._table
 
   @table.setter
@@ -576,11 +924,25 @@ class TableLookup(meta(metaclass=TableLookupMeta)):
     return self / max_abs
 
 
+def _lazy_table_lookup(builder, size, cycles=1):
+  """
+  TableLookup instance whose table with the given size is only created (by
+  calling the builder) when it's needed for the first time.
+  """
+  result = TableLookup.__new__(TableLookup)
+  result._table, result._builder, result._len = None, builder, size
+  result.cycles = cycles
+  return result
+
+
 # Create the instance for each default table
 DEFAULT_TABLE_SIZE = 2**16
-sin_table = TableLookup([sin(x * 2 * pi / DEFAULT_TABLE_SIZE)
-                         for x in xrange(DEFAULT_TABLE_SIZE)])
-saw_table = TableLookup(list(line(DEFAULT_TABLE_SIZE, -1, 1, finish=True)))
+sin_table = _lazy_table_lookup(lambda: [sin(x * 2 * pi / DEFAULT_TABLE_SIZE)
+                                        for x in xrange(DEFAULT_TABLE_SIZE)],
+                               DEFAULT_TABLE_SIZE)
+saw_table = _lazy_table_lookup(lambda: list(line(DEFAULT_TABLE_SIZE, -1, 1,
+                                                 finish=True)),
+                               DEFAULT_TABLE_SIZE)
 
 
 @tostream
@@ -23,13 +23,22 @@ Testing module for the lazy_analysis module by using numpy as an oracle
 import pytest
 p = pytest.mark.parametrize
 
+import sys
+import numpy as np
 from numpy.fft import fft as np_fft
 
 # Audiolazy internal imports
-from ..lazy_analysis import dft
-from ..lazy_math import pi
-from ..lazy_misc import almost_eq, rint
-from ..lazy_synth import line
+from .. import lazy_analysis
+from ..lazy_analysis import (dft, window, cached_window, overlap_add,
+                             overlap_add_blocks,
+                             wola, yin, clip, clip_blocks, zcross,
+                             zcross_blocks, unwrap, unwrap_blocks, envelope,
+                             envelope_blocks)
+from ..lazy_math import pi, inf
+from ..lazy_misc import almost_eq, rint, sHz, freq2lag
+from ..lazy_synth import line, white_noise, sin_table, saw_table, sinusoid
+from ..lazy_stream import Stream
+from ..lazy_compat import xrange
 
 
 class TestDFT(object):
@@ -52,3 +61,225 @@ class TestDFT(object):
                   normalize=False
                  )
     assert almost_eq.diff(np_data, lz_data, max_diff=1e-12)
+
+
+class TestCachedWindow(object):
+
+  @p("name", [keys[0] for keys in window.keys()])
+  @p("size", [0, 1, 2, 5, 16, 33])
+  def test_numpy_path_sameness(self, name, size):
+    wnd = cached_window(name, size)
+    assert wnd.dtype == np.float64
+    assert almost_eq.diff(wnd.tolist(), window[name](size), max_diff=1e-14)
+
+  def test_extra_parameters_and_other_callables(self):
+    wnd = cached_window(window.blackman, 16, alpha=.2)
+    assert almost_eq.diff(wnd.tolist(), window.blackman(16, alpha=.2))
+    assert wnd is not cached_window(window.blackman, 16)
+    assert cached_window(None, 4).tolist() == [1.] * 4
+    assert cached_window(lambda size: [2.] * size, 3).tolist() == [2.] * 3
+
+  def test_bartlett_values(self):
+    wnd = cached_window(window.bartlett, 5)
+    assert wnd.tolist() == [0., .5, 1., .5, 0.]
+    assert cached_window("bartlett", 5) is wnd
+    assert not wnd.flags.writeable
+
+  def test_shared_read_only_array(self):
+    wnd = cached_window(window.hann, 32)
+    assert cached_window(window.hanning, 32) is wnd
+    assert cached_window("hann", 32) is wnd
+    with pytest.raises(ValueError):
+      wnd[0] = 1.
+
+  def test_least_recently_used_eviction(self, monkeypatch):
+    monkeypatch.setattr(lazy_analysis, "WINDOW_CACHE_SIZE", 2)
+    monkeypatch.setattr(lazy_analysis, "_window_cache",
+                        lazy_analysis.OrderedDict())
+    hann, hamming = cached_window("hann", 8), cached_window("hamming", 8)
+    assert cached_window("hann", 8) is hann # Now hamming is the LRU one
+    bartlett = cached_window("bartlett", 8)
+    assert len(lazy_analysis._window_cache) == 2
+    assert cached_window("hann", 8) is hann
+    assert cached_window("bartlett", 8) is bartlett
+    assert cached_window("hamming", 8) is not hamming
+
+
+class TestOverlapAddBlocks(object):
+
+  @p(("size", "hop"), [(8, 8), (8, 2), (8, 3), (17, 5), (6, 4), (1, 1)])
+  @p("wnd", [None, window.hann, window.triangular])
+  @p("normalize", [True, False])
+  def test_overlap_add_sameness(self, size, hop, wnd, normalize):
+    data = white_noise(97, seed=size + hop).take(inf)
+    blk_sig = [list(blk) for blk in Stream(data).blocks(size, hop)]
+    expected = overlap_add.numpy(blk_sig, hop=hop, wnd=wnd,
+                                 normalize=normalize).take(inf)
+    result = list(overlap_add_blocks(blk_sig, hop=hop, wnd=wnd,
+                                     normalize=normalize))
+    assert all(len(blk) == hop for blk in result[:len(blk_sig)])
+    assert all(0 < len(blk) <= hop for blk in result[len(blk_sig):])
+    assert almost_eq(np.hstack(result).tolist(), expected)
+
+  def test_unwindowed_sum(self):
+    blk_sig = [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10, 11, 12]]
+    result = overlap_add_blocks(blk_sig, hop=2, wnd=None, normalize=False)
+    assert [blk.tolist() for blk in result] == \
+           [[1., 2.], [8., 10.], [16., 18.], [11., 12.]]
+
+  def test_hop_greater_than_size(self):
+    result = overlap_add_blocks([[1, 2], [3, 4]], hop=3, wnd=None,
+                                normalize=False)
+    assert [blk.tolist() for blk in result] == [[1., 2., 0.], [3., 4., 0.]]
+
+  def test_empty(self):
+    assert list(overlap_add_blocks([], size=4, hop=2)) == []
+    assert list(wola([], size=4, hop=2)) == []
+
+  def test_wrong_block_size(self):
+    with pytest.raises(ValueError):
+      list(overlap_add_blocks([[1, 2, 3], [4, 5]], hop=1))
+
+
+class TestWOLA(object):
+
+  @p(("size", "hop"), [(16, 4), (16, 8), (32, 8), (15, 5), (12, 6), (10, 3)])
+  @p("wnd", [None, window.hann, window.hamming])
+  @p("analysis", [None, window.hann, window.hamming])
+  def test_identity_resynthesis(self, size, hop, wnd, analysis):
+    data = white_noise(200, seed=hop).take(inf)
+    awnd = np.ones(size) if analysis is None else np.array(analysis(size))
+    frames = [awnd * blk for blk in Stream(data).blocks(size, hop)]
+    result = np.hstack(list(wola(frames, hop=hop, wnd=wnd,
+                                 analysis=analysis)))
+    edge = size - hop
+    assert almost_eq(result[edge:len(data) - edge].tolist(),
+                     data[edge:len(data) - edge])
+
+  def test_analysis_window_from_lists(self):
+    data = [.3, -.2, .7, .1, .5, -.4, .2, -.1] * 4
+    wnd = window.hann(8)
+    frames = [[w * el for w, el in zip(wnd, blk)]
+              for blk in Stream(data).blocks(size=8, hop=2)]
+    result = np.hstack(list(wola(frames, size=8, hop=2,
+                                 analysis=window.hann)))
+    assert almost_eq(result[6:26].tolist(), data[6:26])
+
+  def test_constant_overlap_add_window(self):
+    wnd = window.hann(9)[:-1] # Periodic, its overlap with hop=4 sums to 1
+    frames = Stream(line(80)).blocks(size=8, hop=4).map(list).take(inf)
+    expected = overlap_add.numpy(frames, hop=4, wnd=wnd,
+                                 normalize=False).take(inf)
+    result = np.hstack(list(wola(frames, hop=4, wnd=wnd)))
+    assert almost_eq(result.tolist(), expected)
+
+
+class TestYIN(object):
+
+  rate = 44100
+
+  @p("freq", [82.4, 110., 220., 261.6, 440., 987.8])
+  @p("table", [sin_table, saw_table])
+  def test_pitch(self, freq, table):
+    s, Hz = sHz(self.rate)
+    sig = table(freq * Hz).take(4 * 2048)
+    pitches = yin(sig, size=2048, hop=1024, max_lag=900).take(inf)
+    assert len(pitches) == 7
+    for pitch in pitches:
+      assert abs(pitch / Hz - freq) < freq * 2e-3
+
+  def test_sinusoid_pitch_in_hz(self):
+    s, Hz = sHz(self.rate)
+    pitches = yin(sinusoid(220 * Hz).take(8192), size=2048) / Hz
+    assert [int(round(el)) for el in pitches] == [220] * 4
+
+  def test_difference_function_minimum_is_the_period(self):
+    data = (Stream(1, 2, -1, -1.5, 0, .3, -.7) * .1).take(700)
+    pitches = yin(data, size=350, min_lag=3).take(inf)
+    assert len(pitches) == 2
+    for pitch in pitches: # Period is 7, but there's the interpolation
+      assert abs(freq2lag(pitch) - 7) < .1
+
+  @p("unvoiced", [0., None])
+  def test_unvoiced(self, unvoiced):
+    silence = [0.] * 2048
+    noise = white_noise(2048, seed=3).take(inf)
+    assert yin(silence, 1024, unvoiced=unvoiced).take(inf) == [unvoiced] * 2
+    assert yin(noise, 1024, threshold=.05,
+               unvoiced=unvoiced).take(inf) == [unvoiced] * 2
+
+  @p(("size", "min_lag", "max_lag"), [(10, 2, 10), (10, 5, 5), (10, 0, 4)])
+  def test_invalid_lags(self, size, min_lag, max_lag):
+    with pytest.raises(ValueError):
+      yin([0.] * 20, size, min_lag=min_lag, max_lag=max_lag).take(inf)
+
+
+class TestBlockModeSameness(object):
+
+  data = (white_noise(1000, seed=7) * 2 +
+          sinusoid(.02) * line(1000, 0, 20)).take(inf)
+  sizes = [1, 3, 64, 1000, 2048]
+
+  def split(self, data, size):
+    return [np.array(data[idx:idx + size])
+            for idx in xrange(0, len(data), size)]
+
+  def join(self, blk_sig):
+    return [el for blk in blk_sig for el in blk.tolist()]
+
+  @p("size", sizes)
+  @p(("low", "high"), [(-1., 1.), (None, .5), (-.3, None), (None, None)])
+  def test_clip(self, size, low, high):
+    expected = clip(self.data, low=low, high=high).take(inf)
+    result = clip_blocks(self.split(self.data, size), low=low, high=high)
+    assert self.join(result) == expected
+
+  @p("size", sizes)
+  @p("hysteresis", [0, .1, .8])
+  @p("first_sign", [0, 1, -1])
+  def test_zcross(self, size, hysteresis, first_sign):
+    data = [0., 0.] + self.data + [0.] * 5
+    expected = zcross(data, hysteresis=hysteresis,
+                      first_sign=first_sign).take(inf)
+    result = zcross_blocks(self.split(data, size), hysteresis=hysteresis,
+                           first_sign=first_sign)
+    assert self.join(result) == expected
+
+  @p("size", sizes)
+  @p(("max_delta", "step"), [(pi, 2 * pi), (.5, 1.), (1., 3.)])
+  def test_unwrap(self, size, max_delta, step):
+    data = [el * 3 for el in self.data]
+    expected = unwrap(data, max_delta=max_delta, step=step).take(inf)
+    result = unwrap_blocks(self.split(data, size), max_delta=max_delta,
+                           step=step)
+    assert self.join(result) == expected
+
+  @p("size", sizes)
+  @p("env", ["rms", "abs", "squared"])
+  @p("cutoff", [pi / 512, pi / 8])
+  @p("scipy", [True, False])
+  def test_envelope(self, monkeypatch, size, env, cutoff, scipy):
+    if scipy:
+      pytest.importorskip("scipy.signal")
+    else: # Blocks the import, forcing the per sample loop
+      monkeypatch.setitem(sys.modules, "scipy.signal", None)
+    expected = envelope[env](self.data, cutoff=cutoff).take(inf)
+    result = envelope_blocks[env](self.split(self.data, size), cutoff=cutoff)
+    assert self.join(result) == expected
+
+  def test_list_blocks(self):
+    assert [blk.tolist() for blk in clip_blocks([[.2, -1.5, 1.], [3, -.7]],
+                                                low=-.5, high=.5)] == \
+           [[.2, -.5, .5], [.5, -.5]]
+    data = [[1, -1, .2], [-.1], [0, .5, -.3, -.5]]
+    assert [blk.tolist() for blk in zcross_blocks(data, hysteresis=.25)] == \
+           [[0, 1, 0], [0], [0, 1, 1, 0]]
+    data = [[0, 3, 6], [9, 12]]
+    assert [blk.tolist() for blk in unwrap_blocks(data, max_delta=2,
+                                                  step=5)] == \
+           [[0, -2, -4], [-6, -8]]
+
+  def test_empty_blocks(self):
+    blk_sig = [[], [1., -4.], [], [3.]]
+    for func in [clip_blocks, zcross_blocks, unwrap_blocks, envelope_blocks]:
+      assert [len(blk) for blk in func(blk_sig)] == [0, 2, 0, 1]
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Sun Oct 18 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Testing module for the lazy_bench module
+"""
+
+import pytest
+p = pytest.mark.parametrize
+
+import time
+import json
+
+# Audiolazy internal imports
+from .. import lazy_bench
+from ..lazy_bench import (BenchCase, BenchResult, bench_cases,
+                          strategy_dicts, strategy_bench, bench_report,
+                          load_profile, autotune, autotune_on_first_use)
+from .._internals import profile_on_import
+from ..lazy_core import StrategyDict
+from ..lazy_analysis import maverage, window
+from ..lazy_misc import blocks
+
+
+class StrategyDictCases(object):
+
+  def setup_method(self, method):
+    self.sd = sd = StrategyDict("test_bench_sd")
+
+    @sd.strategy("slow")
+    def sd(sig):
+      time.sleep(1e-3)
+      return [el * 2 for el in sig]
+
+    @sd.strategy("fast")
+    def sd(sig):
+      return [el + el for el in sig]
+
+    @sd.strategy("wrong")
+    def sd(sig):
+      return [el * 3 for el in sig]
+
+  def register(self, *names):
+    case = BenchCase(self.sd, names, lambda strategy, sig: strategy(sig))
+    bench_cases[self.sd.__name__] = [case]
+
+  def teardown_method(self, method):
+    bench_cases.pop(self.sd.__name__, None)
+
+
+class TestStrategyBench(StrategyDictCases):
+
+  def test_strategy_dicts(self):
+    sdicts = strategy_dicts()
+    assert maverage in sdicts
+    assert window in sdicts
+    assert blocks in sdicts
+    assert all(isinstance(sdict, StrategyDict) for sdict in sdicts)
+
+  def test_registered_cases_are_strategy_dicts(self):
+    names = [sdict.__name__ for sdict in strategy_dicts()]
+    for name, cases in bench_cases.items():
+      assert name in names
+      for case in cases:
+        assert len(case.names) >= 2
+
+  def test_results_and_set_default(self):
+    self.register("slow", "fast")
+    assert self.sd.default is self.sd.slow
+    results = strategy_bench(self.sd, sizes=[5, 7], repeat=1,
+                             set_default=True)
+    assert all(isinstance(res, BenchResult) for res in results)
+    assert [(res.strategy, res.size) for res in results] == \
+           [("slow", 5), ("fast", 5), ("slow", 7), ("fast", 7)]
+    assert all(res.agree for res in results)
+    assert all(res.time >= res.latency > 0 for res in results)
+    assert all(res.throughput == res.size / res.time for res in results)
+    assert self.sd.default is self.sd.fast
+
+  def test_disagreement_keeps_default(self):
+    self.register("slow", "wrong", "fast")
+    results = strategy_bench(self.sd, sizes=[4], repeat=1, set_default=True)
+    assert [res.agree for res in results] == [False] * 3
+    assert self.sd.default is self.sd.slow
+
+  def test_not_compared_keeps_default(self):
+    case = BenchCase(self.sd, ["slow", "fast"],
+                     lambda strategy, sig: strategy(sig), agree=False)
+    bench_cases[self.sd.__name__] = [case]
+    results = strategy_bench(self.sd, sizes=[4], repeat=1, set_default=True)
+    assert [res.agree for res in results] == [None] * 2
+    assert self.sd.default is self.sd.slow
+    assert autotune(self.sd, size=4, repeat=1, path="") == {}
+    assert self.sd.default is self.sd.slow
+
+  def test_no_case(self):
+    assert strategy_bench(self.sd, sizes=[4]) == []
+
+  def test_report(self):
+    self.register("fast", "slow")
+    results = strategy_bench(self.sd, sizes=[3], repeat=1, memory=False)
+    table = bench_report(results)
+    assert len(table) == 3 + len(results) + 1
+    assert table[0] == table[2] == table[-1]
+    assert table[3].split()[:3] == ["test_bench_sd", "fast", "3"]
+    assert table[3].split()[-2:] == ["-", "yes"]
+
+
+class TestAutotune(StrategyDictCases):
+
+  def test_autotune_and_load_profile(self, tmpdir):
+    self.register("slow", "fast")
+    path = str(tmpdir.join("profile.json"))
+    assert autotune(self.sd, size=8, repeat=1, path=path) == \
+           {"test_bench_sd": "fast"}
+    with open(path) as profile_file:
+      profile = json.load(profile_file)
+    assert list(profile.values()) == [{"test_bench_sd": {"8": "fast"}}]
+
+    # Another size class is kept in the profile
+    self.sd.default = self.sd.slow
+    self.register("slow", "wrong")
+    assert autotune(self.sd, size=64, repeat=1, path=path) == {}
+    with open(path) as profile_file:
+      assert json.load(profile_file) == profile
+
+    # Loading
+    original_strategy_dicts = lazy_bench.strategy_dicts
+    lazy_bench.strategy_dicts = lambda: [self.sd]
+    try:
+      assert load_profile(path, size=10) == {"test_bench_sd": "fast"}
+      assert self.sd.default is self.sd.fast
+      assert load_profile(str(tmpdir.join("missing.json"))) == {}
+      assert load_profile("") == {}
+    finally:
+      lazy_bench.strategy_dicts = original_strategy_dicts
+
+  @p(("no_profile_env", "exists", "expected"), [
+    (None, True, True),
+    (None, False, False),
+    ("1", True, False),
+  ])
+  def test_profile_on_import(self, monkeypatch, tmpdir, no_profile_env,
+                             exists, expected):
+    path = tmpdir.join("profile.json")
+    if exists:
+      path.write("{}")
+    monkeypatch.setenv("AUDIOLAZY_PROFILE", str(path))
+    if no_profile_env is None:
+      monkeypatch.delenv("AUDIOLAZY_NO_PROFILE", raising=False)
+    else:
+      monkeypatch.setenv("AUDIOLAZY_NO_PROFILE", no_profile_env)
+    assert profile_on_import() is expected
+
+  def test_empty_profile_path(self, monkeypatch):
+    monkeypatch.setenv("AUDIOLAZY_PROFILE", "")
+    monkeypatch.delenv("AUDIOLAZY_NO_PROFILE", raising=False)
+    assert profile_on_import() is False
+
+  def test_autotune_on_first_use(self, tmpdir):
+    self.register("slow", "fast")
+    path = str(tmpdir.join("profile.json"))
+    assert autotune_on_first_use(self.sd, size=8, path=path) == [self.sd]
+    assert self.sd.default not in [self.sd.slow, self.sd.fast]
+    assert not tmpdir.join("profile.json").check()
+    assert self.sd([1, 2]) == [2, 4]
+    assert self.sd.default is self.sd.fast
+    assert tmpdir.join("profile.json").check()
+    self.sd.default = self.sd.slow
+    assert autotune_on_first_use(self.sd, size=8, path=path) == []
+    assert self.sd.default is self.sd.slow
+
+  def test_first_use_ignores_dicts_without_cases(self, tmpdir):
+    path = str(tmpdir.join("profile.json"))
+    assert autotune_on_first_use(self.sd, path=path) == []
+    assert self.sd.default is self.sd.slow
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Mon Oct 19 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Testing module for the lazy_cache module
+"""
+
+import pytest
+p = pytest.mark.parametrize
+
+import gc
+import weakref
+
+# Audiolazy internal imports
+from ..lazy_cache import RenderCache
+from ..lazy_stream import Stream
+from ..lazy_misc import almost_eq
+from ..lazy_math import inf
+
+
+class TestRenderCache(object):
+
+  def test_memoize_renders_once(self):
+    cache = RenderCache()
+    calls = []
+
+    @cache.memoize
+    def render(dur, value=1.):
+      calls.append((dur, value))
+      return Stream(value).limit(dur)
+
+    assert render(3, value=.5).take(inf) == [.5] * 3
+    assert render(3, value=.5).take(inf) == [.5] * 3
+    assert render(2).take(inf) == [1.] * 2
+    assert calls == [(3, .5), (2, 1.)]
+    assert len(cache) == 2
+    assert cache.nbytes == 5 * 4
+
+  @p("typecode", ["f", "d"])
+  def test_precision(self, typecode):
+    cache = RenderCache(typecode=typecode)
+    data = [.1, -1 / 3, 2e-9]
+    result = cache.store("key", data).take(inf)
+    assert result == cache.replay("key").take(inf)
+    if typecode == "d":
+      assert result == data
+    else:
+      assert almost_eq(result, data, ignore_type=True)
+      assert result != data
+
+  def test_replay_streams_are_independent(self):
+    cache = RenderCache()
+    cache.store(1, [1, 2, 3])
+    first, second = cache.replay(1), cache.replay(1)
+    assert first.take(2) == [1., 2.]
+    assert second.take(inf) == [1., 2., 3.]
+    assert first.take(inf) == [3.]
+
+  def test_least_recently_used_eviction_by_size(self):
+    cache = RenderCache(max_bytes=36) # Nine 32 bits samples
+    cache.store("a", [1] * 4)
+    cache.store("b", [2] * 4)
+    cache.replay("a") # Now "b" is the least recently used
+    assert cache.store("c", [3] * 2).take(inf) == [3., 3.]
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.nbytes == 24
+    with pytest.raises(KeyError):
+      cache.replay("b")
+
+  def test_too_large_data_is_still_returned(self):
+    cache = RenderCache(max_bytes=8)
+    assert cache.store("key", [5] * 3).take(inf) == [5.] * 3
+    assert len(cache) == cache.nbytes == 0
+
+  def test_disk_spill(self, tmpdir):
+    cache = RenderCache(max_bytes=16, spill_dir=str(tmpdir),
+                        max_disk_bytes=16)
+    cache.store("a", [1, 2, 3])
+    replay = cache.replay("a")
+    cache.store("b", [4, 5])
+    assert len(tmpdir.listdir()) == 1 # The "a" buffer was spilled
+    assert cache.nbytes == 8 and cache.disk_nbytes == 12
+    assert cache.replay("a").take(inf) == [1., 2., 3.]
+    assert replay.take(inf) == [1., 2., 3.]
+    cache.store("c", [6] * 4) # Spills "b", and "a" is removed from disk
+    assert cache.disk_nbytes == 8
+    assert "a" not in cache
+    assert cache.replay("b").take(inf) == [4., 5.]
+    assert len(tmpdir.listdir()) == 1
+    cache.clear()
+    assert len(cache) == cache.nbytes == cache.disk_nbytes == 0
+    assert tmpdir.listdir() == []
+
+  def test_close_and_context_manager(self, tmpdir):
+    with RenderCache(max_bytes=0, spill_dir=str(tmpdir)) as cache:
+      cache.store("a", [1, 2])
+      assert len(tmpdir.listdir()) == 1
+    assert tmpdir.listdir() == []
+    assert len(cache) == cache.disk_nbytes == 0
+    cache.store("b", [3]) # Still usable
+    cache.close()
+    assert tmpdir.listdir() == []
+
+  @pytest.mark.skipif(not hasattr(weakref, "finalize"),
+                      reason="Without weakref.finalize, the spilled files "
+                             "are removed at the interpreter exit")
+  def test_garbage_collection_removes_files(self, tmpdir):
+    cache = RenderCache(max_bytes=0, spill_dir=str(tmpdir))
+    cache.store("a", [1, 2])
+    cache.itself = cache # A reference cycle
+    assert len(tmpdir.listdir()) == 1
+    del cache
+    gc.collect()
+    assert tmpdir.listdir() == []
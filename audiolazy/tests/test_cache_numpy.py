@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Mon Oct 19 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Testing module for the lazy_cache module by using numpy
+"""
+
+import pytest
+p = pytest.mark.parametrize
+
+import numpy as np
+
+# Audiolazy internal imports
+from ..lazy_cache import RenderCache
+from ..lazy_math import inf
+
+
+class TestNumpyRenderCache(object):
+
+  @p("spill", [False, True])
+  def test_array_input_and_buffer(self, tmpdir, spill):
+    cache = RenderCache(max_bytes=0 if spill else 2 ** 10,
+                        spill_dir=str(tmpdir) if spill else None)
+    result = cache.store("key", np.linspace(0, 1, 5)).take(inf)
+    buf = np.frombuffer(cache.buffer("key"), dtype=cache.typecode)
+    assert buf.dtype == np.float32
+    assert buf.tolist() == result == [0., .25, .5, .75, 1.]
+    assert cache.replay("key").take(inf) == result
+    assert len(tmpdir.listdir()) == spill
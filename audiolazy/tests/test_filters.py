@@ -30,13 +30,13 @@ from functools import reduce
 
 # Audiolazy internal imports
 from ..lazy_filters import (ZFilter, z, CascadeFilter, ParallelFilter,
-                            resonator, lowpass, highpass)
+                            resonator, lowpass, highpass, comb, frac_delay)
 from ..lazy_misc import almost_eq, zero_pad
 from ..lazy_compat import orange, xrange, xzip, xmap
 from ..lazy_itertools import cycle, chain
 from ..lazy_stream import Stream, thub
 from ..lazy_math import dB10, dB20, inf
-from ..lazy_synth import line
+from ..lazy_synth import line, impulse, karplus_strong
 
 from . import skipper
 operator.div = getattr(operator, "div", skipper("There's no operator.div"))
@@ -496,6 +496,21 @@ class TestZFilter(object):
     r, ex = result.take(length), expected.take(length)
     assert almost_eq(r, ex)
 
+  def test_memory_kinds(self):
+    filt = 1 / (1 - .5 * z ** -2)
+    expected = filt([0.] * 4, memory=[3., 4.]).take(4)
+
+    class CallableIterable(object): # Like a StrategyDict instance
+      def __iter__(self):
+        raise AssertionError("Should be called instead")
+      def __call__(self, size):
+        return [3., 4., 5.][:size]
+
+    assert filt([0.] * 4, memory=CallableIterable()).take(4) == expected
+    assert filt([0.] * 4, memory=lambda size: [3., 4.]).take(4) == expected
+    assert filt([0.] * 4, memory=Stream(3., 4.)).take(4) == expected
+    assert filt([0.] * 4, memory=iter([3., 4., 5.])).take(4) == expected
+
   def test_hashable(self):
     filt = 1 / (7 + z ** -1)
     my_set = {filt, 17, z, z ** -1, object}
@@ -504,6 +519,61 @@ class TestZFilter(object):
     assert filt in my_set
     assert -z not in my_set
 
+  @p("filt", [1 / (1 - z ** -1),
+              CascadeFilter(1 / (1 - z ** -1), 1 + z ** -1),
+              ParallelFilter(1 / (1 - z ** -1), z ** -1)])
+  def test_freq_response_zero_denominator(self, filt):
+    value = filt.freq_response(0.)
+    assert value != value # NaN
+    for container in [list, tuple]:
+      data = filt.freq_response(container([0., pi]))
+      assert type(data) == container
+      assert data[0] != data[0]
+      assert data[1] == data[1]
+
+
+class TestControlRate(object):
+
+  data = [.3, -2, 5, 1.5, 0, 7, -.25, 1] * 5
+
+  @p("size", [1, 3, 8])
+  def test_hold(self, size):
+    coeffs = [.5, -.2, .7, .1, .9, -.4]
+    filt = (1 + Stream(*coeffs) * z ** -1) / (1 - Stream(.3, -.1) * z ** -2)
+    expected_filt = (1 + Stream(*[c for c in coeffs for unused in
+                                  xrange(size)]) * z ** -1) / \
+                    (1 - Stream(*[.3] * size + [-.1] * size) * z ** -2)
+    result = filt.control_rate(size, interpolate=False)(self.data)
+    assert almost_eq(result.take(inf), expected_filt(self.data).take(inf))
+
+  @p("size", [1, 4, 7])
+  def test_linear_interpolation(self, size):
+    ctrl = [2., 4., 1.]
+    filt = (1 / (Stream(*ctrl) - .5 * z ** -1)).control_rate(size)
+    gain = [a + (b - a) * k / size for a, b in xzip(ctrl, ctrl[1:] + [2.])
+                                   for k in xrange(size)]
+    expected = (1 / (Stream(*gain) - .5 * z ** -1))(self.data)
+    assert almost_eq(filt(self.data).take(inf), expected.take(inf))
+
+  def test_finite_control_data(self):
+    filt = (1 + iter([1, 2]) * z ** -1).control_rate(3, interpolate=False)
+    assert filt(self.data, zero=0).take(inf) == [
+      self.data[0],
+      self.data[1] + self.data[0],
+      self.data[2] + self.data[1],
+      self.data[3] + 2 * self.data[2],
+      self.data[4] + 2 * self.data[3],
+      self.data[5] + 2 * self.data[4],
+    ]
+    empty = (1 + iter([]) * z ** -1).control_rate(3)
+    assert empty(self.data).take(inf) == []
+
+  def test_constant_coefficients_are_kept(self):
+    filt = resonator(1, .2)
+    ctrl_filt = filt.control_rate(16)
+    assert ctrl_filt == filt
+    assert ctrl_filt is not filt
+
 
 @p("filt_class", [CascadeFilter, ParallelFilter])
 class TestCascadeAndParallelFilters(object):
@@ -644,3 +714,74 @@ class TestLowpassHighpass(object):
     freqs = line(50, 0, pi)
     for a, b in filt.freq_response(freqs).map(abs).blocks(size=2, hop=1):
       assert a < b
+
+
+class TestDelayLines(object):
+
+  data = [.3, -2, 5, 1.5, 0, 7, -.25, 1] * 12
+  filters = [
+    comb(20, .5),
+    comb.ff(13, -.7),
+    comb.tau(37.4, 1e3).linearize(),
+    (1 + .3 * z ** -19 - z ** -41) / (2 - .4 * z ** -9 + .2 * z ** -30),
+    1 / (1 + z ** -11 - .5 * z ** -25),
+    (.5 - z ** -2) / (1 - .5 * z ** -2),
+    ZFilter([.1, .2, -.3, .4], [1, -.2, .1]),
+    -z ** -3,
+  ]
+
+  def split(self, filt):
+    """ Filters forcing delay lines and shifted memory, respectively """
+    ring = ZFilter(filt.numerator, filt.denominator)
+    ring.max_shift_memory = ring.delay_line_tap_cost = 0
+    dense = ZFilter(filt.numerator, filt.denominator)
+    dense.max_shift_memory = inf
+    return ring, dense
+
+  @p("filt", filters)
+  def test_delay_line_matches_shifted_memory(self, filt):
+    ring, dense = self.split(filt)
+    expected = dense(self.data).take(inf)
+    assert almost_eq(ring(self.data), expected)
+    assert almost_eq(filt(self.data), expected)
+
+  @p("filt", filters)
+  def test_delay_line_memory(self, filt):
+    ring, dense = self.split(filt)
+    memory = [.1 * k - 2 for k in xrange(50)]
+    assert almost_eq(ring(self.data, memory=memory),
+                     dense(self.data, memory=memory))
+
+  def test_comb_impulse_response(self):
+    assert comb(25, .5)(impulse(78)).take(inf) == \
+           ([1.] + [0.] * 24) + ([.5] + [0.] * 24) + \
+           ([.25] + [0.] * 24) + [.125, 0., 0.]
+
+  def test_time_variant_long_delay(self):
+    coeff = Stream(.5, -.25)
+    filt = 1 + coeff * z ** -15
+    result = filt(self.data).take(len(self.data))
+    expected = [x + c * d for x, c, d in xzip(self.data, coeff,
+                                              [0.] * 15 + self.data)]
+    assert almost_eq(result, expected)
+
+  def test_karplus_strong_memory(self):
+    memory = [.1 * (k % 7) for k in xrange(200)]
+    filt = comb.tau(100.3, 2e4).linearize()
+    ks = karplus_strong(2 * pi / 100.3, memory=memory)
+    assert almost_eq(ks.take(300), filt([0.] * 300, memory=memory))
+
+  @p("filt_func", frac_delay)
+  @p("delay", [0, .25, 1.5, 2, 7.8, 31.3])
+  def test_frac_delay_at_low_frequencies(self, filt_func, delay):
+    filt = filt_func(delay)
+    assert almost_eq(filt.freq_response(0), 1.)
+    freq = 1e-3
+    group_delay = -(filt.freq_response(freq).imag / freq) # Small phase
+    assert almost_eq.diff(group_delay, delay, max_diff=1e-2)
+
+  @p("delay", [.25, 1.5, 7.8])
+  def test_frac_delay_allpass_magnitude(self, delay):
+    filt = frac_delay.allpass(delay)
+    freqs = line(20, 0, pi)
+    assert almost_eq(filt.freq_response(freqs).map(abs), [1.] * 20)
@@ -23,17 +23,18 @@ Testing module for the lazy_filters module by using Numpy/Scipy/Sympy
 import pytest
 p = pytest.mark.parametrize
 
-from scipy.signal import lfilter
+from scipy.signal import lfilter, freqz, group_delay
 from scipy.optimize import fminbound
 from math import cos, pi, sqrt
-from numpy import mat
+from numpy import mat, array, linspace, ndarray
 from sympy import symbols, Matrix, sqrt as symb_sqrt
 
 # Audiolazy internal imports
-from ..lazy_filters import ZFilter, resonator, z
+from ..lazy_filters import (ZFilter, resonator, z, comb, CascadeFilter,
+                            ParallelFilter)
 from ..lazy_misc import almost_eq
 from ..lazy_compat import orange, xrange, xzip, xmap
-from ..lazy_math import dB20
+from ..lazy_math import dB20, inf
 from ..lazy_itertools import repeat, cycle, count
 from ..lazy_stream import Stream, thub
 
@@ -265,3 +266,96 @@ class TestResonatorScipy(object):
 
     else: # Given frequency is the resonance frequency
       assert almost_eq(freq, resonance_freq)
+
+
+class TestFreqResponseNumpyScipy(object):
+
+  freqs = linspace(0, pi, 301)
+  filters = [
+    resonator(1, .1),
+    (1 + z ** -2) / (1 - .5 * z ** -1),
+    comb(150, .3), # Sparse
+    comb.tau(100.3, 2e3), # Fractional delay
+    z ** 3 * (1 - z ** -5), # Non-causal
+    CascadeFilter(resonator(1, .1), 1 - .9 * z ** -1),
+    ParallelFilter(comb(20, .5), 1 + z ** -1),
+    CascadeFilter(ParallelFilter(comb(7, .5), z ** -1), resonator(2, .3)),
+  ]
+
+  @p("filt", filters)
+  @p("container", [list, tuple, array])
+  def test_container_and_elementwise_equalness(self, filt, container):
+    data = filt.freq_response(container(self.freqs.tolist()))
+    assert type(data) == (ndarray if container is array else container)
+    expected = [filt.freq_response(freq) for freq in self.freqs.tolist()]
+    assert almost_eq.diff(data, expected, max_diff=1e-10)
+
+  @p("filt", filters[:3])
+  def test_freqz(self, filt):
+    expected = freqz(filt.numerator, filt.denominator, self.freqs)[1]
+    assert almost_eq.diff(filt.freq_response(self.freqs), expected,
+                          max_diff=1e-10)
+
+  def test_zero_denominator(self):
+    data = (1 / (1 - z ** -1)).freq_response([0., pi])
+    assert data[0] != data[0] # NaN
+    assert almost_eq(data[1], .5)
+
+  def test_time_variant_filter_keeps_elementwise_evaluation(self):
+    filt = 1 + Stream(.5, -.5) * z ** -1
+    data = filt.freq_response([0., pi])
+    assert isinstance(data, list)
+    assert all(isinstance(el, Stream) for el in data)
+    assert almost_eq(data[0].take(4), [1.5, .5, 1.5, .5])
+
+
+class TestZFilterPoleZeroAnalysis(object):
+
+  def test_poles_zeros_cache_invalidation(self):
+    filt = (1 - z ** -2) / (1 - .25 * z ** -2)
+    assert almost_eq(sorted(filt.poles), [-.5, .5])
+    assert almost_eq(sorted(filt.zeros), [-1, 1])
+    poles = filt.poles
+    poles.append(7) # Changing the result shouldn't change the cache
+    assert len(filt.poles) == 2
+    filt.denpoly[2] = -4
+    assert almost_eq(sorted(filt.poles), [-2, 2])
+    assert not filt.is_stable()
+    filt.denpoly = ZFilter([1, 0, -.04]).numpoly
+    assert filt.is_stable()
+    assert almost_eq(sorted(filt.poles), [-.2, .2])
+    assert almost_eq(sorted(filt.zeros), [-1, 1])
+
+  @p(("filt", "expected"), [
+    (1 / (1 - .5 * z ** -1), True),
+    (1 / (1 - z ** -1), False), # Critical stability
+    (1 / (1 + 1.1 * z ** -1), False),
+    (resonator(1, .1), True),
+  ])
+  def test_is_stable(self, filt, expected):
+    assert filt.is_stable() == expected
+
+  @p("filt", [resonator(1, .1), 1 / (1 - .5 * z ** -1) ** 3,
+              (1 - z ** -3) / (1 + .81 * z ** -2), comb(20, .3)])
+  def test_group_delay(self, filt):
+    freqs = linspace(.05, pi - .05, 50)
+    expected = group_delay((filt.numerator, filt.denominator), freqs)[1]
+    assert almost_eq(filt.group_delay(freqs), expected)
+    assert almost_eq(filt.group_delay(freqs.tolist()),
+                     [filt.group_delay(freq) for freq in freqs.tolist()])
+
+  @p(("filt", "tol", "expected"), [
+    (1 - z ** -4, 1e-3, 5),
+    (1 / (1 - .5 * z ** -1), 1e-3, 11),
+    (1 / (1 - z ** -1), 1e-3, inf),
+    (z ** -2 / (1 - .9 * z ** -1), 1e-2, 47),
+  ])
+  def test_impulse_length(self, filt, tol, expected):
+    assert filt.impulse_length(tol) == expected
+
+  def test_time_variant_filters(self):
+    filt = 1 / (1 - Stream(.5, .2) * z ** -1)
+    for method in [filt.is_stable, filt.impulse_length,
+                   lambda: filt.group_delay(0)]:
+      with pytest.raises(AttributeError):
+        method()
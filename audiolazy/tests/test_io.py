@@ -25,16 +25,22 @@ p = pytest.mark.parametrize
 
 import pyaudio
 import _portaudio
+import numpy as np
 from collections import deque
 from time import sleep
+from io import BytesIO
+from contextlib import closing
 import struct
+import sys
 
 # Audiolazy internal imports
-from ..lazy_io import AudioIO, chunks
+from ..lazy_io import (AudioIO, chunks, AudioFileStream, AudioFile,
+                       write_audio, DeadlineMonitor)
 from ..lazy_synth import white_noise
 from ..lazy_stream import Stream
-from ..lazy_misc import almost_eq
-from ..lazy_compat import orange
+from ..lazy_misc import almost_eq, blocks
+from ..lazy_compat import orange, xrange
+from ..lazy_math import inf
 
 
 class WaitStream(Stream):
@@ -93,6 +99,9 @@ class MockStream(object):
       self._pa.fake_output.active = False
     self._pa._streams.remove(self)
 
+  def get_output_latency(self):
+    return .005
+
 
 def mock_write_stream(pa_stream, data, chunk_size, should_throw_exception):
   """
@@ -125,6 +134,80 @@ def test_output_only(monkeypatch, data):
   assert player._pa.terminated # Test whether "terminate" was called
 
 
+@pytest.mark.timeout(2)
+def test_output_monitor(monkeypatch):
+  monkeypatch.setattr(pyaudio, "PyAudio", MockPyAudio)
+  monkeypatch.setattr(pyaudio, "Stream", MockStream)
+  monkeypatch.setattr(_portaudio, "write_stream", mock_write_stream)
+
+  calls = []
+  monitor = DeadlineMonitor(callback=calls.append)
+  with AudioIO(True, monitor=monitor) as player:
+    thread = player.play(orange(100), chunk_size=16, rate=8000)
+    assert thread.monitor is monitor
+    assert len(list(player._pa.fake_output)) == 112
+  assert monitor.chunks == sum(monitor.histogram) == len(calls) == 7
+  assert monitor.period == 16 / 8000.
+  assert monitor.latency == .005
+
+
+class TestDeadlineMonitor(object):
+
+  def test_register(self):
+    monitor = DeadlineMonitor(history=2)
+    monitor.reset(rate=1000, chunk_size=10)
+    for render_time in [.001, .005, .012, .03]:
+      monitor.register(render_time, .01)
+    assert monitor.chunks == 4
+    assert monitor.deadline_misses == 2
+    assert almost_eq(monitor.rtf, 1.2)
+    assert almost_eq(monitor.max_rtf, 3.)
+    assert almost_eq(monitor.last_rtf, 3.)
+    assert monitor.histogram == [1, 0, 1, 0, 0, 1, 0, 1]
+    assert list(monitor.history) == [(.012, .01), (.03, .01)]
+    assert monitor.underruns == 2 # The latency defaults to the period
+    monitor.reset()
+    assert monitor.chunks == monitor.deadline_misses == 0
+    assert monitor.underruns == 0
+    assert monitor.rtf == 0.
+    assert not monitor.history
+    assert monitor.period == monitor.latency == chunks.size / 44100.
+
+  def test_underruns_from_latency(self):
+    monitor = DeadlineMonitor()
+    monitor.reset(rate=1000, chunk_size=10, latency=.02)
+    for render_time in [.5, .001, .012, .03, .015]: # First isn't counted
+      monitor.register(render_time, .01)
+    assert monitor.deadline_misses == 4
+    assert monitor.underruns == 1
+
+  def test_monitored_chunks_and_write(self):
+    calls, written = [], []
+    monitor = DeadlineMonitor(callback=calls.append)
+
+    def write_stream(stream, chunk, chunk_size, should_throw_exception):
+      assert not should_throw_exception # Passed through
+      written.append(chunk)
+
+    write = monitor.monitored_write(write_stream)
+    for chunk in monitor.monitored_chunks("abc"):
+      write(None, chunk, 1, False)
+    assert written == list("abc")
+    assert calls == [monitor] * 3
+    assert monitor.chunks == 3
+
+  def test_write_errors(self):
+    def write_stream(stream, chunk, chunk_size, should_throw_exception):
+      raise IOError(-9999, "Unanticipated host error")
+
+    monitor = DeadlineMonitor()
+    write = monitor.monitored_write(write_stream)
+    with pytest.raises(IOError):
+      for chunk in monitor.monitored_chunks("a"):
+        write(None, chunk, 1, False)
+    assert monitor.chunks == monitor.underruns == 0
+
+
 @p("func", chunks)
 class TestChunks(object):
 
@@ -161,3 +244,193 @@ class TestChunks(object):
       assert list(func(self.data)) == list(func(self.data, size=size))
     finally:
       chunks.size = dsize
+
+
+class TestAudioFiles(object):
+
+  data = [0., .5, -.5, .25, -1., 1., -.999, .3, 1.5, -1.5, 1e-3, .75, -.125]
+  formats = [(ff, sf) for ff in ["wav", "aiff"]
+                      for sf in ["uint8" if ff == "wav" else "int8", "int16",
+                                 "int24", "int32", "float32", "float64"]]
+
+  @p(("file_format", "sample_format"), formats)
+  @p("nchannels", [1, 2, 3])
+  @p("chunk_size", [1, 4, None])
+  @p("numpy", [True, False])
+  def test_write_read_round_trip(self, monkeypatch, file_format,
+                                 sample_format, nchannels, chunk_size,
+                                 numpy):
+    if not numpy:
+      monkeypatch.setitem(sys.modules, "numpy", None)
+    fobj = BytesIO()
+    nframes = write_audio(fobj, Stream(self.data), rate=22050,
+                          nchannels=nchannels, sample_format=sample_format,
+                          file_format=file_format, chunk_size=chunk_size)
+    padded = self.data + [0.] * (-len(self.data) % nchannels)
+    assert nframes == len(padded) // nchannels
+    result = AudioFileStream(fobj, chunk_size=chunk_size)
+    assert isinstance(result, Stream)
+    assert result.rate == 22050
+    assert result.nchannels == nchannels
+    assert result.sample_format == sample_format
+    assert result.nframes == nframes
+    result = list(result)
+    assert all(isinstance(el, float) for el in result)
+    if sample_format == "float64":
+      assert result == padded
+    elif sample_format == "float32":
+      assert almost_eq(result, padded)
+    else:
+      bits = int(sample_format[-2:].strip("t"))
+      expected = [min(max(el, -1.), 1. - 2. ** (1 - bits)) for el in padded]
+      assert almost_eq.diff(result, expected, max_diff=2. ** (1 - bits))
+
+  @p("sample_format", ["int8", "int16", "int24", "int32"])
+  @p("numpy", [True, False])
+  def test_integer_rounding(self, monkeypatch, sample_format, numpy):
+    if not numpy:
+      monkeypatch.setitem(sys.modules, "numpy", None)
+    lsb = 2. ** (1 - int(sample_format[3:]))
+    steps = [0, .4, .6, -.4, -.6, 3.4, 3.6, -3.4, -3.6] # Sub-LSB offsets
+    fobj = BytesIO()
+    write_audio(fobj, [el * lsb for el in steps], file_format="aiff",
+                sample_format=sample_format)
+    assert list(AudioFileStream(fobj)) == [round(el) * lsb for el in steps]
+
+  @p("use_mmap", [True, False])
+  @p("ext", ["wav", "aif"])
+  def test_file_names(self, tmpdir, use_mmap, ext):
+    fname = str(tmpdir.join("test." + ext))
+    write_audio(fname, self.data, rate=8000, sample_format="float32")
+    with open(fname, "rb") as f:
+      magic = f.read(12)
+    assert magic[8:] == (b"WAVE" if ext == "wav" else b"AIFC")
+    result = AudioFileStream(fname, chunk_size=5, use_mmap=use_mmap)
+    assert almost_eq(list(result), self.data)
+
+  @p("sampwidth", [1, 2, 3, 4])
+  @p("module_name", ["wave", "aifc"])
+  def test_standard_library_compatibility(self, tmpdir, sampwidth,
+                                          module_name):
+    module = __import__(module_name)
+    fname = str(tmpdir.join("test." + module_name))
+    sample_format = "int{}".format(8 * sampwidth)
+    if (module_name, sampwidth) == ("wave", 1):
+      sample_format = "uint8"
+    file_format = "wav" if module_name == "wave" else "aiff"
+    write_audio(fname, self.data, rate=11025, nchannels=1,
+                sample_format=sample_format, file_format=file_format)
+    with closing(module.open(fname, "rb")) as f:
+      assert f.getnchannels() == 1
+      assert f.getsampwidth() == sampwidth
+      assert f.getframerate() == 11025
+      assert f.getnframes() == len(self.data)
+      frames = f.readframes(len(self.data))
+    fname_std = str(tmpdir.join("std." + module_name))
+    with closing(module.open(fname_std, "wb")) as f:
+      f.setnchannels(1)
+      f.setsampwidth(sampwidth)
+      f.setframerate(11025)
+      f.writeframes(frames)
+    assert list(AudioFileStream(fname_std)) == list(AudioFileStream(fname))
+
+  def test_invalid(self):
+    with pytest.raises(ValueError):
+      AudioFileStream(BytesIO(b"RIFF\0\0\0\0WAVX" + b"\0" * 50))
+    with pytest.raises(ValueError):
+      write_audio(BytesIO(), [0.], sample_format="int8", file_format="wav")
+    with pytest.raises(ValueError):
+      write_audio(BytesIO(), [0.], sample_format="int12")
+    with pytest.raises(ValueError):
+      write_audio(BytesIO(), [0.], file_format="mp3")
+
+
+class TestAudioFile(object):
+
+  data = [.1 * k - 1. for k in xrange(21)] + [.5, -.25, .375, -.0625, .75]
+  ld = len(data)
+
+  def create(self, tmpdir, ext="wav", **kwargs):
+    fname = str(tmpdir.join("test." + ext))
+    write_audio(fname, self.data, **kwargs)
+    return fname
+
+  @p("ext", ["wav", "aif"])
+  @p("sample_format", ["int16", "int24", "float32", "float64"])
+  @p("nchannels", [1, 2])
+  @p("start", [0, 1, 7, 100])
+  def test_stream(self, tmpdir, ext, sample_format, nchannels, start):
+    fname = self.create(tmpdir, ext, sample_format=sample_format,
+                        nchannels=nchannels)
+    expected = list(AudioFileStream(fname))
+    with AudioFile(fname) as af:
+      assert af.nchannels == nchannels
+      assert af.sample_format == sample_format
+      assert len(af) == af.nframes == len(expected) // nchannels
+      result = af.stream(start, chunk_size=3)
+      assert isinstance(result, Stream)
+      assert list(result) == expected[start * nchannels:]
+      assert af.stream(start, start + 5).take(inf) == \
+             expected[start * nchannels:(start + 5) * nchannels]
+
+  def test_multiple_readers(self, tmpdir):
+    with AudioFile(self.create(tmpdir, sample_format="float64")) as af:
+      first, second = af.stream(), af.stream(3, chunk_size=2)
+      assert first.take(5) == self.data[:5]
+      assert second.take(4) == self.data[3:7]
+      assert first.take(5) == self.data[5:10]
+      assert af[4:7] == self.data[4:7]
+      assert af[-2] == self.data[-2]
+      assert af[1:9:3] == self.data[1:9:3]
+      with pytest.raises(IndexError):
+        af[self.ld]
+
+  @p("sample_format", ["int24", "float32"])
+  def test_closed(self, tmpdir, sample_format):
+    af = AudioFile(self.create(tmpdir, sample_format=sample_format))
+    reader = af.stream(chunk_size=4)
+    first = reader.take(2)
+    assert almost_eq.diff(first, self.data[:2], max_diff=1e-6)
+    af.close()
+    assert almost_eq.diff(reader.take(2), self.data[2:4], # Decoded chunk
+                          max_diff=1e-6)
+    for func in [lambda: reader.take(inf), lambda: af[:3], lambda: af[0],
+                 lambda: af.stream().take(1)]:
+      with pytest.raises(ValueError):
+        func()
+
+  @p("size", [1, 3, 4, 7, ld, ld + 2])
+  @p("hop", [None, 1, 2, 5, 9])
+  @p("sample_format", ["int16", "int24", "float32"])
+  def test_blocks(self, tmpdir, size, hop, sample_format):
+    fname = self.create(tmpdir, sample_format=sample_format)
+    expected = [list(blk) for blk in blocks(AudioFileStream(fname),
+                                            size=size, hop=hop, padval=.5)]
+    with AudioFile(fname) as af:
+      result = [blk.tolist() for blk in af.blocks(size, hop, padval=.5)]
+    assert result == expected
+
+  def test_blocks_channels_and_range(self, tmpdir):
+    fname = self.create(tmpdir, sample_format="float64", nchannels=2)
+    with AudioFile(fname) as af:
+      blks = list(af.blocks(4, start=2, stop=10))
+      assert len(blks) == 2
+      assert all(blk.shape == (4, 2) for blk in blks)
+      assert blks[0].ravel().tolist() == self.data[4:12]
+      right = list(af.blocks(4, 2, start=2, stop=10, channel=1))
+      assert [blk.tolist() for blk in right] == \
+             [self.data[5:13:2], self.data[9:17:2], self.data[13:21:2]]
+
+  def test_blocks_zero_copy(self, tmpdir):
+    data = np.array(self.data, dtype="f") # Native byte order
+    fname = str(tmpdir.join("test.wav"))
+    write_audio(fname, data, sample_format="float32")
+    af = AudioFile(fname)
+    raw = af.array()
+    assert raw.shape == (self.ld, 1)
+    assert not raw.flags.writeable
+    blks = list(af.blocks(8, 4))
+    assert all(np.may_share_memory(blk, raw) for blk in blks[:-1])
+    assert blks[2].tolist() == data[8:16].tolist()
+    af.close() # Views are still alive
+    assert blks[0].tolist() == data[:8].tolist()
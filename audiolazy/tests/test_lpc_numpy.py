@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Sun Oct 18 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Testing module for the lazy_lpc module by using numpy
+"""
+
+import pytest
+p = pytest.mark.parametrize
+
+import numpy as np
+
+# Audiolazy internal imports
+from . import test_lpc
+from ..lazy_lpc import (levinson_durbin, lpc, parcor, parcor_stable, lsf,
+                        lsf_stable, LPCFrames, levinson_durbin_frames,
+                        lpc_frames, parcor_frames, parcor_stable_frames,
+                        lsf_frames, lsf_stable_frames)
+from ..lazy_misc import almost_eq
+from ..lazy_filters import z, ZFilter
+from ..lazy_math import pi
+from ..lazy_stream import Stream
+
+
+class TestLPCFrames(object):
+
+  real_block = test_lpc.TestLPCParcorLSFAndStability.real_block
+
+  @p("order", [1, 3, 7, 12])
+  def test_frames_from_blocks(self, order):
+    frames = [list(blk) for blk in
+              Stream(self.real_block).blocks(size=40, hop=25)]
+    result = lpc_frames(Stream(self.real_block).blocks(size=40, hop=25),
+                        order)
+    assert isinstance(result, LPCFrames)
+    assert len(result) == len(frames)
+    for blk, filt, k in zip(frames, result, result.k):
+      expected = lpc.kautocor(blk, order)
+      assert almost_eq(filt.numerator, expected.numerator)
+      assert almost_eq(filt.error, expected.error)
+      assert almost_eq(k, list(parcor(expected)))
+
+  def test_periodic_blocks(self):
+    data = [-1, 0, 1, 0] * 4
+    result = lpc_frames(Stream(data).blocks(size=16, hop=8), 2)
+    assert repr(result) == "<LPCFrames with 1 frames of order 2>"
+    assert isinstance(result.coeffs, np.ndarray)
+    assert result.coeffs.tolist() == [[1., 0., .875]]
+    assert result.error.tolist() == [1.875]
+    assert str(result[0]) == "1 + 0.875 * z^-2"
+
+  def test_levinson_durbin_frames(self):
+    acdata = [[1, 5, 3], [12, 6, 0]]
+    result = levinson_durbin_frames(acdata)
+    for filt, ac in zip(result, acdata):
+      assert almost_eq(filt.numerator, levinson_durbin(ac).numerator)
+      assert almost_eq(filt.error, levinson_durbin(ac).error)
+    assert result[-1] is result[1] # Lazy and cached
+
+  @p("order", [5, 9])
+  def test_order_not_smaller_than_block_size(self, order):
+    blk = [1, 2, -3, 4.5, .5]
+    result = lpc_frames([blk], order)
+    assert result.coeffs.shape == (1, order + 1)
+    assert almost_eq(result[0].numerator,
+                     lpc.kautocor(blk, order).numerator)
+
+  def test_silence(self):
+    result = lpc_frames([[0] * 10, [1, 0] * 5], 3)
+    assert result.coeffs.tolist()[0] == [1, 0, 0, 0]
+    assert result.error.tolist()[0] == 0
+    assert result.k.tolist()[0] == [0, 0, 0]
+    assert almost_eq(result[1].numerator,
+                     lpc.kautocor([1, 0] * 5, 3).numerator)
+
+
+class TestParcorLSFFrames(object):
+
+  filters = [
+    1 - 0.457681292332 * z ** -1 + 0.297451538058 * z ** -2 \
+      - 0.162014679229 * z ** -3,
+    levinson_durbin([1, 2, 3, 4, 5, 3, 2, 1]), # Unstable
+    ZFilter([1, -.5, 0, 0, 0, 0, 0, .25]),
+    ZFilter([1, -1.8, .9]), # Resonance
+    ZFilter([1, -2.1, 1.1]), # Unstable
+    ZFilter([1, .3]),
+    ZFilter([1, 0, 0, 0, 0, 0, 0, 0, .9]), # Comb
+  ] + [lpc.kautocor(blk, 10) for blk in
+         Stream(test_lpc.TestLPCParcorLSFAndStability.real_block)
+           .blocks(size=60, hop=30)]
+
+  @p("filt", filters)
+  def test_parcor(self, filt):
+    k = parcor_frames([filt.numerator])
+    assert k.shape == (1, len(filt.numerator) - 1)
+    assert almost_eq(k[0].tolist(), list(parcor(filt)))
+    assert parcor_stable_frames([filt.numerator]).tolist() == \
+           [parcor_stable(1 / filt)]
+
+  @p("filt", filters)
+  def test_lsf(self, filt):
+    result = lsf_frames([filt.numerator])
+    assert result.shape == (1, len(filt.numerator) - 1)
+    stable = lsf_stable(1 / filt)
+    assert lsf_stable_frames([filt.numerator]).tolist() == [stable]
+    if stable:
+      expected = [el for el in lsf(filt) if 0 < el < pi - 1e-10]
+      assert almost_eq.diff(result[0].tolist(), expected, max_diff=1e-9)
+
+  def test_parcor_values(self):
+    filt = levinson_durbin([1, 2, 3, 4, 5, 3, 2, 1])
+    k = parcor_frames([filt.numerator, [1, -.5, 0, 0, 0, 0, 0, .25]])
+    assert isinstance(k, np.ndarray)
+    assert almost_eq.diff(k.tolist(), [
+      [-.275, -.3793103, -1.4166667, -.2, -.25, -.3333333, -2.],
+      [.25, .1333333, .0723982, .0395184, .0216047, .0118169, -.5405687],
+    ], max_diff=1e-7)
+
+  def test_lsf_values(self):
+    filt = self.filters[0]
+    assert almost_eq.diff(lsf_frames([filt.numerator])[0].tolist(),
+                          [.695831, 1.422419, 2.046173], max_diff=1e-6)
+
+  def test_not_normalized(self):
+    data = [[2, 1, .5, .2], [-1, .3, 0, .1]]
+    normalized = [[1, .5, .25, .1], [1, -.3, 0, -.1]]
+    assert almost_eq(parcor_frames(data).tolist(),
+                     parcor_frames(normalized).tolist())
+    assert almost_eq(lsf_frames(data).tolist(),
+                     lsf_frames(normalized).tolist())
+
+  def test_lpc_frames_input(self):
+    blk = test_lpc.TestLPCParcorLSFAndStability.real_block
+    result = lpc_frames(Stream(blk).blocks(size=50), 6)
+    assert almost_eq(parcor_frames(result).tolist(), result.k.tolist())
+    assert parcor_stable_frames(result).all()
+    assert lsf_stable_frames(result).all()
+
+  def test_zero_division(self):
+    k = parcor_frames([[1, 0, 1], [1, .5, -.25]])
+    assert k[0, 0] == 1
+    assert all(k[0, 1:] != k[0, 1:]) # NaN
+    assert almost_eq(k[1].tolist(), list(parcor(ZFilter([1, .5, -.25]))))
+    assert parcor_stable_frames([[1, 0, 1], [1, .5, -.25]]).tolist() == \
+           [False, True]
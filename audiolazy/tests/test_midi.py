@@ -24,13 +24,17 @@ import pytest
 p = pytest.mark.parametrize
 
 from random import random
+from io import BytesIO
+import struct
 
 # Audiolazy internal imports
-from ..lazy_midi import (MIDI_A4, FREQ_A4, SEMITONE_RATIO, midi2freq,
-                         str2midi, freq2midi, midi2str)
+from ..lazy_midi import (MIDI_A4, FREQ_A4, SEMITONE_RATIO, MIDI_FREQS,
+                         CENT_RATIOS, midi2freq, str2midi, freq2midi,
+                         midi2str, smf_events, smf2stream)
 from ..lazy_misc import almost_eq
-from ..lazy_compat import xzip
-from ..lazy_math import inf, nan, isinf, isnan
+from ..lazy_stream import Stream
+from ..lazy_compat import xzip, xrange
+from ..lazy_math import inf, nan, isinf, isnan, pi
 
 
 class TestMIDI2Freq(object):
@@ -128,3 +132,157 @@ class TestMIDI2Str(object):
   @p("note", [inf, -inf, nan])
   def test_interrogation_output(self, note):
     assert midi2str(note) == "?"
+
+
+class TestLookupTables(object):
+
+  def test_midi_freqs(self):
+    assert len(MIDI_FREQS) == 128
+    assert MIDI_FREQS[MIDI_A4] == FREQ_A4
+    assert almost_eq(MIDI_FREQS[1:], [freq * SEMITONE_RATIO
+                                      for freq in MIDI_FREQS[:-1]])
+
+  @p("cent", [0, 1, 25, 50, 99])
+  def test_cent_ratios(self, cent):
+    assert len(CENT_RATIOS) == 100
+    assert almost_eq(CENT_RATIOS[cent], 2 ** (cent / 1200.))
+
+  @p("note", [0, 21, 60, 60.5, 60.01, 126.99, 127.5, 33.25, 128.5, -.5,
+              60.001, 60.125])
+  def test_fractional_midi2freq_formula(self, note):
+    expected = FREQ_A4 * 2 ** ((note - MIDI_A4) / 12.)
+    assert almost_eq(midi2freq(note), expected)
+
+  @p("note", [0, 21, 60, 60.5, 60.01, 126.99, 127.5, 33.25])
+  def test_cents_grid_round_trip(self, note):
+    note_int, cent = divmod(int(round(note * 100)), 100)
+    freq = midi2freq(note)
+    assert freq == MIDI_FREQS[note_int] * CENT_RATIOS[cent]
+    assert freq2midi(freq) == note
+
+  @p("note", [0, 21, 60, 127, 60., 128, -1])
+  def test_integer_midi2freq_formula(self, note):
+    expected = FREQ_A4 * 2 ** ((note - MIDI_A4) / 12.)
+    assert almost_eq(midi2freq(note), expected)
+
+  @p("note", list(xrange(-24, 150, 7)))
+  @p("sharp", [True, False])
+  def test_integer_midi2str_matches_non_integer_path(self, note, sharp):
+    # Only a very small error, below the tolerance, avoids the lookup table
+    assert midi2str(note, sharp=sharp) == midi2str(note + 1e-6, sharp=sharp)
+
+  def test_str2midi_memoized_keeps_results(self):
+    names = ["C4", " c4", "Db2", "F##3", "Fx3"]
+    first = [str2midi(name) for name in names]
+    assert [str2midi(name) for name in names] == first
+    assert first == [60, 60, 37, 55, 55]
+    assert isnan(str2midi("?"))
+    assert isnan(str2midi("?"))
+
+
+def smf_data(tracks, division=96, fmt=1):
+  """
+  Standard MIDI File contents from a list of tracks, each one a list of
+  ``(delta_tick, event_bytes)`` pairs. The end of track is included.
+  """
+  def varlen(value):
+    result = [value & 0x7f]
+    value >>= 7
+    while value:
+      result.insert(0, 0x80 | (value & 0x7f))
+      value >>= 7
+    return bytes(bytearray(result))
+  chunks = [b"MThd", struct.pack(">IHHH", 6, fmt, len(tracks), division)]
+  for track in tracks:
+    data = b"".join(varlen(delta) + bytes(bytearray(event))
+                    for delta, event in track + [(0, [0xff, 0x2f, 0])])
+    chunks.extend([b"MTrk", struct.pack(">I", len(data)), data])
+  return b"".join(chunks)
+
+
+class TestSMFEvents(object):
+  tempo_track = [(0, [0xff, 0x51, 3, 0x0f, 0x42, 0x40]), # 60 BPM
+                 (0, [0xff, 0x03, 4] + list(bytearray(b"Name"))),
+                 (192, [0xff, 0x51, 3, 0x07, 0xa1, 0x20])] # 120 BPM
+  notes_track = [(0, [0xc1, 5]), # Program change
+                 (0, [0x91, 60, 80]),
+                 (48, [64, 90]), # Running status
+                 (48, [0xb1, 7, 100]), # Control change
+                 (0, [0xf0, 2, 1, 0xf7]), # System exclusive
+                 (96, [0x81, 60, 64]),
+                 (96, [0x91, 64, 0]),
+                 (192, [0x92, 67, 1]),
+                 (96, [0x82, 67, 0])]
+  notes_expected = [(0., 1, 60, 80), (.5, 1, 64, 90), (2., 1, 60, 0),
+                    (2.5, 1, 64, 0), (3.5, 2, 67, 1), (4., 2, 67, 0)]
+
+  def test_merging_tracks_with_tempo_map(self):
+    smf = BytesIO(smf_data([self.tempo_track, self.notes_track]))
+    assert list(smf_events(smf)) == self.notes_expected
+
+  def test_sequential_format_2(self):
+    smf = BytesIO(smf_data([self.notes_track, self.notes_track], fmt=2))
+    events = list(smf_events(smf))
+    assert len(events) == 12
+    for (time0, ch0, note0, vel0), (time1, ch1, note1, vel1) in \
+        xzip(events[:6], events[6:]):
+      assert (ch0, note0, vel0) == (ch1, note1, vel1)
+      assert almost_eq(time1, time0 + 3.) # 576 ticks at 120 BPM
+
+  def test_smpte_division(self):
+    track = [(0, [0x90, 69, 100]), (50, [0x80, 69, 100])]
+    division = ((256 - 25) << 8) | 40 # 25 fps, 40 ticks per frame
+    smf = BytesIO(smf_data([self.tempo_track, track], division=division))
+    assert list(smf_events(smf)) == [(0., 0, 69, 100), (.05, 0, 69, 0)]
+
+  def test_from_file_name(self, tmpdir):
+    fname = str(tmpdir.join("song.mid"))
+    with open(fname, "wb") as f:
+      f.write(smf_data([self.tempo_track, self.notes_track]))
+    assert list(smf_events(fname)) == self.notes_expected
+
+  def test_invalid_data(self):
+    with pytest.raises(ValueError):
+      list(smf_events(BytesIO(b"RIFF" + b"\x00" * 20)))
+    data = smf_data([self.notes_track])
+    with pytest.raises(ValueError):
+      list(smf_events(BytesIO(data[:-10] + data[-7:])))
+    with pytest.raises(ValueError): # Starts with running status
+      list(smf_events(BytesIO(smf_data([[(0, [60, 90])]]))))
+
+  @p("event", [[0xff, 0x03, 5] + list(bytearray(b"Na")), # Meta
+               [0xf0, 9, 1, 2, 0xf7]]) # System exclusive
+  def test_truncated_payload(self, event):
+    data = bytes(bytearray([0] + event)) # Delta time and the event
+    smf = b"".join([b"MThd", struct.pack(">IHHH", 6, 0, 1, 96),
+                    b"MTrk", struct.pack(">I", len(data)), data])
+    with pytest.raises(ValueError) as exc:
+      list(smf_events(BytesIO(smf)))
+    assert "Truncated" in str(exc.value)
+
+
+class TestSMF2Stream(object):
+
+  def test_constant_synth(self):
+    track = [(0, [0x90, 69, 127]), (48, [0x90, 57, 127]), (48, [0x80, 69, 0]),
+             (48, [0x80, 57, 0]), (96, [0x90, 69, 127]), (96, [0x80, 69, 0])]
+    freqs = []
+    def synth(freq):
+      freqs.append(freq)
+      return Stream(1 + len(freqs))
+    rate = 8 # 4 samples per beat at 120 BPM
+    song = smf2stream(BytesIO(smf_data([track])), synth, rate=rate,
+                      pad_dur=.5)
+    assert isinstance(song, Stream)
+    assert list(song) == [2., 2., 5., 5., 3., 3., 0., 0., 0.,
+                          0., 4., 4., 4., 4., 0., 0., 0., 0.]
+    Hz = 2 * pi / rate
+    assert almost_eq(freqs, [440 * Hz, 220 * Hz, 440 * Hz])
+
+  def test_velocity_and_unfinished_notes(self):
+    track = [(96, [0x90, 60, 127]), (0, [0x90, 60, 64])]
+    song = smf2stream(BytesIO(smf_data([track])), lambda freq: Stream(1.),
+                      rate=4, pad_dur=1)
+    assert almost_eq(list(song), [0., 0., 1 + 64 / 127.,
+                                  1 + 64 / 127., 1 + 64 / 127.,
+                                  1 + 64 / 127.])
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Sun Oct 18 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Testing module for the lazy_midi Numpy vectorized paths, with the
+elementwise (non-vectorized) results as the oracle
+"""
+
+import pytest
+p = pytest.mark.parametrize
+
+import numpy as np
+
+# Audiolazy internal imports
+from ..lazy_midi import midi2freq, freq2midi, str2midi, midi2str
+from ..lazy_misc import almost_eq
+from ..lazy_math import inf, nan
+
+
+notes_table = [ # Data and dtype (the arrays are created in the tests)
+  (list(range(128)), None),
+  ([[60, 61], [127, 0]], "uint8"),
+  ([-3, 12, 200], None),
+  ([69., 60.5, 33.25, -7.125, 1e-5], None),
+  ([], "int"),
+]
+
+
+@p(("data", "dtype"), notes_table)
+def test_midi2freq(data, dtype):
+  notes = np.array(data, dtype=dtype)
+  result = midi2freq(notes)
+  assert isinstance(result, np.ndarray)
+  assert result.shape == notes.shape
+  assert almost_eq(result.ravel().tolist(),
+                   [midi2freq(note) for note in notes.ravel().tolist()])
+
+
+@p(("data", "dtype"), notes_table)
+@p("sharp", [True, False])
+def test_midi2str(data, dtype, sharp):
+  notes = np.array(data, dtype=dtype)
+  result = midi2str(notes, sharp=sharp)
+  assert isinstance(result, np.ndarray)
+  assert result.shape == notes.shape
+  assert result.ravel().tolist() == [midi2str(note, sharp=sharp)
+                                     for note in notes.ravel().tolist()]
+
+
+def test_midi2freq_table_values():
+  assert midi2freq(np.array([45, 81])).tolist() == [110., 880.]
+
+
+def test_cents_grid_round_trip():
+  notes = np.array([0., 60.5, 60.01, 126.99, 127.5, 33.25])
+  freqs = midi2freq(notes)
+  assert freqs.tolist() == [midi2freq(note) for note in notes.tolist()]
+  assert freq2midi(freqs).tolist() == notes.tolist()
+
+
+def test_midi2str_invalid():
+  assert midi2str(np.array([inf, nan, -inf])).tolist() == ["?"] * 3
+
+
+def test_freq2midi():
+  freqs = np.array([440., 27.5, 1e4, 0., -1., inf, nan])
+  result = freq2midi(freqs)
+  assert isinstance(result, np.ndarray)
+  expected = [freq2midi(freq) for freq in freqs.tolist()]
+  assert almost_eq(result[:3].tolist(), expected[:3])
+  assert result[3] == expected[3] == -inf
+  assert np.isnan(result[4]) and np.isnan(expected[4])
+  assert result[5] == expected[5] == inf
+  assert np.isnan(result[6]) and np.isnan(expected[6])
+
+
+def test_str2midi():
+  names = np.array([["A4", "Bb2"], ["C#5", "?"]])
+  result = str2midi(names)
+  assert result.shape == (2, 2)
+  assert result[:, 0].tolist() == [69, 73]
+  assert result[0, 1] == 46
+  assert np.isnan(result[1, 1])
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Sun Oct 18 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Testing module for the lazy_misc module by using numpy
+"""
+
+import pytest
+p = pytest.mark.parametrize
+
+import numpy as np
+
+# Audiolazy internal imports
+from ..lazy_misc import blocks
+from ..lazy_stream import Stream
+from ..lazy_compat import orange
+
+
+class TestNumpyBlocks(object):
+
+  inputs = {
+    "list": lambda data: data,
+    "tuple": tuple,
+    "ndarray": np.array,
+    "Stream": Stream,
+    "generator": lambda data: (el for el in data),
+  }
+
+  @p("kind", sorted(inputs))
+  @p("length", [0, 1, 2, 5, 7, 8, 16, 33])
+  @p(("size", "hop"), [(1, 1), (4, 4), (4, 1), (4, 3), (5, 2), (8, 3),
+                       (3, 5), (2, 7), (4, None)])
+  def test_deque_strategy_equivalence(self, kind, length, size, hop):
+    data = orange(1, length + 1)
+    expected = [list(blk) for blk in blocks.deque(data, size=size, hop=hop,
+                                                  padval=-1)]
+    result = [blk.tolist() for blk in blocks.numpy(self.inputs[kind](data),
+                                                   size=size, hop=hop,
+                                                   padval=-1)]
+    assert result == expected
+
+  @p("kind", sorted(inputs))
+  def test_read_only_float_blocks(self, kind):
+    for blk in blocks.numpy(self.inputs[kind](orange(10)), size=4, hop=2):
+      assert isinstance(blk, np.ndarray)
+      assert blk.dtype == np.float64
+      assert not blk.flags.writeable
+
+  def test_examples(self):
+    assert [blk.tolist() for blk in blocks.numpy([1, 2, 3, 4, 5], size=3,
+                                                 hop=2)] == \
+           [[1., 2., 3.], [3., 4., 5.]]
+    data = Stream([1, 2, 3] * 2) # Not a sequence
+    assert [blk.tolist() for blk in blocks.numpy(data, 4, padval=-1)] == \
+           [[1., 2., 3., 1.], [2., 3., -1., -1.]]
+
+  def test_sequence_blocks_are_views(self):
+    data = np.arange(12.)
+    blks = list(blocks.numpy(data, size=4, hop=2))
+    assert all(np.may_share_memory(blk, data) for blk in blks)
+    assert [blk.tolist() for blk in blks] == \
+           [data[idx:idx + 4].tolist() for idx in [0, 2, 4, 6, 8]]
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Mon Oct 19 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Testing module for the lazy_profile module
+"""
+
+import pytest
+
+# Audiolazy internal imports
+from .. import lazy_profile
+from ..lazy_profile import StreamProfiler
+from ..lazy_stream import Stream, Streamix, StreamTeeHub, thub
+from ..lazy_filters import z, LinearFilter
+from ..lazy_synth import line, ones
+
+
+class TestStreamProfiler(object):
+
+  def test_disabled_restores_methods(self):
+    originals = [Stream.__init__, LinearFilter.__call__, Streamix.__init__,
+                 StreamTeeHub.__iter__]
+    with StreamProfiler() as prof:
+      assert Stream.__init__ is not originals[0]
+      assert LinearFilter.__call__ is not originals[1]
+      data = line(10).take(20)
+    assert [Stream.__init__, LinearFilter.__call__, Streamix.__init__,
+            StreamTeeHub.__iter__] == originals
+    assert prof.nodes["line#1"].samples == 10
+    assert not isinstance(line(3)._data, lazy_profile._ProfiledIterator)
+    assert data == line(10).take(20)
+
+  def test_single_active_profiler(self):
+    with StreamProfiler():
+      with pytest.raises(RuntimeError):
+        StreamProfiler().start()
+    with StreamProfiler(): # The first was stopped
+      pass
+
+  def test_nested_self_time(self):
+    filt = 1 + z ** -1
+    with StreamProfiler() as prof:
+      sig = filt(line(50, 0, 1)).map(lambda x: x * 2) # Lambda isn't a node
+    result = list(sig)
+    assert result == list(filt(line(50, 0, 1)) * 2)
+    assert sorted(prof.nodes) == ["ZFilter(1 + z^-1)#1", "line#1"]
+    filt_node = prof.nodes["ZFilter(1 + z^-1)#1"]
+    line_node = prof.nodes["line#1"]
+    assert filt_node.samples == line_node.samples == 50
+    assert filt_node.time >= filt_node.self_time
+    assert filt_node.time >= line_node.time
+    assert sorted(prof.stacks) == [("ZFilter(1 + z^-1)#1",),
+                                   ("ZFilter(1 + z^-1)#1", "line#1")]
+
+  def test_errors_pop_the_node(self):
+    def failing():
+      yield 1.
+      raise ValueError("Failed")
+
+    filt = 1 + z ** -1
+    with StreamProfiler() as prof:
+      sig = filt(Stream(failing()))
+      other = line(3)
+    assert sig.take(1) == [1.]
+    with pytest.raises(ValueError):
+      sig.take(1)
+    assert prof._stack == []
+    assert list(other) == [0., 1. / 3, 2. / 3]
+    assert prof.nodes["failing#1"].samples == 1
+    assert prof.nodes["line#1"].samples == 3
+    assert sorted(prof.stacks) == [("ZFilter(1 + z^-1)#1",),
+                                   ("ZFilter(1 + z^-1)#1", "failing#1"),
+                                   ("line#1",)]
+
+  def test_thub_copies_share_a_node(self):
+    with StreamProfiler() as prof:
+      sig = thub(line(20), 2)
+      first, second = Stream(sig), Stream(sig)
+    assert list(first + second) == list(line(20) * 2)
+    assert prof.nodes["thub#1"].samples == 40
+    assert prof.nodes["line#1"].samples == 20
+
+  def test_report_and_folded(self):
+    with StreamProfiler() as prof:
+      smix = Streamix()
+      smix.add(0, ones(5))
+      smix.add(2, line(3))
+    assert list(smix) == [1., 1., 1., 4/3, 1 + 2/3]
+    lines = prof.report().splitlines()
+    assert lines[1].split() == ["Node", "Samples", "Time", "(ms)", "Self",
+                                "(ms)", "Self/sample", "(us)"]
+    assert sorted(line.split()[0] for line in lines[3:-1]) == \
+           ["Streamix#1", "line#1", "ones#1"]
+    folded = [line.rsplit(" ", 1) for line in prof.folded().splitlines()]
+    assert [path for path, time in folded] == \
+           ["Streamix#1", "Streamix#1;line#1", "Streamix#1;ones#1"]
+    assert all(int(time) >= 0 for path, time in folded)
@@ -29,7 +29,8 @@ import warnings
 from collections import deque
 
 # Audiolazy internal imports
-from ..lazy_stream import Stream, thub, MemoryLeakWarning, StreamTeeHub
+from ..lazy_stream import (Stream, thub, MemoryLeakWarning, StreamTeeHub,
+                           ControlStream)
 from ..lazy_misc import almost_eq
 from ..lazy_compat import orange, xrange, xzip, xmap, xfilter, NEXT_NAME
 from ..lazy_math import inf, nan
@@ -501,3 +502,59 @@ class TestThub(object):
       assert blks.take(inf) == expected
     with pytest.raises(IndexError):
       data.blocks(size=size, hop=hop)
+
+
+class TestControlStream(object):
+
+  def test_sample_rate_changes(self):
+    cs = ControlStream(1)
+    assert cs.take(3) == [1, 1, 1]
+    cs.value = 1 # Same value, no event
+    cs.value = 4
+    assert cs.take(2) == [4, 4]
+    cs.value = 2
+    assert cs.take(1) == [2]
+    assert cs.sample == 6
+    assert list(cs.changes) == [(3, 4), (5, 2)]
+
+  def test_changes_history_size(self):
+    cs = ControlStream(0)
+    for value in xrange(1, 2 * cs.max_changes):
+      cs.value = value
+    assert len(cs.changes) == cs.max_changes
+    assert cs.changes[-1] == (0, 2 * cs.max_changes - 1)
+
+  @p("size", [1, 3, 8])
+  def test_control_constant_runs(self, size):
+    cs = ControlStream(.2)
+    ctrl = cs.control(size)
+    assert ctrl.take(3) == [.2] * 3
+    cs.value = -1
+    assert ctrl.take(2) == [-1, -1]
+    assert cs.sample == 5 * size
+    assert list(cs.changes) == [(3 * size, -1)]
+
+  @p("size", [1, 2, 5, 16])
+  @p("ramp", [1, 4, 7, 30])
+  def test_control_ramp_samples(self, size, ramp):
+    cs = ControlStream(0.)
+    ctrl = cs.control(size, ramp=ramp)
+    assert ctrl.take() == 0.
+    cs.value = 1.
+    nblocks = -(-ramp // size) # Ceil
+    blks = ctrl.take(nblocks)
+    assert all(isinstance(blk, list) and len(blk) == size for blk in blks)
+    samples = [el for blk in blks for el in blk]
+    expected = [(n + 1.) / ramp for n in xrange(ramp)]
+    assert almost_eq(samples[:ramp], expected)
+    assert samples[ramp:] == [1.] * (nblocks * size - ramp)
+    assert ctrl.take(2) == [1., 1.]
+
+  def test_control_change_during_ramp(self):
+    cs = ControlStream(0.)
+    ctrl = cs.control(2, ramp=4)
+    assert ctrl.take() == 0.
+    cs.value = 4.
+    assert ctrl.take() == [1., 2.]
+    cs.value = 0.
+    assert almost_eq(ctrl.take(3), [[1.5, 1.], [.5, 0.], 0.])
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Sun Oct 18 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Testing module for the lazy_stream module by using numpy
+"""
+
+import pytest
+p = pytest.mark.parametrize
+
+import numpy as np
+
+# Audiolazy internal imports
+from ..lazy_stream import ControlStream
+
+
+class TestNumpyControlStream(object):
+
+  def test_array_values(self):
+    cs = ControlStream(np.zeros(3))
+    ctrl = cs.control(2)
+    assert ctrl.take(1)[0].tolist() == [0., 0., 0.]
+    cs.value = np.zeros(3) # Same value in another array
+    cs.value = np.array([0., 1., 0.])
+    assert cs.take(1)[0].tolist() == [0., 1., 0.]
+    assert [(k, value.tolist()) for k, value in cs.changes] == \
+           [(2, [0., 1., 0.])] # After the first block
+    assert ctrl.take(1)[0].tolist() == [0., 1., 0.]
+
+  def test_array_ramp(self):
+    cs = ControlStream(np.zeros(2))
+    ctrl = cs.control(2, ramp=2)
+    ctrl.take(1)
+    cs.value = np.array([2., -2.])
+    assert [blk.tolist() for blk in ctrl.take(1)[0]] == [[1., -1.],
+                                                         [2., -2.]]
+    assert ctrl.take(1)[0].tolist() == [2., -2.]
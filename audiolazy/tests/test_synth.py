@@ -28,7 +28,8 @@ import itertools as it
 # Audiolazy internal imports
 from ..lazy_synth import (modulo_counter, line, impulse, ones, zeros, zeroes,
                           white_noise, gauss_noise, TableLookup, fadein,
-                          fadeout, sin_table, saw_table)
+                          fadeout, sin_table, saw_table, NOISE_BLOCK_SIZE,
+                          DEFAULT_TABLE_SIZE, _lazy_table_lookup)
 from ..lazy_stream import Stream
 from ..lazy_misc import almost_eq, sHz, blocks, rint, lag2freq
 from ..lazy_compat import orange, xrange, xzip
@@ -192,6 +193,13 @@ class TestWhiteNoise(object):
     for el in my_list:
       assert low <= el <= 1
 
+  def test_seed(self):
+    dur = 2 * NOISE_BLOCK_SIZE + 3
+    data = list(white_noise(dur, seed=17))
+    assert len(data) == dur
+    assert white_noise(seed=17).take(dur) == data
+    assert white_noise(seed=18).take(dur) != data
+
 
 class TestGaussNoise(object):
 
@@ -213,6 +221,13 @@ class TestGaussNoise(object):
     my_list = list(my_stream)
     assert len(my_list) == dur_int
 
+  def test_seed(self):
+    dur = NOISE_BLOCK_SIZE + 1
+    data = list(gauss_noise(dur, mu=3, sigma=.5, seed="voice"))
+    assert len(data) == dur
+    assert gauss_noise(mu=3, sigma=.5, seed="voice").take(dur) == data
+    assert gauss_noise(seed="voice").take(dur) != data
+
 
 class TestTableLookup(object):
 
@@ -246,6 +261,20 @@ class TestTableLookup(object):
       assert d1 - d0 > 0 # Should be monotonically increasing
       assert almost_eq(d1 - d0, first_step) # Should have constant derivative
 
+  def test_lazy_table_built_once_on_first_use(self):
+    calls = []
+    table = _lazy_table_lookup(lambda: calls.append(1) or [0., 1., 2.], 3)
+    assert len(table) == 3
+    assert calls == []
+    assert table[.5] == .5
+    assert table == TableLookup([0., 1., 2.])
+    assert table(0, phase=pi).take(2) == [1.5, 1.5]
+    assert calls == [1]
+
+  @p("table", [sin_table, saw_table])
+  def test_default_table_sizes(self, table):
+    assert len(table) == len(table.table) == DEFAULT_TABLE_SIZE
+
 
 class TestImpulse(object):
 
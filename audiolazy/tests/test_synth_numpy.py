@@ -28,7 +28,12 @@ from math import pi
 
 # Audiolazy internal imports
 from ..lazy_misc import almost_eq, sHz
-from ..lazy_synth import adsr, sinusoid
+from .. import lazy_synth
+from ..lazy_synth import (adsr, sinusoid, white_noise, gauss_noise,
+                          pink_noise, brown_noise, NOISE_BLOCK_SIZE,
+                          adsr_array, adsr_blocks, attack, attack_blocks,
+                          line, line_blocks)
+from ..lazy_stream import Stream
 
 
 def test_adsr():
@@ -49,6 +54,85 @@ def test_adsr():
   assert almost_eq(env, adsr(dur=3*s, a=20*ms, d=30*ms, s=.8, r=50*ms))
 
 
+class TestEnvelopeBlocks(object):
+
+  adsr_inputs = [
+    (3 * 44100, 20e-3 * 44100, 30e-3 * 44100, .8, 50e-3 * 44100),
+    (100, 10, 20, .5, 30),
+    (100.4, 9.5, 20.2, 1, 29.7),
+    (40, 10, 20, .5, 30), # Not enough duration for the sustain
+  ]
+
+  @p("inputs", adsr_inputs)
+  @p("size", [1, 7, 64, 2048])
+  def test_adsr_sameness(self, inputs, size):
+    expected = list(adsr(*inputs))
+    assert adsr_array(*inputs).tolist() == expected
+    blks = list(adsr_blocks(*inputs, size=size))
+    assert all(len(blk) == size for blk in blks[:-1])
+    assert np.concatenate(blks).tolist() == expected
+
+  @p("size", [1, 5, 16])
+  @p(("a", "d", "s"), [(10, 20, .5), (3.6, .4, 1), (.3, .2, .2)])
+  def test_attack_sameness(self, a, d, s, size):
+    blks = attack_blocks(a, d, s, size=size).take(60 // size + 1)
+    assert all(len(blk) == size for blk in blks)
+    expected = Stream(attack(a, d, s)).take(60)
+    assert np.concatenate(blks).tolist()[:60] == expected
+
+  @p("inputs", [(6, .2, .7, True), (6, 1, 4), (30.4, 1., 0.), (1, -1, 1)])
+  @p("size", [1, 4, 8])
+  def test_line_sameness(self, inputs, size):
+    blks = list(line_blocks(*inputs, size=size))
+    assert all(len(blk) == size for blk in blks[:-1])
+    assert np.concatenate(blks).tolist() == list(line(*inputs))
+
+  def test_small_adsr_and_line_values(self):
+    assert adsr_array(10, a=2, d=2, s=.5, r=4).tolist() == \
+           [0., .5, 1., .75, .5, .5, .5, .375, .25, .125]
+    assert adsr_array(10, a=2, d=2, s=.5, r=4) is \
+           adsr_array(10, 2, 2, .5, 4)
+    assert [blk.tolist() for blk in line_blocks(6, 1, 4, size=4)] == \
+           [[1., 1.5, 2., 2.5], [3., 3.5]]
+
+  @p("curve", [-4, -1, 2])
+  def test_curve(self, curve):
+    env = adsr_array(100, 10, 20, .5, 30, curve=curve)
+    assert len(env) == 100
+    assert env[0] == 0. and env[10] == 1. and env[30] == .5
+    assert almost_eq(env[69], .5)
+    assert almost_eq(env[99], np.expm1(curve * 29 / 30) / np.expm1(curve) * -.5
+                              + .5)
+    diffs = np.diff(env)
+    assert np.all(diffs[:10] > 0) and np.all(diffs[10:30] < 0)
+    assert not np.allclose(env, adsr_array(100, 10, 20, .5, 30))
+    attack_diffs = diffs[:9]
+    if curve < 0: # Fast start
+      assert np.all(np.diff(attack_diffs) < 0)
+    else:
+      assert np.all(np.diff(attack_diffs) > 0)
+
+  def test_shared_read_only_arrays(self):
+    env = adsr_array(100, 10, 20, .5, 30)
+    assert adsr_array(100, 10, 20, .5, 30) is env
+    assert all(np.may_share_memory(blk, env)
+               for blk in adsr_blocks(100, 10, 20, .5, 30, size=16))
+    with pytest.raises(ValueError):
+      env[0] = 1.
+
+  def test_least_recently_used_eviction(self, monkeypatch):
+    monkeypatch.setattr(lazy_synth, "ENVELOPE_CACHE_SIZE", 2)
+    monkeypatch.setattr(lazy_synth, "_envelope_cache",
+                        lazy_synth.collections.OrderedDict())
+    env1, env2 = adsr_array(50, 5, 5, .5, 5), adsr_array(60, 5, 5, .5, 5)
+    assert adsr_array(50, 5, 5, .5, 5) is env1 # Now env2 is the LRU one
+    env3 = adsr_array(70, 5, 5, .5, 5)
+    assert len(lazy_synth._envelope_cache) == 2
+    assert adsr_array(50, 5, 5, .5, 5) is env1
+    assert adsr_array(70, 5, 5, .5, 5) is env3
+    assert adsr_array(60, 5, 5, .5, 5) is not env2
+
+
 def test_sinusoid():
   rate = 44100
   dur = 3 * rate
@@ -66,3 +150,79 @@ def test_sinusoid():
                                 ).take(int(3 * s)),
                         max_diff=1e-8
                        )
+
+
+@p("noise", [white_noise.numpy, gauss_noise.numpy, pink_noise, brown_noise])
+class TestNumpyNoise(object):
+
+  @p("dur", [-1, 0, .4, 1, 10, NOISE_BLOCK_SIZE, 2.5 * NOISE_BLOCK_SIZE])
+  def test_finite_duration(self, noise, dur):
+    my_stream = noise(dur, seed=5)
+    assert isinstance(my_stream, Stream)
+    assert len(list(my_stream)) == max(int(round(dur)), 0)
+
+  def test_seed(self, noise):
+    dur = 3 * NOISE_BLOCK_SIZE
+    data = noise(seed=1).take(dur)
+    assert all(isinstance(el, float) for el in data)
+    assert noise(dur, seed=1).take(dur) == data
+    assert noise(dur, seed=2).take(dur) != data
+
+
+@p("noise", [pink_noise, brown_noise])
+def test_colored_noise_limits(noise):
+  data = np.array(noise(seed=0).take(10 * NOISE_BLOCK_SIZE))
+  assert np.all(np.abs(data) <= 1)
+
+
+def test_pink_noise_spectrum():
+  size = 2 ** 16
+  power = np.abs(np.fft.rfft(pink_noise(size, seed=12).take(size))) ** 2
+  octave_powers = [np.mean(power[2 ** k:2 ** (k + 1)]) for k in range(6, 13)]
+  for ratio in np.array(octave_powers[:-1]) / octave_powers[1:]:
+    assert 1.5 < ratio < 2.5 # A -3 dB/octave slope has a ratio of 2
+
+
+@p("size", [1, 3, 8, 2048])
+def test_pink_noise_blocks(monkeypatch, size):
+  # Per sample reference, drawing the values in the same order
+  rows, dur = 5, 100
+  rng = lazy_synth._np_rng(7)
+  held = rng.uniform(-1., 1., rows)
+  expected = []
+  for n in range(dur):
+    total = rng.uniform(-1., 1., 1)[0]
+    for k in range(rows):
+      if (n + (1 << k)) >> (k + 1) != (n - 1 + (1 << k)) >> (k + 1):
+        held[k] = rng.uniform(-1., 1., 1)[0]
+      total += held[k]
+    expected.append(total / (rows + 1))
+
+  monkeypatch.setattr(lazy_synth, "NOISE_BLOCK_SIZE", size)
+  if size == 1: # The random values are drawn in the same order
+    assert almost_eq(pink_noise(dur, rows=rows, seed=7).take(dur), expected)
+
+  # For any block size, the rows are updated at the same samples
+  draws = []
+  original_rng = lazy_synth._np_rng
+
+  def counting_rng(seed):
+    rng = original_rng(seed)
+    uniform = rng.uniform
+
+    class CountingRNG(object):
+      def uniform(self, low, high, count):
+        draws.append(count)
+        return uniform(low, high, count)
+
+    return CountingRNG()
+
+  monkeypatch.setattr(lazy_synth, "_np_rng", counting_rng)
+  pink_noise(dur, rows=rows, seed=7).take(dur)
+  assert sum(draws) == rows + dur + sum((dur - 1 + (1 << k)) >> (k + 1)
+                                        for k in range(rows))
+
+
+def test_brown_noise_step():
+  data = np.array(brown_noise(seed=3, step=.01).take(5 * NOISE_BLOCK_SIZE))
+  assert np.max(np.abs(np.diff(data))) <= .01
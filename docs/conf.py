@@ -384,7 +384,8 @@ epub_copyright = copyright
 #
 # Item in sys.modules for StrategyDict instances (needed for automodule)
 #
-for name, sdict in iteritems(audiolazy.__dict__):
+for name in audiolazy.__all__:
+  sdict = getattr(audiolazy, name)
   if isinstance(sdict, audiolazy.StrategyDict):
     fname = ".".join([sdict.default.__module__, name])
     sdict.__all__ = tuple(x[0] for x in sdict.keys())
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Sun Oct 18 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+AudioLazy import time benchmarking, each snippet running in a new Python
+process, comparing the lazy package loading with the cost of importing
+every module and creating every docstring summary (as it happens when the
+package class can't be changed, i.e., before Python 3.5)
+"""
+
+from __future__ import unicode_literals, print_function
+from timeit import default_timer
+import subprocess
+import sys
+import os
+
+repeat = 15
+snippets = [
+  ("Python startup", "pass"),
+  ("import audiolazy", "import audiolazy"),
+  ("from audiolazy import Stream", "from audiolazy import Stream"),
+  ("from audiolazy import z", "from audiolazy import z"),
+  ("sin_table first use", "from audiolazy import sin_table; sin_table[1]"),
+  ("All modules", "import audiolazy; audiolazy.__all__"),
+  ("All modules and summaries",
+   "import audiolazy; audiolazy.__all__; audiolazy.__doc__"),
+]
+
+env = dict(os.environ, AUDIOLAZY_PROFILE="") # No autotuning profile
+env.pop("AUDIOLAZY_AUTOTUNE", None)
+
+
+def run(code):
+  """ Best time for a whole Python process running the given code. """
+  best = float("inf")
+  for unused in range(repeat):
+    start = default_timer()
+    subprocess.check_call([sys.executable, "-c", code], env=env)
+    best = min(best, default_timer() - start)
+  return best
+
+
+startup = run("pass")
+for name, code in snippets:
+  elapsed = run(code)
+  print("{:>26}: {:6.1f} ms ({:+6.1f} ms from startup)".format(
+    name, elapsed * 1e3, (elapsed - startup) * 1e3
+  ))
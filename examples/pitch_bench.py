@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Sun Oct 18 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Pitch detection benchmarking, comparing the YIN engine (all lags at once)
+with the zero-crossing and DFT peak pitch followers from the examples and
+with one AMDF filter for each lag
+"""
+
+from __future__ import unicode_literals, print_function
+from timeit import default_timer
+from audiolazy import (sHz, saw_table, line, yin, amdf, thub, lag2freq,
+                       freq2str, tostream, inf)
+from zcross_pitch import zcross_pitch
+from dft_pitch import dft_pitch
+
+rate = 44100
+s, Hz = sHz(rate)
+size = 2048
+hop = 1024
+min_lag, max_lag = 40, 440 # About 100 to 1100 Hz (400 lags)
+
+
+@tostream
+def amdf_pitch(sig, size=size, hop=hop):
+  """ The lowest AMDF value among the amdf filters for each lag """
+  lags = range(min_lag, max_lag)
+  sig = thub(sig, len(lags))
+  filts = [amdf(lag, size)(sig).blocks(size=1, hop=hop) for lag in lags]
+  for values in zip(*filts):
+    lag = min(zip(values, lags))[1]
+    yield lag2freq(lag)
+
+
+def run(name, pitch_func, dur):
+  """ Pitch of a sawtooth glissando with the given duration """
+  sig = saw_table(line(dur, 220 * Hz, 440 * Hz)).take(int(dur))
+  start = default_timer()
+  pitches = pitch_func(sig).take(inf)
+  elapsed = default_timer() - start
+  print("{:>9}: {:8.1f} ms per second of audio (last: {})".format(
+    name, elapsed * 1e3 / dur * s, freq2str(pitches[-1] / Hz)
+  ))
+
+
+run("YIN", lambda sig: yin(sig, size, hop, min_lag, max_lag), 10 * s)
+run("ZCross", lambda sig: zcross_pitch(sig, size, hop), 10 * s)
+run("DFT", lambda sig: dft_pitch(sig, size, hop), 10 * s)
+run("AMDF", amdf_pitch, .1 * s) # Too slow for a longer signal
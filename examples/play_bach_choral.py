@@ -18,12 +18,11 @@
 # Created on Mon Jan 28 2013
 # danilo [dot] bellini [at] gmail [dot] com
 """
-Random Bach Choral playing example (needs Music21 corpus)
+Random Bach Choral playing example (needs Music21 corpus), or a Standard
+MIDI File given as an argument
 """
 
 from __future__ import unicode_literals, print_function
-from music21 import corpus
-from music21.expressions import Fermata
 import audiolazy as lz
 import random, operator, sys, time
 from functools import reduce
@@ -41,6 +40,7 @@ def ks_synth(freq):
 
 def get_random_choral(log=True):
   """ Gets a choral from the J. S. Bach chorals corpus (in Music21). """
+  from music21 import corpus # Not needed for playing MIDI files
   choral_file = corpus.getBachChorales()[random.randint(0, 399)]
   choral = corpus.parse(choral_file)
   if log:
@@ -72,6 +72,8 @@ def m21_to_stream(score, synth=ks_synth, beat=90, fdur=2., pad_dur=.5,
     The sample rate, given in samples per second.
 
   """
+  from music21.expressions import Fermata
+
   # Configuration
   s, Hz = lz.sHz(rate)
   step = 60. / beat * s
@@ -103,9 +105,15 @@ def m21_to_stream(score, synth=ks_synth, beat=90, fdur=2., pad_dur=.5,
 # Play the song!
 if __name__ == "__main__":
   rate = 44100
+  midi_files = [arg for arg in sys.argv[1:]
+                if arg.lower().endswith((".mid", ".midi"))]
   while True:
     with lz.AudioIO(True) as player:
-      player.play(m21_to_stream(get_random_choral(), rate=rate), rate=rate)
+      if midi_files:
+        song = lz.smf2stream(random.choice(midi_files), ks_synth, rate=rate)
+      else:
+        song = m21_to_stream(get_random_choral(), rate=rate)
+      player.play(song, rate=rate)
     if not "loop" in sys.argv[1:]:
       break
     time.sleep(3)
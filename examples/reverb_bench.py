@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Sun Oct 18 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Schroeder and Moorer reverbs benchmarking, comparing the LinearFilter
+delay lines (sparse taps) with the shifted memory variables (dense)
+"""
+
+from __future__ import unicode_literals, print_function
+from timeit import timeit
+from audiolazy import (sHz, z, comb, ZFilter, CascadeFilter, ParallelFilter,
+                       white_noise, inf, almost_eq)
+
+rate = 44100
+s, Hz = sHz(rate)
+ms = 1e-3 * s
+num_tests = 5
+dur = 1 * s
+
+
+def allpass(delay, gain=.7):
+  """ Schroeder allpass section """
+  return (-gain + z ** -delay) / (1 - gain * z ** -delay)
+
+
+def lowpass_comb(delay, gain, damping=.2):
+  """ Moorer feedback comb with a one-pole lowpass in its loop """
+  return (1 - damping * z ** -1) / (1 - damping * z ** -1
+                                      - gain * z ** -delay)
+
+
+def schroeder():
+  combs = [comb.tau(delay, 1.5 * s) for delay in [1557, 1617, 1491, 1422]]
+  allpasses = [allpass(delay) for delay in [225, 556]]
+  return CascadeFilter(ParallelFilter(combs), *allpasses)
+
+
+def moorer():
+  delays = [delay_ms * ms for delay_ms in [50, 56, 61, 68, 72, 78]]
+  combs = [lowpass_comb(int(delay), .83) for delay in delays]
+  return CascadeFilter(ParallelFilter(combs), allpass(int(6 * ms)))
+
+
+def filters(reverb):
+  """ All ZFilter instances in a CascadeFilter/ParallelFilter tree """
+  for filt in reverb:
+    if isinstance(filt, ZFilter):
+      yield filt
+    else:
+      for sub_filt in filters(filt):
+        yield sub_filt
+
+
+def render(reverb, dense, data):
+  for filt in filters(reverb):
+    filt.max_shift_memory = inf if dense else ZFilter.max_shift_memory
+  return reverb(data).take(inf)
+
+
+data = white_noise(dur, seed=42).take(inf)
+for name, reverb_func in [("Schroeder", schroeder), ("Moorer", moorer)]:
+  reverb = reverb_func()
+  print("=== {} reverb ({} taps) ===".format(
+    name, sum(len(filt.numdict) + len(filt.dendict) - 1
+              for filt in filters(reverb))
+  ))
+  assert almost_eq(render(reverb, True, data), render(reverb, False, data))
+  for label, dense in [("Delay lines", False), ("Shifted memory", True)]:
+    time = timeit(lambda: render(reverb, dense, data), number=num_tests)
+    print("{} (ms per second of audio): {:.1f}"
+          .format(label, time * 1e3 / num_tests / dur * s))
+  print()
@@ -19,49 +19,24 @@
 # danilo [dot] bellini [at] gmail [dot] com
 """
 Random synthesis with saving and memoization
+
+The pitched notes envelope is rendered with ``adsr_array`` when Numpy is
+available, falling back to a list from the pure Python ``adsr`` otherwise.
 """
 
 from __future__ import division
-from audiolazy import (sHz, octaves, chain, adsr, gauss_noise, sin_table, pi,
-                       sinusoid, lag2freq, Streamix, zeros, clip, lowpass,
-                       TableLookup, line, inf, xrange, thub, chunks)
+from audiolazy import (sHz, octaves, chain, adsr, adsr_array, gauss_noise,
+                       sin_table, pi, sinusoid, lag2freq, Streamix, zeros,
+                       lowpass, TableLookup, line, inf, xrange, thub,
+                       write_audio, RenderCache)
 from random import choice, uniform, randint
-from functools import wraps, reduce
-from contextlib import closing
-import operator, wave
+from functools import reduce
+import operator
 
-
-#
-# Helper functions
-#
-def memoize(func):
-  """
-  Decorator for unerasable memoization based on function arguments, for
-  functions without keyword arguments.
-  """
-  class Memoizer(dict):
-    def __missing__(self, args):
-      val = func(*args)
-      self[args] = val
-      return val
-  memory = Memoizer()
-  @wraps(func)
-  def wrapper(*args):
-    return memory[args]
-  return wrapper
-
-
-def save_to_16bit_wave_file(fname, sig, rate):
-  """
-  Save a given signal ``sig`` to file ``fname`` as a 16-bit one-channel wave
-  with the given ``rate`` sample rate.
-  """
-  with closing(wave.open(fname, "wb")) as wave_file:
-    wave_file.setnchannels(1)
-    wave_file.setsampwidth(2)
-    wave_file.setframerate(rate)
-    for chunk in chunks((clip(sig) * 2 ** 15).map(int), dfmt="h", padval=0):
-      wave_file.writeframes(chunk)
+try:
+  import numpy
+except ImportError:
+  numpy = None
 
 
 #
@@ -71,6 +46,9 @@ rate = 44100
 s, Hz = sHz(rate)
 ms = 1e-3 * s
 
+# Rendered notes memoization, keeping up to 16 MiB of 32 bits samples
+render_cache = RenderCache(max_bytes=16 * 2 ** 20)
+
 # Frequencies (always in Hz here)
 freq_base = 440
 freq_min = 100
@@ -99,7 +77,7 @@ def new_note_track(env, synth):
   Parameters
   ----------
   env:
-    Envelope Stream (which imposes the duration).
+    Envelope Numpy array or list (which imposes the duration).
   synth:
     One-argument function that receives a frequency (in rad/sample) and
     returns a Stream instance (a synthesized note).
@@ -109,14 +87,17 @@ def new_note_track(env, synth):
   Endless Stream instance that joins synthesized notes.
 
   """
-  list_env = list(env)
-  return chain.from_iterable(synth(freq) * list_env for freq in freq_gen())
+  if isinstance(env, list):
+    return chain.from_iterable(synth(freq) * env for freq in freq_gen())
+  size = len(env)
+  return chain.from_iterable((env * synth(freq).take(size)).tolist()
+                             for freq in freq_gen())
 
 
-@memoize
+@render_cache.memoize
 def unpitched_high(dur, idx):
   """
-  Non-harmonic treble/higher frequency sound as a list (due to memoization).
+  Non-harmonic treble/higher frequency sound, rendered once (memoization).
 
   Parameters
   ----------
@@ -127,7 +108,7 @@ def unpitched_high(dur, idx):
 
   Returns
   -------
-  A list with the synthesized note.
+  A Stream with the synthesized note.
 
   """
   first_dur, a, d, r, gain = [
@@ -137,8 +118,7 @@ def unpitched_high(dur, idx):
   env = chain(adsr(first_dur, a=a, d=d, s=.2, r=r),
               adsr(dur - first_dur,
                    a=10 * ms, d=30 * ms, s=.2, r=dur - 50 * ms))
-  result = gauss_noise(dur) * env * gain
-  return list(result)
+  return gauss_noise(dur) * env * gain
 
 
 # Values used by the unpitched low synth
@@ -146,10 +126,10 @@ harmonics = dict(enumerate([3] * 4 + [2] * 4 + [1] * 10))
 low_table = sin_table.harmonize(harmonics).normalize()
 
 
-@memoize
+@render_cache.memoize
 def unpitched_low(dur, idx):
   """
-  Non-harmonic bass/lower frequency sound as a list (due to memoization).
+  Non-harmonic bass/lower frequency sound, rendered once (memoization).
 
   Parameters
   ----------
@@ -160,13 +140,12 @@ def unpitched_low(dur, idx):
 
   Returns
   -------
-  A list with the synthesized note.
+  A Stream with the synthesized note.
 
   """
   env = sinusoid(lag2freq(dur * 2)).limit(dur) ** 2
   freq = 40 + 20 * sinusoid(1000 * Hz, phase=uniform(-pi, pi)) # Hz
-  result = (low_table(freq * Hz) + low_table(freq * 1.1 * Hz)) * env * .5
-  return list(result)
+  return (low_table(freq * Hz) + low_table(freq * 1.1 * Hz)) * env * .5
 
 
 def geometric_delay(sig, dur, copies, pamp=.5):
@@ -209,7 +188,12 @@ smix = Streamix()
 # Pitched tracks based on a 1:2 triangular wave
 table = TableLookup(line(100, -1, 1).append(line(200, 1, -1)).take(inf))
 for track in xrange(tracks):
-  env = adsr(dur_note, a=20 * ms, d=10 * ms, s=.8, r=30 * ms) / 1.7 / tracks
+  if numpy is None:
+    env = list(adsr(dur_note, a=20 * ms, d=10 * ms, s=.8, r=30 * ms)
+               / 1.7 / tracks)
+  else:
+    env = adsr_array(dur_note, a=20 * ms, d=10 * ms, s=.8, r=30 * ms)
+    env = env / 1.7 / tracks
   smix.add(0, geometric_delay(new_note_track(env, table), 80 * ms, 2))
 
 # Unpitched tracks
@@ -224,4 +208,4 @@ smix.add(0, geometric_delay(snd * (1 - 1/1.7), 20 * ms, 1))
 #
 data = lowpass(5000 * Hz)(smix).limit(180 * s)
 fname = "audiolazy_save_and_memoize_synth.wav"
-save_to_16bit_wave_file(fname, data, rate)
+write_audio(fname, data, rate=rate) # 16 bits
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of AudioLazy, the signal processing Python package.
+# Copyright (C) 2012-2013 Danilo de Jesus da Silva Bellini
+#
+# AudioLazy is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+#
+# Created on Sun Oct 18 2026
+# danilo [dot] bellini [at] gmail [dot] com
+"""
+Standard MIDI File (SMF) parsing and rendering benchmarking, with a large
+random multi-track file created in memory
+"""
+
+from __future__ import unicode_literals, print_function
+from timeit import default_timer
+from io import BytesIO
+import random
+import struct
+from audiolazy import smf_events, smf2stream, sHz, sin_table
+
+rate = 44100
+s, Hz = sHz(rate)
+division = 480 # Ticks per quarter note
+num_tracks = 16
+notes_per_track = 2000
+render_dur = 10 * s
+random.seed(1)
+
+
+def varlen(value):
+  """ MIDI variable length quantity bytes """
+  result = [value & 0x7f]
+  value >>= 7
+  while value:
+    result.insert(0, 0x80 | (value & 0x7f))
+    value >>= 7
+  return bytearray(result)
+
+
+def random_track(channel):
+  """ Track with non-overlapping notes (and some non-note events) """
+  data = bytearray()
+  for unused in range(notes_per_track):
+    note = random.randint(36, 96)
+    data += varlen(random.choice([0, 60, 120, 240]))
+    data += bytearray([0x90 | channel, note, random.randint(40, 127)])
+    data += varlen(random.choice([60, 120, 240]))
+    data += bytearray([0xb0 | channel, 1, random.randint(0, 127)])
+    data += varlen(random.choice([60, 120, 240]))
+    data += bytearray([0x80 | channel, note, 0])
+  data += bytearray([0, 0xff, 0x2f, 0])
+  return b"MTrk" + struct.pack(">I", len(data)) + bytes(data)
+
+
+def synth(freq):
+  return sin_table(freq) * .05
+
+
+smf = b"".join([b"MThd", struct.pack(">IHHH", 6, 1, num_tracks, division)] +
+               [random_track(channel % 16) for channel in range(num_tracks)])
+print("File size: {} KiB".format(len(smf) // 1024))
+
+start = default_timer()
+events = list(smf_events(BytesIO(smf)))
+elapsed = default_timer() - start
+print("Parsing {} note events: {:.3f} s ({:.0f} events/s)"
+      .format(len(events), elapsed, len(events) / elapsed))
+
+start = default_timer()
+size = len(smf2stream(BytesIO(smf), synth, rate=rate).take(render_dur))
+elapsed = default_timer() - start
+print("Rendering {:.1f} s of audio: {:.2f} s ({:.2f}x real time)"
+      .format(size / s, elapsed, size / s / elapsed))